@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the per-call cost of the fasthash candidates used for cache keys.
+
+Hashes a set of domain names like the ones RedirectionsMiddleware receives
+with every algorithm available in eox_core.utils.FASTHASH_ALGORITHMS, and
+with fasthash itself under the default settings.
+
+Usage:
+    python benchmarks/fasthash.py [--number N]
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DOMAINS = ['campus.university-{}.edu'.format(number) for number in range(50)] + ['courses.example.com']
+
+
+def main():
+    """
+    Run the benchmark and print the cost per call of every candidate.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000, help='passes over the domains per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements, the best one is reported')
+    options = parser.parse_args()
+
+    from django.conf import settings
+    settings.configure()
+
+    from eox_core.utils import FASTHASH_ALGORITHMS, fasthash
+
+    encoded = [domain.encode('utf-8') for domain in DOMAINS]
+    calls = options.number * len(DOMAINS)
+
+    candidates = []
+    for name, hash_function in sorted(FASTHASH_ALGORITHMS.items()):
+        try:
+            hash_function(b'')
+        except (TypeError, ValueError, AttributeError):
+            print('{:<20} not available'.format(name))
+            continue
+        candidates.append((name, lambda hash_function=hash_function: [hash_function(data) for data in encoded]))
+    candidates.append(('fasthash (default)', lambda: [fasthash(domain) for domain in DOMAINS]))
+
+    print('{:<20} {:>12}'.format('algorithm', 'ns/call'))
+    for name, run in candidates:
+        best = min(timeit.repeat(run, number=options.number, repeat=options.repeat))
+        print('{:<20} {:>12.1f}'.format(name, best / calls * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the MKTG_REDIRECTS lookup done by PathRedirectionMiddleware.
+
+Compares the previous implementation (normalize and compare every configured
+key on each request) against the path index, for sites with 1k and 10k rules
+and a request mix where most paths are regular LMS pages.
+
+Runs with the test settings of the plugin:
+    python benchmarks/mktg_redirects.py [--requests N]
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+import six
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eox_core.settings.test')
+
+# Paths that usually reach the middleware and are not marketing pages.
+LMS_PATHS = (
+    '/dashboard',
+    '/courses/course-v1:edX+DemoX+Demo_Course/courseware/',
+    '/courses/course-v1:edX+DemoX+Demo_Course/progress',
+    '/api/courseware/course/course-v1:edX+DemoX+Demo_Course',
+    '/login',
+    '/register',
+    '/account/settings',
+    '/u/someone',
+    '/static/images/logo.png',
+    '/xblock/resource/xblock-html/public/js/html_edit.js',
+)
+
+
+class ConfigurationHelperStub(object):
+    """
+    Serves the same site configuration on every request, as the site cache does.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def has_override_value(self, name):
+        """ Stub """
+        return name in self.values
+
+    def get_value(self, name, default=None):
+        """ Stub """
+        return self.values.get(name, default)
+
+
+def legacy_process_mktg_redirect(middleware, configuration_helper, request):
+    """
+    The lookup as it was done before the path index.
+    """
+    redirects = configuration_helper.get_value("MKTG_REDIRECTS", {})
+    path = request.path_info
+
+    for key, value in six.iteritems(redirects):
+        key = key.replace('.html', '')
+        key = '/{}'.format(key)
+        if path != key or not value:
+            continue
+        values = {key: value}
+        return middleware.redirect_always(key=key, values=values)
+    return None
+
+
+def build_requests(rules, total, hit_ratio):
+    """
+    Build the request mix: `hit_ratio` of the requests go to a configured page.
+    """
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    keys = list(rules)
+    requests = []
+    for _ in range(total):
+        if random.random() < hit_ratio:
+            path = '/{}'.format(random.choice(keys).replace('.html', ''))
+        else:
+            path = random.choice(LMS_PATHS)
+        requests.append(factory.get(path, HTTP_HOST='site.example.com'))
+    return requests
+
+
+def main():
+    """
+    Run the benchmark and print the cost per request for each number of rules.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help='requests in the mix')
+    parser.add_argument('--hit-ratio', type=float, default=0.2, help='fraction of requests to marketing pages')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements, the best one is reported')
+    options = parser.parse_args()
+
+    import django
+    django.setup()
+
+    import mock
+    from eox_core import middleware
+
+    random.seed(0)
+    print('{:>8} {:>16} {:>16} {:>9}'.format('rules', 'before us/req', 'after us/req', 'speedup'))
+    for size in (1000, 10000):
+        rules = {'page-{}.html'.format(number): '/pages/{}'.format(number) for number in range(size)}
+        helper = ConfigurationHelperStub({'MKTG_REDIRECTS': rules})
+        requests = build_requests(rules, options.requests, options.hit_ratio)
+        instance = middleware.PathRedirectionMiddleware()
+
+        def before():
+            """ Previous implementation """
+            for request in requests:
+                legacy_process_mktg_redirect(instance, helper, request)
+
+        def after():
+            """ Path index """
+            for request in requests:
+                instance.process_mktg_redirect(request)
+
+        with mock.patch.object(middleware, 'configuration_helper', helper):
+            middleware.COMPILED_REDIRECTS.clear()
+            before_time = min(timeit.repeat(before, number=1, repeat=options.repeat))
+            after_time = min(timeit.repeat(after, number=1, repeat=options.repeat))
+
+        print('{:>8} {:>16.2f} {:>16.2f} {:>8.1f}x'.format(
+            size,
+            before_time / len(requests) * 1e6,
+            after_time / len(requests) * 1e6,
+            before_time / after_time,
+        ))
+
+
+if __name__ == '__main__':
+    main()
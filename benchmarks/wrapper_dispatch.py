@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of the per-call dispatch cost of the edxapp_wrapper modules.
+
+Compares the previous dispatch (read the setting and import_module the backend
+on every call) against the backend registry. Every backend setting points to
+an in-memory stub so only the dispatch itself is measured.
+
+Usage:
+    python benchmarks/wrapper_dispatch.py [--number N]
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+import argparse
+import functools
+import os
+import sys
+import timeit
+import types
+from importlib import import_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUB_BACKEND = 'eox_core_benchmark_stub_backend'
+COURSE_ID = 'course-v1:org+course+run'
+
+# wrapper module -> (backend setting, wrapper function, backend function)
+WRAPPERS = (
+    ('users', 'EOX_CORE_USERS_BACKEND', 'get_edxapp_user', 'get_edxapp_user'),
+    ('enrollments', 'EOX_CORE_ENROLLMENT_BACKEND', 'create_enrollment', 'create_enrollment'),
+    ('pre_enrollments', 'EOX_CORE_PRE_ENROLLMENT_BACKEND', 'get_pre_enrollment', 'get_pre_enrollment'),
+    ('coursekey', 'EOX_CORE_COURSEKEY_BACKEND', 'validate_org', 'validate_org'),
+    ('courses', 'EOX_CORE_COURSES_BACKEND', 'get_first_course_key', 'get_first_course_key'),
+    ('courseware', 'EOX_CORE_COURSEWARE_BACKEND', 'get_courseware_courses', 'get_courseware_courses'),
+    ('certificates', 'EOX_CORE_CERTIFICATES_BACKEND', 'get_generated_certificate', 'get_generated_certificate'),
+    ('configuration_helpers', 'EOX_CORE_CONFIGURATION_HELPER_BACKEND',
+     'get_configuration_helper', 'get_configuration_helper'),
+    ('grades', 'EOX_CORE_GRADES_BACKEND', 'get_course_grade_factory', 'get_course_grade_factory'),
+    ('storages', 'EOX_CORE_STORAGES_BACKEND',
+     'get_edxapp_production_staticfiles_storage', 'get_edxapp_production_staticfiles_storage'),
+    ('edxmako_module', 'EDXMAKO_MODULE', 'render_to_response', 'render_to_response'),
+    ('bearer_authentication', 'EOX_CORE_BEARER_AUTHENTICATION',
+     'get_bearer_authentication', 'get_bearer_authentication'),
+)
+
+
+def _noop(*args, **kwargs):  # pylint: disable=unused-argument
+    """ Stub backend function """
+    return None
+
+
+def setup():
+    """
+    Configure django with every backend pointing to the stub module.
+    """
+    stub = types.ModuleType(str(STUB_BACKEND))
+    for _, _, _, function_name in WRAPPERS:
+        setattr(stub, function_name, _noop)
+    sys.modules[STUB_BACKEND] = stub
+
+    from django.conf import settings
+    settings.configure(**{setting: STUB_BACKEND for _, setting, _, _ in WRAPPERS})
+
+
+def legacy_dispatch(setting_name, function_name):
+    """
+    Return a callable reproducing the previous per-call dispatch.
+    """
+    from django.conf import settings
+
+    def dispatch():
+        """ Resolve the backend on every call """
+        backend_function = getattr(settings, setting_name)
+        backend = import_module(backend_function)
+        return getattr(backend, function_name)()
+    return dispatch
+
+
+def main():
+    """
+    Run the benchmark and print the cost per call for each wrapper module.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=200000, help='calls per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements, the best one is reported')
+    options = parser.parse_args()
+
+    setup()
+    from eox_core.edxapp_wrapper.registry import load_backends
+    load_backends()
+
+    print('{:<24} {:>14} {:>14} {:>9}'.format('wrapper', 'before ns/call', 'after ns/call', 'speedup'))
+    for module_name, setting_name, wrapper_name, function_name in WRAPPERS:
+        wrapper = getattr(import_module('eox_core.edxapp_wrapper.' + module_name), wrapper_name)
+        if module_name == 'coursekey':
+            wrapper = functools.partial(wrapper, COURSE_ID)
+        before = min(timeit.repeat(legacy_dispatch(setting_name, function_name),
+                                   number=options.number, repeat=options.repeat))
+        after = min(timeit.repeat(wrapper, number=options.number, repeat=options.repeat))
+        print('{:<24} {:>14.1f} {:>14.1f} {:>8.1f}x'.format(
+            module_name,
+            before / options.number * 1e9,
+            after / options.number * 1e9,
+            before / after,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 
 from django.contrib import admin
 
+from eox_core.middleware import bump_redirections_generation
 from eox_core.models import Redirection
 
 
@@ -17,6 +18,16 @@ class RedirectionAdmin(admin.ModelAdmin):
         'scheme',
     ]
     search_fields = ('target', 'domain',)
+    actions = ['refresh_redirections']
+
+    def refresh_redirections(self, request, queryset):  # pylint: disable=unused-argument
+        """
+        Make every worker reload the redirections, e.g. after rows were changed
+        with bulk operations that do not send the model signals.
+        """
+        bump_redirections_generation()
+        self.message_user(request, "The redirections will be reloaded by all the workers.")
+    refresh_redirections.short_description = "Reload the redirections on all the workers"
 
 
 admin.site.register(Redirection, RedirectionAdmin)
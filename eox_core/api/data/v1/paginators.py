@@ -2,7 +2,7 @@
 TODO: add me
 """
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class DataApiResultsSetPagination(PageNumberPagination):
@@ -12,3 +12,32 @@ class DataApiResultsSetPagination(PageNumberPagination):
     page_size = settings.DATA_API_DEF_PAGE_SIZE
     page_size_query_param = 'page_size'
     max_page_size = settings.DATA_API_MAX_PAGE_SIZE
+
+
+class DataApiCursorPagination(CursorPagination):
+    """
+    A subset of data of any queryset, positioned by a cursor instead of a page number.
+
+    Deep pages are read with a WHERE clause on the ordering fields instead of an OFFSET
+    and no COUNT(*) is done. The results are ordered by id, or by the `cursor_ordering`
+    fields of the request that the view allows in `cursor_ordering_fields`, with the id
+    as tiebreaker.
+    """
+    page_size = settings.DATA_API_DEF_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.DATA_API_MAX_PAGE_SIZE
+    ordering = ('id',)
+    ordering_query_param = 'cursor_ordering'
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering fields of the request allowed by the view, ending with the id
+        """
+        allowed_fields = getattr(view, 'cursor_ordering_fields', ())
+        ordering = [
+            field.strip() for field in request.query_params.get(self.ordering_query_param, '').split(',')
+            if field.strip().lstrip('-') in allowed_fields
+        ]
+        if not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering.append('-id' if ordering and ordering[0].startswith('-') else 'id')
+        return tuple(ordering)
@@ -0,0 +1,226 @@
+"""
+Values projections of the read-only serializers of the data-api.
+
+A projection compiles the fields of a serializer into a single values() query, joining the
+models of their sources, and renders the rows with the fields of the serializer without
+building a model instance per row. The serializer classes remain the definition of the output.
+"""
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F
+from rest_framework import fields, relations, serializers
+
+# Annotation with the object that a related object belongs to, in the queries of the many relations.
+OWNER_ANNOTATION = '_eox_core_owner_pk'
+
+COLUMN = 'column'
+INSTANCE = 'instance'
+MANY = 'many'
+
+
+class ValuesProjection(object):
+    """
+    Render the objects of a queryset like a read-only serializer does, reading them with values().
+
+    Every field is rendered in one of these ways:
+      * column: its source is a column of the model or of a model joined by a chain of single relations.
+      * instance: its source is a property or method, or it is a SerializerMethodField. A model instance
+        is built from the columns of the row, without a query, and the source is read from it.
+      * many: its source is a many relation of the model. The related objects of all the rendered rows
+        are read with one query, like a prefetch.
+    """
+
+    def __init__(self, serializer, model, extra_lookups=()):
+        self.serializer = serializer
+        self.model = model
+        self.pk_lookup = model._meta.pk.attname  # pylint: disable=protected-access
+        self.lookups = OrderedDict([(self.pk_lookup, None)])
+        self.db = None
+        self.instance_models = OrderedDict()
+        self.plan = [self.compile_field(field) for field in serializer._readable_fields]  # pylint: disable=protected-access
+        for lookup in extra_lookups:
+            self.lookups[lookup] = None
+
+    def compile_field(self, field):
+        """
+        Return how the field is rendered: its kind, the lookup of its value and the relations it goes through.
+        """
+        nested = isinstance(field, serializers.ListSerializer) or (isinstance(field, serializers.Serializer) and field.fields)
+        if nested:
+            raise ImproperlyConfigured(
+                'The nested serializer {} can not be projected'.format(field.field_name)
+            )
+
+        attrs = list(field.source_attrs)
+        if isinstance(field, relations.ManyRelatedField):
+            return self.compile_many_field(field, attrs)
+
+        model = self.model
+        prefix = []
+        guards = []
+        for attr in attrs[:-1]:
+            model_field = self.get_model_field(model, attr)
+            if model_field is None or not (model_field.many_to_one or model_field.one_to_one):
+                raise ImproperlyConfigured(
+                    'The source {} of the field {} can not be projected'.format(field.source, field.field_name)
+                )
+            prefix.append(attr)
+            # A missing reverse one to one is read as None, a null foreign key omits the field
+            pk_lookup = '__'.join(prefix + ['pk'])
+            self.lookups[pk_lookup] = None
+            guards.append((pk_lookup, model_field.concrete))
+            model = model_field.related_model
+
+        model_field = self.get_model_field(model, attrs[-1]) if attrs else None
+        if model_field is not None and model_field.concrete and not model_field.is_relation:
+            lookup = '__'.join(prefix + [attrs[-1]])
+            self.lookups[lookup] = None
+            return (field, COLUMN, lookup, guards)
+
+        instance_prefix = '__'.join(prefix)
+        if instance_prefix not in self.instance_models:
+            self.instance_models[instance_prefix] = model
+            for lookup in self.get_instance_lookups(instance_prefix, model):
+                self.lookups[lookup] = None
+        return (field, INSTANCE, (instance_prefix, attrs[-1:]), guards)
+
+    def compile_many_field(self, field, attrs):
+        """
+        Many relations are only projected from the model of the serializer.
+        """
+        model_field = self.get_model_field(self.model, attrs[0]) if len(attrs) == 1 else None
+        if model_field is None or not (model_field.one_to_many or model_field.many_to_many):
+            raise ImproperlyConfigured(
+                'The source {} of the field {} can not be projected'.format(field.source, field.field_name)
+            )
+        if model_field.concrete:
+            query_name = model_field.related_query_name()
+        else:
+            query_name = model_field.field.name
+        return (field, MANY, (model_field.related_model, query_name), [])
+
+    @staticmethod
+    def get_model_field(model, attr):
+        """
+        The field of the model named attr, or the relation whose accessor is attr, like usersignupsource_set.
+        None if attr is neither.
+        """
+        try:
+            return model._meta.get_field(attr)  # pylint: disable=protected-access
+        except FieldDoesNotExist:
+            pass
+        for related_object in model._meta.related_objects:  # pylint: disable=protected-access
+            if related_object.get_accessor_name() == attr:
+                return related_object
+        return None
+
+    @staticmethod
+    def get_instance_lookups(prefix, model):
+        """
+        Lookups of the columns needed to build an instance of the model
+        """
+        return [
+            '__'.join(filter(None, [prefix, model_field.attname]))
+            for model_field in model._meta.concrete_fields  # pylint: disable=protected-access
+        ]
+
+    def get_queryset(self, queryset):
+        """
+        The values() queryset with the columns of the projection
+        """
+        self.db = queryset.db
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def render(self, rows):
+        """
+        Return the serialized data of the rows of the values() queryset
+        """
+        rows = list(rows)
+        related_objects = self.get_related_objects(rows)
+        return [self.render_row(row, related_objects) for row in rows]
+
+    def get_related_objects(self, rows):
+        """
+        Read the objects of the many relations of the rows with a query per relation, grouped by row.
+        """
+        pks = [row[self.pk_lookup] for row in rows]
+        related_objects = {}
+        for field, kind, source, _ in self.plan:
+            if kind != MANY:
+                continue
+            related_model, query_name = source
+            objects_by_owner = {}
+            if pks:
+                queryset = related_model._default_manager.filter(  # pylint: disable=protected-access
+                    **{'{}__in'.format(query_name): pks}
+                ).annotate(**{OWNER_ANNOTATION: F(query_name)})
+                for related_object in queryset:
+                    objects_by_owner.setdefault(getattr(related_object, OWNER_ANNOTATION), []).append(related_object)
+            related_objects[field.field_name] = objects_by_owner
+        return related_objects
+
+    def render_row(self, row, related_objects):
+        """
+        Serialize a row like Serializer.to_representation does with the instance
+        """
+        data = OrderedDict()
+        instances = {}
+        for field, kind, source, guards in self.plan:
+            try:
+                attribute = self.get_attribute(row, field, kind, source, guards, instances, related_objects)
+            except fields.SkipField:
+                continue
+            if attribute is None:
+                data[field.field_name] = None
+            else:
+                data[field.field_name] = field.to_representation(attribute)
+        return data
+
+    def get_attribute(self, row, field, kind, source, guards, instances, related_objects):  # pylint: disable=too-many-arguments
+        """
+        The value of the field for the row, as field.get_attribute would return it for the instance.
+        """
+        for pk_lookup, omitted in guards:
+            if row[pk_lookup] is None:
+                if omitted:
+                    return self.get_missing_attribute(field)
+                return None
+
+        if kind == COLUMN:
+            return row[source]
+        if kind == MANY:
+            return related_objects[field.field_name].get(row[self.pk_lookup], [])
+
+        prefix, attrs = source
+        if prefix not in instances:
+            instances[prefix] = self.build_instance(row, prefix)
+        try:
+            return fields.get_attribute(instances[prefix], attrs)
+        except (KeyError, AttributeError):
+            return self.get_missing_attribute(field)
+
+    def build_instance(self, row, prefix):
+        """
+        Model instance of the relation prefix with the columns of the row
+        """
+        model = self.instance_models[prefix]
+        lookups = self.get_instance_lookups(prefix, model)
+        return model.from_db(
+            self.db,
+            [model_field.attname for model_field in model._meta.concrete_fields],  # pylint: disable=protected-access
+            [row[lookup] for lookup in lookups],
+        )
+
+    @staticmethod
+    def get_missing_attribute(field):
+        """
+        Value of a read only field whose source is not found, as in Field.get_attribute
+        """
+        if field.default is not fields.empty:
+            return field.get_default()
+        if field.allow_null:
+            return None
+        raise fields.SkipField()
@@ -0,0 +1,186 @@
+"""
+Files of the data-api reports.
+
+The reports are written as gzip compressed NDJSON or csv files in the private storage of
+DATA_API_REPORTS_STORAGE, by parts that are concatenated when all of them are written.
+The files have random names and are only served by the report download view.
+"""
+import csv
+import gzip
+import json
+import logging
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+
+import six
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.storage import get_storage_class
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+LOG = logging.getLogger(__name__)
+
+REPORT_FORMATS = ('ndjson', 'csv')
+
+
+class ReportsStorageNotConfigured(APIException):
+    """
+    The grades reports can not be written until DATA_API_REPORTS_STORAGE is set
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The grades reports are not available: DATA_API_REPORTS_STORAGE is not configured.'
+    default_code = 'reports_storage_not_configured'
+
+
+class Echo(object):
+    """
+    File-like object that returns what is written, to stream the lines of a csv writer
+    """
+
+    def write(self, value):
+        """
+        Return the line instead of storing it
+        """
+        return value
+
+
+def get_csv_value(value):
+    """
+    Value of a csv cell: empty for None and JSON for nested values
+    """
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=JSONEncoder)
+    return value
+
+
+def write_csv_row(writer, row):
+    """
+    Csv line of the row. The csv module of python 2 only handles bytes, so the text cells are encoded as utf-8.
+    """
+    if six.PY2:
+        row = [value.encode('utf-8') if isinstance(value, six.text_type) else value for value in row]
+        return writer.writerow(row).decode('utf-8')
+    return writer.writerow(row)
+
+
+def get_reports_storage():
+    """
+    The storage of DATA_API_REPORTS_STORAGE. The reports have personal data, so they are
+    never written in a storage that was not configured for them.
+    """
+    storage_class = getattr(settings, 'DATA_API_REPORTS_STORAGE', None)
+    if not storage_class:
+        raise ImproperlyConfigured('DATA_API_REPORTS_STORAGE must be set to a private storage to write the reports')
+    return get_storage_class(storage_class)()
+
+
+def get_report_name(report_format, part=None):
+    """
+    Random name in the storage of the file of a report, or of one of its parts
+    """
+    if part is None:
+        file_name = '{}.{}.gz'.format(uuid.uuid4().hex, report_format)
+    else:
+        file_name = '{}.part-{:05d}.{}.gz'.format(uuid.uuid4().hex, part, report_format)
+    return '{}/{}'.format(getattr(settings, 'DATA_API_REPORTS_DIR', 'eox_core/data_api_reports'), file_name)
+
+
+def get_report_lines(rows, report_format, fields):
+    """
+    Yield the lines of the rows: a JSON object per row, or the fields of every row in csv.
+    """
+    if report_format == 'csv':
+        writer = csv.writer(Echo())
+        for row in rows:
+            yield write_csv_row(writer, [get_csv_value(row.get(field)) for field in fields])
+    else:
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder) + '\n'
+
+
+def write_report_part(part, rows, report_format, fields):
+    """
+    Write the rows of a part of a report as a gzip file and return its name in the storage
+    """
+    return save_report_file(
+        get_report_name(report_format, part),
+        lambda report_file: write_gzip_lines(report_file, get_report_lines(rows, report_format, fields)),
+    )[0]
+
+
+def merge_report_parts(part_names, report_format, fields):
+    """
+    Concatenate the gzip files of the parts of a report in the file of the report, deleting the parts.
+
+    Returns the name of the file of the report in the storage and its size.
+    """
+    storage = get_reports_storage()
+
+    def write_parts(report_file):
+        """
+        A csv header and the parts, one by one. Concatenated gzip members are a valid gzip file.
+        """
+        if report_format == 'csv':
+            write_gzip_lines(report_file, [write_csv_row(csv.writer(Echo()), fields)])
+        for part_name in part_names:
+            with storage.open(part_name, 'rb') as part_file:
+                shutil.copyfileobj(part_file, report_file)
+
+    name, size = save_report_file(get_report_name(report_format), write_parts)
+    for part_name in part_names:
+        storage.delete(part_name)
+    return name, size
+
+
+def save_report_file(name, write):
+    """
+    Save in the storage the file written by write in a local temporary file. Returns its name and size.
+    """
+    with tempfile.TemporaryFile() as temp_file:
+        write(temp_file)
+        size = temp_file.tell()
+        temp_file.seek(0)
+        return get_reports_storage().save(name, File(temp_file)), size
+
+
+def write_gzip_lines(file_object, lines):
+    """
+    Write the lines in the file as a gzip member
+    """
+    with gzip.GzipFile(fileobj=file_object, mode='wb') as gzip_file:
+        for line in lines:
+            gzip_file.write(line.encode('utf-8'))
+
+
+def delete_expired_reports():
+    """
+    Delete the report files older than DATA_API_REPORTS_RETENTION_DAYS, including the parts of the failed reports.
+
+    Returns the names of the deleted files.
+    """
+    storage = get_reports_storage()
+    directory = getattr(settings, 'DATA_API_REPORTS_DIR', 'eox_core/data_api_reports')
+    expiration = timezone.now() - timedelta(days=getattr(settings, 'DATA_API_REPORTS_RETENTION_DAYS', 7))
+
+    try:
+        file_names = storage.listdir(directory)[1]
+    except OSError:
+        # No report was written yet
+        return []
+
+    deleted = []
+    for file_name in file_names:
+        name = '{}/{}'.format(directory, file_name)
+        if storage.get_modified_time(name) < expiration:
+            storage.delete(name)
+            deleted.append(name)
+    LOG.info('Deleted %s expired data API reports', len(deleted))
+    return deleted
@@ -104,8 +104,13 @@ class CourseEnrollmentWithGradesSerializer(CourseEnrollmentSerializer):  # pylin
 
     def get_grades(self, obj):
         """
-        TODO: add me
+        Grade summary of the enrollment. The grades read in bulk can be passed in the 'grades'
+        context, by enrollment id, to avoid reading them one by one.
         """
+        grades = self.context.get('grades')
+        if grades is not None and obj.id in grades:
+            return grades[obj.id]
+
         grade_factory = get_course_grade_factory()
         course = get_courseware_courses().get_course_by_id(obj.course_id)
         user = obj.user
@@ -1,27 +1,188 @@
 """
 TODO: add me
 """
-from celery import Task
+from collections import OrderedDict
+from datetime import timedelta
 
+from celery import Task, chord
+from django.conf import settings
+from django.http import QueryDict
+from django.utils import timezone
+
+from eox_core.edxapp_wrapper.courseware import get_courseware_courses
+from eox_core.edxapp_wrapper.grades import get_course_grade_factory
 from eox_core.edxapp_wrapper.users import get_course_enrollment
 
+from .filters import CourseEnrollmentFilter
+from .reports import merge_report_parts, write_report_part
 from .serializers import CourseEnrollmentWithGradesSerializer
 
 
+class EnrollmentsGradesReport(Task):
+    """
+    Dispatch the grades report of the enrollments that match the filters of the request
+    """
+
+    def run(self, query_string, org_filters=None, report_id=None, report_format='ndjson', *args, **kwargs):  # pylint: disable=unused-argument, keyword-arg-before-vararg
+        """
+        Split the enrollments in shards of a single course and at most DATA_API_GRADES_REPORT_CHUNK_SIZE
+        enrollments and read the grades of every shard in a chord. Every shard writes a part of the report
+        file, and a task with the id of the report merges them.
+        """
+        queryset = get_report_enrollments(query_string, org_filters)
+        shards = get_enrollment_shards(queryset, getattr(settings, 'DATA_API_GRADES_REPORT_CHUNK_SIZE', 500))
+
+        routing_key = settings.GRADES_DOWNLOAD_ROUTING_KEY
+        merge = MergeEnrollmentsGrades().s(report_id=report_id, report_format=report_format).set(
+            task_id=report_id,
+            routing_key=routing_key,
+        )
+        if shards:
+            chord(
+                EnrollmentsGrades().s(
+                    enrollment_ids=shard,
+                    report_id=report_id,
+                    part=part,
+                    report_format=report_format,
+                ).set(routing_key=routing_key)
+                for part, shard in enumerate(shards)
+            )(merge)
+        else:
+            merge.apply_async(args=([],))
+
+        return {
+            "report_id": report_id,
+            "shards": len(shards),
+        }
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """
+        Store the failure under the id of the report too, whose task is never sent when the dispatch fails
+        """
+        report_id = kwargs.get('report_id')
+        if report_id:
+            self.backend.mark_as_failure(report_id, exc, traceback=einfo.traceback)
+
+
+class MergeEnrollmentsGrades(Task):
+    """
+    Merge the parts of a grades report
+    """
+
+    def run(self, shard_results, report_id=None, report_format='ndjson', *args, **kwargs):  # pylint: disable=unused-argument, keyword-arg-before-vararg
+        """
+        Concatenate the parts written by the shards in the report file, in the order of the shards,
+        and return the metadata of the report, downloaded from the report download view.
+        """
+        name, size = merge_report_parts(
+            [shard_result["part"] for shard_result in shard_results],
+            report_format,
+            list(CourseEnrollmentWithGradesSerializer().fields),
+        )
+        retention_days = getattr(settings, 'DATA_API_REPORTS_RETENTION_DAYS', 7)
+
+        return {
+            "report": {
+                "name": name,
+                "format": report_format,
+                "compression": "gzip",
+                "count": sum(shard_result["count"] for shard_result in shard_results),
+                "size": size,
+                "expires": (timezone.now() + timedelta(days=retention_days)).isoformat(),
+            },
+        }
+
+
 class EnrollmentsGrades(Task):
     """
     TODO: add me
     """
 
-    def run(self, data, *args, **kwargs):  # pylint: disable=unused-argument
+    def run(self, data=None, enrollment_ids=None, report_id=None, part=None, report_format='ndjson', *args, **kwargs):  # pylint: disable=unused-argument, keyword-arg-before-vararg, too-many-arguments
         """
-        This task receives a list with enrollments, and returns the same
-        enrollments with grades data
+        This task receives a list with enrollments, or their ids, and returns the same
+        enrollments with grades data. The shards of a report write them in a part of the
+        report file instead, and return its name.
         """
 
-        enrollments_ids = [el["id"] for el in data]
-        enrollments_queryset = get_course_enrollment().objects.filter(id__in=enrollments_ids)
+        enrollments_ids = enrollment_ids if enrollment_ids is not None else [el["id"] for el in data]
+        enrollments = list(get_course_enrollment().objects.filter(id__in=enrollments_ids).select_related('user'))
+
+        serializer = CourseEnrollmentWithGradesSerializer(
+            enrollments,
+            many=True,
+            context={'grades': get_enrollments_grades(enrollments)},
+        )
+
+        if report_id is None:
+            return serializer.data
+
+        return {
+            "part": write_report_part(part, serializer.data, report_format, list(serializer.child.fields)),
+            "count": len(enrollments),
+        }
+
+
+def get_report_enrollments(query_string, org_filters=None):
+    """
+    Return the enrollments that match the filters of a grades report request.
+
+    org_filters are the orgs the enrollments are restricted to, None when they are not restricted.
+    """
+    # The viewsets dispatch the reports, so they can not be imported at load time
+    from .viewsets import CourseEnrollmentWithGradesViewset  # pylint: disable=import-outside-toplevel, cyclic-import
+
+    viewset = CourseEnrollmentWithGradesViewset()
+    queryset = CourseEnrollmentFilter(QueryDict(query_string), queryset=viewset.queryset.all()).qs
+    if org_filters is not None:
+        queryset = viewset.filter_queryset_by_orgs(queryset, org_filters)
+    return queryset
+
+
+def get_enrollment_shards(queryset, chunk_size):
+    """
+    Return lists with the ids of the enrollments of the queryset, all of the same course and at most chunk_size.
+    """
+    shards = []
+    shard_course_id = None
+    for enrollment_id, course_id in queryset.order_by('course_id', 'id').values_list('id', 'course_id').iterator():
+        if not shards or course_id != shard_course_id or len(shards[-1]) >= chunk_size:
+            shards.append([])
+            shard_course_id = course_id
+        shards[-1].append(enrollment_id)
+    return shards
+
+
+def get_enrollments_grades(enrollments):
+    """
+    Return the grade summaries of the enrollments by id.
+
+    Every course is loaded once and the grades of its users are read together with the bulk
+    iteration of the grade factory. The grades are read one by one when the factory has no
+    bulk iteration, and for the users whose bulk read failed.
+    """
+    grade_factory = get_course_grade_factory()()
+    courses = get_courseware_courses()
+
+    enrollments_by_course = OrderedDict()
+    for enrollment in enrollments:
+        enrollments_by_course.setdefault(enrollment.course_id, []).append(enrollment)
+
+    grades = {}
+    for course_id, course_enrollments in enrollments_by_course.items():
+        course = courses.get_course_by_id(course_id)
+
+        course_grades = {}
+        if hasattr(grade_factory, 'iter'):
+            users = [enrollment.user for enrollment in course_enrollments]
+            for user, course_grade, error in grade_factory.iter(users, course=course):
+                if error is None:
+                    course_grades[user.id] = course_grade
 
-        serializer = CourseEnrollmentWithGradesSerializer(enrollments_queryset, many=True)
+        for enrollment in course_enrollments:
+            course_grade = course_grades.get(enrollment.user_id)
+            if course_grade is None:
+                course_grade = grade_factory.read(enrollment.user, course)
+            grades[enrollment.id] = course_grade.summary
 
-        return serializer.data
+    return grades
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test module for the paginators of the data API
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from mock import MagicMock
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from eox_core.api.data.v1.paginators import DataApiCursorPagination, DataApiResultsSetPagination
+from eox_core.api.data.v1.viewsets import UsersViewSet
+
+
+class DataApiCursorPaginationTest(TestCase):
+    """ Tests for the cursor pagination of the data API """
+
+    def setUp(self):
+        """ setup """
+        super(DataApiCursorPaginationTest, self).setUp()
+        self.users = [
+            User.objects.create(username='user_{}'.format(number), email='user_{}@example.com'.format(number))
+            for number in range(5)
+        ]
+        self.view = MagicMock(cursor_ordering_fields=('date_joined',))
+
+    def get_request(self, url, params):
+        """ Build a DRF request """
+        return Request(APIRequestFactory().get(url, params))
+
+    def paginate(self, request):
+        """ Return the page of users and the paginator """
+        paginator = DataApiCursorPagination()
+        page = paginator.paginate_queryset(User.objects.all(), request, view=self.view)
+        return page, paginator
+
+    def test_pages_follow_the_cursor(self):
+        """ Test that the pages are ordered by id and linked by cursor without counting """
+        page, paginator = self.paginate(self.get_request('/data-api/v1/users/', {'page_size': 2}))
+
+        self.assertEqual(page, self.users[:2])
+        response = paginator.get_paginated_response([])
+        self.assertNotIn('count', response.data)
+        self.assertIn('cursor=', response.data['next'])
+
+        next_page, _ = self.paginate(self.get_request('/data-api/v1/users/', {
+            'page_size': 2,
+            'cursor': response.data['next'].split('cursor=')[1].split('&')[0],
+        }))
+        self.assertEqual(next_page, self.users[2:4])
+
+    def test_ordering_fields(self):
+        """ Test that only the fields allowed by the view are used, with the id as tiebreaker """
+        request = self.get_request('/data-api/v1/users/', {'cursor_ordering': '-date_joined,username'})
+        self.assertEqual(DataApiCursorPagination().get_ordering(request, None, self.view), ('-date_joined', '-id'))
+
+        request = self.get_request('/data-api/v1/users/', {})
+        self.assertEqual(DataApiCursorPagination().get_ordering(request, None, self.view), ('id',))
+
+    def test_pagination_is_selected_per_request(self):
+        """ Test that the viewsets use the cursor pagination when the request asks for it """
+        view = UsersViewSet()
+        view.request = self.get_request('/data-api/v1/users/', {'pagination': 'cursor'})
+        self.assertIsInstance(view.paginator, DataApiCursorPagination)
+
+        view = UsersViewSet()
+        view.request = self.get_request('/data-api/v1/users/', {})
+        self.assertIsInstance(view.paginator, DataApiResultsSetPagination)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test module for the values projections of the data API serializers
+"""
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from eox_core.api.data.v1.fields import CustomRelatedField
+from eox_core.api.data.v1.projections import ValuesProjection
+from eox_core.api.data.v1.viewsets import DataApiViewSet
+
+
+class ProjectedUserSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with columns, a callable source, a method field and a many relation """
+    id = serializers.IntegerField(read_only=True)  # pylint: disable=invalid-name
+    username = serializers.CharField(read_only=True)
+    date_joined = serializers.DateTimeField(read_only=True)
+    full_name = serializers.CharField(source='get_full_name', read_only=True)
+    initial = serializers.SerializerMethodField()
+    group_names = CustomRelatedField(source='groups', field='name', many=True)
+
+    def get_initial(self, obj):
+        """ Value computed from the instance """
+        return obj.username[0]
+
+
+class ProjectedPermissionSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with sources through a foreign key """
+    codename = serializers.CharField(read_only=True)
+    app_label = serializers.CharField(source='content_type.app_label', read_only=True)
+    model_name = serializers.CharField(source='content_type.name', read_only=True)
+
+
+class ProjectedContentTypeSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with the reverse accessor of a foreign key as source """
+    model = serializers.CharField(read_only=True)
+    permissions = CustomRelatedField(source='permission_set', field='codename', many=True)
+
+
+class ProjectedUsersViewSet(DataApiViewSet):  # pylint: disable=too-many-ancestors
+    """ Data API viewset over the users of the test database, read with a values projection """
+    serializer_class = ProjectedUserSerializer
+    queryset = User.objects.all().order_by('id')
+    filter_backends = ()
+    values_projection = True
+
+
+class ValuesProjectionTest(TestCase):
+    """ Tests for ValuesProjection """
+
+    def setUp(self):
+        """ setup """
+        super(ValuesProjectionTest, self).setUp()
+        staff = Group.objects.create(name='staff')
+        Group.objects.create(name='empty')
+        for number in range(3):
+            user = User.objects.create(username='user_{}'.format(number), first_name='First', last_name=str(number))
+            if number:
+                user.groups.add(staff)
+
+    def test_same_data_as_the_serializer(self):
+        """ Test that the projection renders the same data the serializer renders from the instances """
+        queryset = User.objects.order_by('id')
+        projection = ValuesProjection(ProjectedUserSerializer(), User)
+
+        with self.assertNumQueries(2):
+            data = projection.render(projection.get_queryset(queryset))
+
+        self.assertEqual(data, ProjectedUserSerializer(queryset, many=True).data)
+        self.assertEqual(data[1]['group_names'], ['staff'])
+        self.assertEqual(data[1]['full_name'], 'First 1')
+
+    def test_sources_through_relations(self):
+        """ Test that the columns of the related models are joined in the same query """
+        queryset = Permission.objects.select_related('content_type').order_by('id')
+        projection = ValuesProjection(ProjectedPermissionSerializer(), Permission)
+
+        with self.assertNumQueries(1):
+            data = projection.render(projection.get_queryset(queryset))
+
+        self.assertEqual(data, ProjectedPermissionSerializer(queryset, many=True).data)
+
+    def test_reverse_accessors(self):
+        """ Test that the many relations read by their reverse accessor, like permission_set, are projected """
+        queryset = ContentType.objects.order_by('id')
+        projection = ValuesProjection(ProjectedContentTypeSerializer(), ContentType)
+
+        with self.assertNumQueries(2):
+            data = projection.render(projection.get_queryset(queryset))
+
+        self.assertEqual(data, ProjectedContentTypeSerializer(queryset, many=True).data)
+        self.assertTrue(any(row['permissions'] for row in data))
+
+    def test_nested_serializers_are_not_projected(self):
+        """ Test that serializers with nested fields can not be projected """
+        class NestedSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+            """ Serializer with a nested serializer """
+            permissions = ProjectedPermissionSerializer(source='user_permissions', many=True, read_only=True)
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesProjection(NestedSerializer(), User)
+
+    def test_list(self):
+        """ Test that the projected viewsets list the same data with both paginations """
+        admin = User.objects.create(username='admin', is_staff=True)
+        view = ProjectedUsersViewSet.as_view({'get': 'list'})
+        expected = ProjectedUserSerializer(User.objects.order_by('id'), many=True).data
+
+        request = APIRequestFactory().get('/data-api/v1/users/')
+        force_authenticate(request, user=admin)
+        response = view(request)
+        self.assertEqual(response.data['results'], expected)
+
+        request = APIRequestFactory().get('/data-api/v1/users/', {'pagination': 'cursor', 'page_size': 2})
+        force_authenticate(request, user=admin)
+        response = view(request)
+        self.assertEqual(response.data['results'], expected[:2])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_list_without_projection(self):
+        """ Test that the viewsets read the instances when their serializer can not be projected """
+        class NestedSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+            """ Serializer with a nested serializer """
+            username = serializers.CharField(read_only=True)
+            permissions = ProjectedPermissionSerializer(source='user_permissions', many=True, read_only=True)
+
+        admin = User.objects.create(username='admin', is_staff=True)
+        request = APIRequestFactory().get('/data-api/v1/users/')
+        force_authenticate(request, user=admin)
+
+        response = ProjectedUsersViewSet.as_view({'get': 'list'}, serializer_class=NestedSerializer)(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0], {'username': 'user_0', 'permissions': []})
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test module for the report files of the data API
+"""
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from mock import MagicMock, patch
+from rest_framework.test import APIClient
+
+from eox_core.api.data.v1.reports import (
+    delete_expired_reports,
+    get_reports_storage,
+    merge_report_parts,
+    write_report_part,
+)
+
+
+class ReportsTest(TestCase):
+    """ Tests for the report files written in the reports storage """
+
+    def setUp(self):
+        """ setup """
+        super(ReportsTest, self).setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = self.settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL='/media/',
+            DATA_API_REPORTS_STORAGE='django.core.files.storage.FileSystemStorage',
+            DATA_API_REPORTS_DIR='reports',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def read_report(self, name):
+        """ Uncompressed content of a report file """
+        with get_reports_storage().open(name, 'rb') as report_file:
+            return gzip.GzipFile(fileobj=io.BytesIO(report_file.read())).read().decode('utf-8')
+
+    def write_parts(self, report_format):
+        """ Write two parts of a report """
+        fields = ['id', 'grades']
+        return [
+            write_report_part(0, [{'id': 1, 'grades': {'percent': 0.5}}], report_format, fields),
+            write_report_part(1, [{'id': 2, 'grades': None}], report_format, fields),
+        ]
+
+    def test_ndjson_report(self):
+        """ Test that the parts are concatenated in a single gzip file and deleted """
+        part_names = self.write_parts('ndjson')
+
+        name, size = merge_report_parts(part_names, 'ndjson', ['id', 'grades'])
+
+        self.assertRegexpMatches(name, r'^reports/[0-9a-f]{32}\.ndjson\.gz$')
+        self.assertEqual(size, get_reports_storage().size(name))
+        self.assertEqual(
+            self.read_report(name).splitlines(),
+            ['{"id": 1, "grades": {"percent": 0.5}}', '{"id": 2, "grades": null}'],
+        )
+        for part_name in part_names:
+            self.assertFalse(get_reports_storage().exists(part_name))
+
+    def test_csv_report(self):
+        """ Test that the csv reports have a header and JSON nested values """
+        name, _ = merge_report_parts(self.write_parts('csv'), 'csv', ['id', 'grades'])
+
+        self.assertEqual(
+            self.read_report(name).splitlines(),
+            ['id,grades', '1,"{""percent"": 0.5}"', '2,'],
+        )
+
+    def test_delete_expired_reports(self):
+        """ Test that only the files older than the retention are deleted """
+        self.assertEqual(delete_expired_reports(), [])
+        expired_name, recent_name = self.write_parts('ndjson')
+        expired_time = time.time() - 8 * 24 * 60 * 60
+        os.utime(get_reports_storage().path(expired_name), (expired_time, expired_time))
+
+        with self.settings(DATA_API_REPORTS_RETENTION_DAYS=7):
+            deleted = delete_expired_reports()
+
+        self.assertEqual(deleted, [expired_name])
+        self.assertTrue(get_reports_storage().exists(recent_name))
+
+    def test_reports_storage_is_required(self):
+        """ Test that the reports are not written in a storage that was not configured for them """
+        with self.settings(DATA_API_REPORTS_STORAGE=None):
+            with self.assertRaises(ImproperlyConfigured):
+                get_reports_storage()
+
+    @patch('eox_core.api.data.v1.views.reverse', return_value='/data-api/v1/reports/report/download')
+    @patch('eox_core.api.data.v1.views.AsyncResult')
+    def test_task_status_hides_the_file(self, m_async_result, _):
+        """ Test that the status of a report task links to the download view instead of the file """
+        m_async_result.return_value = MagicMock(
+            state='SUCCESS',
+            result={'report': {'name': 'reports/report.ndjson.gz', 'count': 2}},
+        )
+
+        response = APIClient().get('/data-api/v1/tasks/report')
+
+        self.assertEqual(
+            response.data['result']['report'],
+            {'count': 2, 'download_url': 'http://testserver/data-api/v1/reports/report/download'},
+        )
+
+    @patch('eox_core.api.data.v1.views.AsyncResult')
+    def test_download(self, m_async_result):
+        """ Test that the file of a report is only served to the admins """
+        name, _ = merge_report_parts(self.write_parts('ndjson'), 'ndjson', ['id', 'grades'])
+        m_async_result.return_value = MagicMock(result={'report': {'name': name, 'format': 'ndjson'}})
+        client = APIClient()
+
+        client.force_authenticate(user=User.objects.create(username='student'))
+        self.assertEqual(client.get('/data-api/v1/reports/report/download').status_code, 403)
+
+        client.force_authenticate(user=User.objects.create(username='admin', is_staff=True))
+        response = client.get('/data-api/v1/reports/report/download')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="report.ndjson.gz"')
+        content = gzip.GzipFile(fileobj=io.BytesIO(b''.join(response.streaming_content))).read().decode('utf-8')
+        self.assertEqual(content, self.read_report(name))
+
+    @patch('eox_core.api.data.v1.views.AsyncResult')
+    def test_download_unfinished_report(self, m_async_result):
+        """ Test that there is nothing to download before the report is written """
+        m_async_result.return_value = MagicMock(result=None)
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create(username='admin', is_staff=True))
+
+        self.assertEqual(client.get('/data-api/v1/reports/report/download').status_code, 404)
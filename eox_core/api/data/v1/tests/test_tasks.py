@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test module for the celery tasks of the data API
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from mock import MagicMock, patch
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from eox_core.api.data.v1.tasks import (
+    EnrollmentsGradesReport,
+    MergeEnrollmentsGrades,
+    get_enrollment_shards,
+    get_enrollments_grades,
+)
+from eox_core.api.data.v1.viewsets import CourseEnrollmentWithGradesViewset
+
+
+class EnrollmentsGradesReportTest(TestCase):
+    """ Tests for the sharded grades report """
+
+    @patch('eox_core.api.data.v1.viewsets.reverse', return_value='/data-api/v1/tasks/report')
+    @patch.object(CourseEnrollmentWithGradesViewset, 'enforce_microsite_filter_qset', side_effect=lambda qs: qs)
+    @patch.object(EnrollmentsGradesReport, 'apply_async')
+    def test_view_dispatches_the_filters(self, m_apply_async, *_):
+        """ Test that the view sends the filters of the request instead of the enrollments """
+        admin = User.objects.create(username='admin', is_staff=True)
+        request = APIRequestFactory().get('/data-api/v1/enrollments-with-grades/', {'course_id': 'course-v1:o+c+r'})
+        force_authenticate(request, user=admin)
+
+        with self.settings(GRADES_DOWNLOAD_ROUTING_KEY='grades', EOX_CORE_USER_ENABLE_MULTI_TENANCY=True,
+                           course_org_filter={'org'},
+                           DATA_API_REPORTS_STORAGE='django.core.files.storage.FileSystemStorage'):
+            response = CourseEnrollmentWithGradesViewset.as_view({'get': 'list'})(request)
+
+        self.assertEqual(response.status_code, 202)
+        m_apply_async.assert_called_once_with(
+            kwargs={
+                'query_string': 'course_id=course-v1%3Ao%2Bc%2Br',
+                'org_filters': ['org'],
+                'report_id': response.data['task_id'],
+                'report_format': 'ndjson',
+            },
+            task_id=response.data['task_id'] + '-dispatch',
+            routing_key='grades',
+        )
+
+    @patch.object(EnrollmentsGradesReport, 'apply_async')
+    def test_view_validates_the_format(self, m_apply_async):
+        """ Test that only the supported report formats are accepted """
+        admin = User.objects.create(username='admin', is_staff=True)
+        request = APIRequestFactory().get('/data-api/v1/enrollments-with-grades/', {'report_format': 'xml'})
+        force_authenticate(request, user=admin)
+
+        with self.settings(EOX_CORE_USER_ENABLE_MULTI_TENANCY=False):
+            response = CourseEnrollmentWithGradesViewset.as_view({'get': 'list'})(request)
+
+        self.assertEqual(response.status_code, 400)
+        m_apply_async.assert_not_called()
+
+    @patch.object(EnrollmentsGradesReport, 'apply_async')
+    def test_view_requires_the_reports_storage(self, m_apply_async):
+        """ Test that the reports are unavailable until their storage is configured """
+        admin = User.objects.create(username='admin', is_staff=True)
+        request = APIRequestFactory().get('/data-api/v1/enrollments-with-grades/')
+        force_authenticate(request, user=admin)
+
+        with self.settings(EOX_CORE_USER_ENABLE_MULTI_TENANCY=False, DATA_API_REPORTS_STORAGE=None):
+            response = CourseEnrollmentWithGradesViewset.as_view({'get': 'list'})(request)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('DATA_API_REPORTS_STORAGE', response.data['detail'])
+        m_apply_async.assert_not_called()
+
+    def test_shards(self):
+        """ Test that the shards have enrollments of a single course and at most the chunk size """
+        queryset = MagicMock()
+        queryset.order_by.return_value.values_list.return_value.iterator.return_value = [
+            (1, 'course-v1:org+course+run'),
+            (2, 'course-v1:org+course+run'),
+            (3, 'course-v1:org+course+run'),
+            (4, 'course-v1:org+other+run'),
+        ]
+
+        self.assertEqual(get_enrollment_shards(queryset, 2), [[1, 2], [3], [4]])
+
+    @patch('eox_core.api.data.v1.tasks.chord')
+    @patch('eox_core.api.data.v1.tasks.get_enrollment_shards', return_value=[[1, 2], [3]])
+    @patch('eox_core.api.data.v1.tasks.get_report_enrollments')
+    def test_shards_are_read_in_a_chord(self, m_get_report_enrollments, _, m_chord):
+        """ Test that a task per shard is run in a chord merged by a task with the id of the report """
+        with self.settings(GRADES_DOWNLOAD_ROUTING_KEY='grades'):
+            result = EnrollmentsGradesReport().run('mode=audit', org_filters=['org'], report_id='data_api-report')
+
+        self.assertEqual(result['shards'], 2)
+        m_get_report_enrollments.assert_called_once_with('mode=audit', ['org'])
+        header = list(m_chord.call_args[0][0])
+        self.assertEqual([task.kwargs['enrollment_ids'] for task in header], [[1, 2], [3]])
+        self.assertEqual([task.kwargs['part'] for task in header], [0, 1])
+        merge = m_chord.return_value.call_args[0][0]
+        self.assertEqual(merge.options['task_id'], 'data_api-report')
+        self.assertEqual(merge.kwargs['report_id'], 'data_api-report')
+
+    @patch('eox_core.api.data.v1.tasks.get_report_enrollments', side_effect=ValueError('invalid filter'))
+    def test_failed_dispatch_fails_the_report(self, _):
+        """ Test that the id of the report is marked as failed when the dispatch fails """
+        task = EnrollmentsGradesReport()
+        task.backend = MagicMock()
+        kwargs = {'query_string': 'mode=audit', 'report_id': 'data_api-report'}
+
+        with self.assertRaises(ValueError) as context:
+            task.run(**kwargs)
+        task.on_failure(context.exception, 'data_api-report-dispatch', (), kwargs, MagicMock(traceback='traceback'))
+
+        task.backend.mark_as_failure.assert_called_once_with('data_api-report', context.exception, traceback='traceback')
+
+    @patch('eox_core.api.data.v1.tasks.merge_report_parts', return_value=('reports/report.ndjson.gz', 120))
+    def test_merge(self, m_merge_report_parts):
+        """ Test that the parts of the shards are merged in order and the metadata of the report returned """
+        result = MergeEnrollmentsGrades().run(
+            [{'part': 'reports/part-0', 'count': 2}, {'part': 'reports/part-1', 'count': 1}],
+            report_id='report',
+        )
+
+        self.assertEqual(m_merge_report_parts.call_args[0][:2], (['reports/part-0', 'reports/part-1'], 'ndjson'))
+        self.assertEqual(result['report']['name'], 'reports/report.ndjson.gz')
+        self.assertEqual(result['report']['count'], 3)
+        self.assertEqual(result['report']['size'], 120)
+        self.assertNotIn('url', result['report'])
+
+
+class GetEnrollmentsGradesTest(TestCase):
+    """ Tests for the grades read by the grades report task """
+
+    def setUp(self):
+        """ setup """
+        super(GetEnrollmentsGradesTest, self).setUp()
+        self.enrollments = [
+            MagicMock(id=1, user_id=10, course_id='course-v1:org+course+run'),
+            MagicMock(id=2, user_id=11, course_id='course-v1:org+other+run'),
+            MagicMock(id=3, user_id=12, course_id='course-v1:org+course+run'),
+        ]
+        for enrollment in self.enrollments:
+            enrollment.user.id = enrollment.user_id
+
+    @staticmethod
+    def grade_of(user):
+        """ Course grade whose summary is the id of the user """
+        return MagicMock(summary={'user': user.id})
+
+    @patch('eox_core.api.data.v1.tasks.get_courseware_courses')
+    @patch('eox_core.api.data.v1.tasks.get_course_grade_factory')
+    def test_courses_are_loaded_once(self, m_grade_factory, m_courses):
+        """ Test that every course is loaded once and the grades of its users read together """
+        grade_factory = m_grade_factory.return_value.return_value
+        grade_factory.iter.side_effect = lambda users, course: [
+            (user, self.grade_of(user), None) for user in users
+        ]
+
+        grades = get_enrollments_grades(self.enrollments)
+
+        self.assertEqual(grades, {1: {'user': 10}, 2: {'user': 11}, 3: {'user': 12}})
+        self.assertEqual(m_courses.return_value.get_course_by_id.call_count, 2)
+        self.assertEqual(grade_factory.iter.call_count, 2)
+        grade_factory.read.assert_not_called()
+
+    @patch('eox_core.api.data.v1.tasks.get_courseware_courses')
+    @patch('eox_core.api.data.v1.tasks.get_course_grade_factory')
+    def test_failed_bulk_reads_are_read_again(self, m_grade_factory, _):
+        """ Test that the users whose grade could not be read in bulk are read one by one """
+        grade_factory = m_grade_factory.return_value.return_value
+        grade_factory.iter.side_effect = lambda users, course: [
+            (user, None, Exception('failed')) if user.id == 12 else (user, self.grade_of(user), None)
+            for user in users
+        ]
+        grade_factory.read.side_effect = lambda user, course: self.grade_of(user)
+
+        grades = get_enrollments_grades(self.enrollments)
+
+        self.assertEqual(grades[3], {'user': 12})
+        grade_factory.read.assert_called_once()
+
+    @patch('eox_core.api.data.v1.tasks.get_courseware_courses')
+    @patch('eox_core.api.data.v1.tasks.get_course_grade_factory')
+    def test_factories_without_bulk_reads(self, m_grade_factory, m_courses):
+        """ Test that the grades are read one by one when the factory can not read them in bulk """
+        grade_factory = MagicMock(spec=['read'])
+        grade_factory.read.side_effect = lambda user, course: self.grade_of(user)
+        m_grade_factory.return_value.return_value = grade_factory
+
+        grades = get_enrollments_grades(self.enrollments)
+
+        self.assertEqual(grades, {1: {'user': 10}, 2: {'user': 11}, 3: {'user': 12}})
+        self.assertEqual(grade_factory.read.call_count, 3)
+        self.assertEqual(m_courses.return_value.get_course_by_id.call_count, 2)
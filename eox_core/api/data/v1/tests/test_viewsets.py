@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test module for the viewsets of the data API
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import Resolver404, resolve
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from eox_core.api.data.v1.viewsets import DataApiViewSet
+
+
+class ExportUserSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """ Serializer with a nested value """
+    id = serializers.IntegerField(read_only=True)  # pylint: disable=invalid-name
+    username = serializers.CharField(read_only=True)
+    groups = serializers.SerializerMethodField()
+
+    def get_groups(self, obj):
+        """ Nested value """
+        return [group.name for group in obj.groups.all()]
+
+
+class ExportUsersViewSet(DataApiViewSet):  # pylint: disable=too-many-ancestors
+    """ Data API viewset over the users of the test database """
+    serializer_class = ExportUserSerializer
+    queryset = User.objects.all().order_by('id')
+    filter_backends = ()
+    prefetch_fields = [
+        {
+            "name": "groups",
+            "type": "prefetch"
+        }
+    ]
+
+
+class DataApiExportTest(TestCase):
+    """ Tests for the export action of the data API viewsets """
+
+    def setUp(self):
+        """ setup """
+        super(DataApiExportTest, self).setUp()
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        for number in range(4):
+            User.objects.create(username='user_{}'.format(number))
+        self.view = ExportUsersViewSet.as_view({'get': 'export'})
+
+    def export(self, params):
+        """ Call the export action and return the streamed content """
+        request = APIRequestFactory().get('/data-api/v1/users/export/', params)
+        force_authenticate(request, user=self.admin)
+        with self.settings(DATA_API_EXPORT_CHUNK_SIZE=2):
+            response = self.view(request)
+            content = b''.join(response.streaming_content).decode('utf-8')
+        return response, content
+
+    def test_export_csv(self):
+        """ Test that every object is streamed as a csv row after the header """
+        response, content = self.export({})
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = content.splitlines()
+        self.assertEqual(lines[0], 'id,username,groups')
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[2], '{},user_0,[]'.format(User.objects.get(username='user_0').id))
+
+    def test_export_csv_non_ascii(self):
+        """ Test that the text cells out of ascii are streamed encoded as utf-8 """
+        user = User.objects.create(username=u'jos\xe9')
+
+        _, content = self.export({})
+
+        self.assertEqual(content.splitlines()[-1], u'{},jos\xe9,[]'.format(user.id))
+
+    def test_export_ndjson(self):
+        """ Test that every object is streamed as a JSON line """
+        response, content = self.export({'export_format': 'ndjson'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['username'] for row in rows], ['admin', 'user_0', 'user_1', 'user_2', 'user_3'])
+
+    def test_export_prefetches_every_chunk(self):
+        """ Test that the prefetches are done once per chunk instead of once per object """
+        # The users and a prefetch for each of the three chunks
+        with self.assertNumQueries(4):
+            self.export({})
+
+    def test_export_format_validation(self):
+        """ Test that only the supported formats are accepted """
+        request = APIRequestFactory().get('/data-api/v1/users/export/', {'export_format': 'xml'})
+        force_authenticate(request, user=self.admin)
+        response = self.view(request)
+        self.assertEqual(response.status_code, 400)
+
+    def test_grades_are_not_exported(self):
+        """ Test that the enrollments with grades have no export, which would stream them without grades """
+        self.assertEqual(resolve('/data-api/v1/users/export/').url_name, 'user-export')
+        with self.assertRaises(Resolver404):
+            resolve('/data-api/v1/async/course-enrollments-grades/export/')
@@ -2,10 +2,19 @@
 TODO: add me
 """
 from celery.result import AsyncResult
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse
+from django.urls import reverse
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from eox_core.edxapp_wrapper.bearer_authentication import BearerAuthentication
+
+from .reports import ReportsStorageNotConfigured, get_reports_storage
+
 
 class CeleryTasksStatus(APIView):
     """
@@ -26,6 +35,14 @@ class CeleryTasksStatus(APIView):
         result = None
         if task_res.ready():
             result = task_res.result
+            # The reports return the metadata of their file, which is only served to the admins by ReportDownload
+            if isinstance(result, dict) and "report" in result:
+                report = dict(result["report"])
+                del report["name"]
+                report["download_url"] = request.build_absolute_uri(
+                    reverse("eox-core:eox-data-api:data-api-report-download", kwargs={"task_id": task_id})
+                )
+                result = dict(result, report=report)
 
         response = {
             "state": task_res.state,
@@ -33,3 +50,32 @@ class CeleryTasksStatus(APIView):
         }
 
         return Response(response)
+
+
+class ReportDownload(APIView):
+    """
+    view to download the file of a finished report task
+    """
+    authentication_classes = (BearerAuthentication, SessionAuthentication)
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, task_id=None, *args, **kwargs):  # pylint: disable=unused-argument, keyword-arg-before-vararg
+        """
+        Stream the gzip file of the report written by the task.
+        """
+        task_res = AsyncResult(task_id)
+        result = task_res.result if task_res.successful() else None
+        if not isinstance(result, dict) or "report" not in result:
+            raise NotFound()
+
+        try:
+            storage = get_reports_storage()
+        except ImproperlyConfigured:
+            raise ReportsStorageNotConfigured()
+        if not storage.exists(result["report"]["name"]):
+            # Deleted after DATA_API_REPORTS_RETENTION_DAYS
+            raise NotFound()
+
+        response = FileResponse(storage.open(result["report"]["name"], 'rb'), content_type='application/gzip')
+        response['Content-Disposition'] = 'attachment; filename="{}.{}.gz"'.format(task_id, result["report"]["format"])
+        return response
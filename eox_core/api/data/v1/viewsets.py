@@ -1,34 +1,72 @@
 """
 Controllers for the data-api. Used in the report generation process
 """
+import csv
+import json
+import logging
 import random
 from datetime import datetime
 
+import django
 import six
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q, prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.urls import reverse
 from django_filters import rest_framework as filters
 from edx_proctoring.models import ProctoredExamStudentAttempt  # pylint: disable=import-error
 from rest_framework import mixins, status, viewsets
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 from eox_core.edxapp_wrapper.bearer_authentication import BearerAuthentication
 from eox_core.edxapp_wrapper.certificates import get_generated_certificate
 from eox_core.edxapp_wrapper.users import get_course_enrollment
 
 from .filters import CourseEnrollmentFilter, GeneratedCerticatesFilter, ProctoredExamStudentAttemptFilter, UserFilter
-from .paginators import DataApiResultsSetPagination
+from .paginators import DataApiCursorPagination, DataApiResultsSetPagination
+from .projections import ValuesProjection
+from .reports import (
+    REPORT_FORMATS,
+    Echo,
+    ReportsStorageNotConfigured,
+    get_csv_value,
+    get_reports_storage,
+    write_csv_row,
+)
 from .serializers import (
     CertificateSerializer,
     CourseEnrollmentSerializer,
     ProctoredExamStudentAttemptSerializer,
     UserSerializer,
 )
-from .tasks import EnrollmentsGrades
+from .tasks import EnrollmentsGradesReport
+
+LOG = logging.getLogger(__name__)
+
+try:
+    from rest_framework.decorators import action
+except ImportError:
+    # For the versions of rest_framework before 3.8.
+    from rest_framework.decorators import detail_route, list_route  # pylint: disable=ungrouped-imports
+
+    def action(detail, **kwargs):
+        """
+        The action decorator with the list_route and detail_route decorators it replaced
+        """
+        if detail:
+            return detail_route(**kwargs)
+        return list_route(**kwargs)
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
 
 
 class DataApiViewSet(mixins.ListModelMixin,
@@ -40,13 +78,149 @@ class DataApiViewSet(mixins.ListModelMixin,
     permission_classes = (IsAdminUser,)
 
     pagination_class = DataApiResultsSetPagination
+    # Fields besides the id that the cursor pagination can order by
+    cursor_ordering_fields = ()
     filter_backends = (filters.DjangoFilterBackend,)
     prefetch_fields = False
+    # Read the objects with a values() projection of the serializer fields instead of model instances
+    values_projection = False
     # Microsite enforcement filter settings
     enforce_microsite_filter = False
     enforce_microsite_filter_lookup_field = "test_lookup_field"
     enforce_microsite_filter_term = "org_in_course_id"
 
+    @property
+    def paginator(self):
+        """
+        The paginator of the request: by cursor when it asks for pagination=cursor, by page number otherwise
+        """
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = DataApiCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        projection = self.get_values_projection()
+        if projection is None:
+            return super(DataApiViewSet, self).list(request, *args, **kwargs)
+
+        queryset = projection.get_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.render(page))
+        return Response(projection.render(queryset))
+
+    def get_values_projection(self):
+        """
+        The values projection of the serializer, or None if the viewset reads model instances,
+        also when some field of the serializer can not be projected.
+        """
+        if not (self.values_projection and getattr(settings, 'DATA_API_VALUES_PROJECTION', True)):
+            return None
+        model = self.get_queryset().model
+        # The cursor pagination reads the position of the rows from the ordering fields
+        extra_lookups = ('id',) + tuple(self.cursor_ordering_fields)
+        try:
+            return ValuesProjection(self.get_serializer(), model, extra_lookups=extra_lookups)
+        except ImproperlyConfigured as error:
+            LOG.warning('Reading the model instances of %s: %s', self.__class__.__name__, error)
+            return None
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Stream the whole filtered queryset as csv or, with export_format=ndjson, as newline-delimited JSON
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise ValidationError(detail='export_format must be one of: {}'.format(', '.join(EXPORT_CONTENT_TYPES)))
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if export_format == 'csv':
+            content = self.stream_csv(queryset)
+        else:
+            content = self.stream_ndjson(queryset)
+
+        response = StreamingHttpResponse(content, content_type=EXPORT_CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(
+            getattr(self, 'basename', None) or 'export',
+            export_format,
+        )
+        return response
+
+    def stream_csv(self, queryset):
+        """
+        Yield the csv lines of the queryset, with a header of the serializer fields.
+        Nested values are written as JSON.
+        """
+        writer = csv.writer(Echo())
+        fields = list(self.get_serializer().fields)
+        yield write_csv_row(writer, fields)
+        for data in self.iterate_serialized(queryset):
+            yield write_csv_row(writer, [self.get_csv_value(data.get(field)) for field in fields])
+
+    def stream_ndjson(self, queryset):
+        """
+        Yield a JSON line per object of the queryset
+        """
+        for data in self.iterate_serialized(queryset):
+            yield json.dumps(data, cls=JSONEncoder) + '\n'
+
+    def iterate_serialized(self, queryset):
+        """
+        Yield the serialized data of the objects of the queryset one by one
+        """
+        projection = self.get_values_projection()
+        if projection is not None:
+            for chunk in self.iterate_chunks(projection.get_queryset(queryset)):
+                for data in projection.render(chunk):
+                    yield data
+            return
+
+        for obj in self.iterate_queryset(queryset):
+            yield self.get_serializer(obj).data
+
+    def iterate_queryset(self, queryset):
+        """
+        Iterate over the queryset in chunks of DATA_API_EXPORT_CHUNK_SIZE objects, without
+        keeping them in the queryset cache. The prefetches are run for every chunk.
+        """
+        prefetch_lookups = queryset._prefetch_related_lookups  # pylint: disable=protected-access
+        for chunk in self.iterate_chunks(queryset.prefetch_related(None)):
+            prefetch_related_objects(chunk, *prefetch_lookups)
+            for chunk_obj in chunk:
+                yield chunk_obj
+
+    @staticmethod
+    def iterate_chunks(queryset):
+        """
+        Yield the objects of the queryset in lists of DATA_API_EXPORT_CHUNK_SIZE, reading them with a server side
+        cursor where the database supports it.
+        """
+        chunk_size = getattr(settings, 'DATA_API_EXPORT_CHUNK_SIZE', 2000)
+        if django.VERSION >= (2, 0):
+            iterator = queryset.iterator(chunk_size=chunk_size)
+        else:
+            iterator = queryset.iterator()
+
+        chunk = []
+        for obj in iterator:
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def get_csv_value(value):
+        """
+        Value of a csv cell: empty for None and JSON for nested values
+        """
+        return get_csv_value(value)
+
     def get_queryset(self):
         """
         This method returns the queryset to be processed by the viewset
@@ -135,6 +309,8 @@ class UsersViewSet(DataApiViewSet):  # pylint: disable=too-many-ancestors
     serializer_class = UserSerializer
     queryset = User.objects.all()
     filter_class = UserFilter
+    values_projection = True
+    cursor_ordering_fields = ('date_joined',)
     prefetch_fields = [
         {
             "name": "profile",
@@ -154,6 +330,8 @@ class CourseEnrollmentViewset(DataApiViewSet):  # pylint: disable=too-many-ances
     serializer_class = CourseEnrollmentSerializer
     queryset = get_course_enrollment().objects.all()
     filter_class = CourseEnrollmentFilter
+    cursor_ordering_fields = ('created',)
+    values_projection = True
     # Microsite enforcement filter settings
     enforce_microsite_filter = True
     enforce_microsite_filter_lookup_field = "course__id__contains"
@@ -165,7 +343,8 @@ class CourseEnrollmentWithGradesViewset(DataApiViewSet):  # pylint: disable=too-
     A viewset for viewing Course Enrollments with grades data.
     This view will create a celery task to fetch grades data for
     enrollments in the background, and will return the id of the
-    celery task
+    celery task with the report. The grades are read in parallel
+    by shards of the enrollments and written to a report file.
     """
     serializer_class = CourseEnrollmentSerializer
     queryset = get_course_enrollment().objects.all()
@@ -174,23 +353,43 @@ class CourseEnrollmentWithGradesViewset(DataApiViewSet):  # pylint: disable=too-
     enforce_microsite_filter = True
     enforce_microsite_filter_lookup_field = "course__id__contains"
     enforce_microsite_filter_term = "org_in_course_id"
+    # The enrollments with grades are only read by the report tasks, the export would stream them without grades
+    export = None
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        # The filters are validated here, the enrollments are read by the report tasks
+        self.filter_queryset(self.get_queryset())
+        report_format = request.query_params.get('report_format', 'ndjson')
+        if report_format not in REPORT_FORMATS:
+            raise ValidationError(detail='report_format must be one of: {}'.format(', '.join(REPORT_FORMATS)))
+        # Fail before dispatching the report if there is no storage for it
+        try:
+            get_reports_storage()
+        except ImproperlyConfigured:
+            raise ReportsStorageNotConfigured()
 
         now_date = datetime.now()
         string_now_date = now_date.strftime("%Y-%m-%d-%H-%M-%S")
         randnum = random.randint(100, 999)
         task_id = "data_api-" + string_now_date + "-" + str(randnum)
 
+        org_filters = None
+        if settings.EOX_CORE_USER_ENABLE_MULTI_TENANCY:
+            org_filters = getattr(settings, 'course_org_filter', set([]))
+            if not isinstance(org_filters, six.string_types):
+                org_filters = list(org_filters)
+
         named_args = {
-            "data": serializer.data,
+            "query_string": request.query_params.urlencode(),
+            "org_filters": org_filters,
+            "report_id": task_id,
+            "report_format": report_format,
         }
 
-        task = EnrollmentsGrades().apply_async(
+        # The result of the report is the result of the task that merges its shards, with the id task_id
+        EnrollmentsGradesReport().apply_async(
             kwargs=named_args,
-            task_id=task_id,
+            task_id=task_id + "-dispatch",
             routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY
         )
 
@@ -198,7 +397,7 @@ class CourseEnrollmentWithGradesViewset(DataApiViewSet):  # pylint: disable=too-
             reverse("eox-core:eox-data-api:celery-data-api-tasks", kwargs={"task_id": task_id})
         )
         data_response = {
-            "task_id": task.id,
+            "task_id": task_id,
             "task_url": url_task_status,
         }
         return Response(data_response, status=status.HTTP_202_ACCEPTED)
@@ -210,6 +409,7 @@ class CertificateViewSet(DataApiViewSet):  # pylint: disable=too-many-ancestors
     """
     serializer_class = CertificateSerializer
     filter_class = GeneratedCerticatesFilter
+    values_projection = True
     prefetch_fields = [
         {
             "name": "user",
@@ -234,6 +434,7 @@ class ProctoredExamStudentViewSet(DataApiViewSet):  # pylint: disable=too-many-a
     serializer_class = ProctoredExamStudentAttemptSerializer
     queryset = ProctoredExamStudentAttempt.objects.all()
     filter_class = ProctoredExamStudentAttemptFilter
+    values_projection = True
     prefetch_fields = [
         {
             "name": "user",
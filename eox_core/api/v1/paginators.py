@@ -0,0 +1,14 @@
+"""
+Paginators of the API v1.
+"""
+from django.conf import settings
+from rest_framework.pagination import PageNumberPagination
+
+
+class BulkJobResultsPagination(PageNumberPagination):
+    """
+    A page of the results of a bulk job
+    """
+    page_size = getattr(settings, 'EOX_CORE_BULK_JOBS_PAGE_SIZE', 100)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'EOX_CORE_BULK_JOBS_MAX_PAGE_SIZE', 1000)
@@ -5,12 +5,14 @@ API v1 serializers.
 from __future__ import absolute_import, unicode_literals
 
 from django.conf import settings
+from django.utils import six
 from rest_framework import serializers
 
 from eox_core.edxapp_wrapper.coursekey import get_valid_course_key, validate_org
 from eox_core.edxapp_wrapper.enrollments import check_edxapp_enrollment_is_valid
 from eox_core.edxapp_wrapper.users import (
     check_edxapp_account_conflicts,
+    check_edxapp_accounts_conflicts,
     get_user_read_only_serializer,
     get_user_signup_source,
     get_username_max_length,
@@ -132,6 +134,17 @@ class EdxappUserQuerySerializer(EdxappUserSerializer):
     """
 
     activate_user = serializers.BooleanField(default=False)  # We need to allow the api to activate users later on
+    language_preference = serializers.CharField(required=False, write_only=True)
+
+
+class EdxappBulkUserQuerySerializer(EdxappUserQuerySerializer):
+    """
+    Handles the serialization of every user of a bulk creation.
+    The account conflicts are checked by the backend for the whole list at once.
+    """
+
+    def validate(self, attrs):
+        return attrs
 
 
 class EdxappEnrollmentAttributeSerializer(serializers.Serializer):
@@ -160,6 +173,34 @@ class EdxappValidatedCourseIDField(serializers.Field):
             raise serializers.ValidationError('Invalid course_id {}'.format(data))
 
 
+class EdxappCourseEnrollmentListSerializer(serializers.ListSerializer):
+    """
+    Checks the accounts of all the enrollments at once before validating every enrollment
+    """
+
+    def to_internal_value(self, data):
+        """
+        Loads the conflicts of every (username, email) pair into the child serializer
+        """
+        if isinstance(data, list):
+            self.load_account_conflicts(data)
+        return super(EdxappCourseEnrollmentListSerializer, self).to_internal_value(data)
+
+    def load_account_conflicts(self, data):
+        """
+        Checks the accounts of all the items at once, for the child serializer to validate them one by one
+        """
+        accounts = set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            account = (item.get('username'), item.get('email'))
+            if all(value is None or isinstance(value, six.string_types) for value in account):
+                accounts.add(account)
+        accounts = list(accounts)
+        self.child.account_conflicts = dict(zip(accounts, check_edxapp_accounts_conflicts(accounts)))
+
+
 class EdxappCourseEnrollmentSerializer(serializers.Serializer):
     """Serializes CourseEnrollment
 
@@ -174,11 +215,19 @@ class EdxappCourseEnrollmentSerializer(serializers.Serializer):
     enrollment_attributes = EdxappEnrollmentAttributeSerializer(many=True, default=[])
     course_id = EdxappValidatedCourseIDField()
 
+    class Meta:
+        list_serializer_class = EdxappCourseEnrollmentListSerializer
+
     def validate(self, attrs):
         """
         Check that there are no issues with enrollment
         """
-        errors = check_edxapp_enrollment_is_valid(**attrs)
+        account = (attrs.get('username'), attrs.get('email'))
+        account_conflicts = getattr(self, 'account_conflicts', {})
+        if account in account_conflicts:
+            errors = check_edxapp_enrollment_is_valid(account_conflicts=account_conflicts[account], **attrs)
+        else:
+            errors = check_edxapp_enrollment_is_valid(**attrs)
         if errors:
             raise serializers.ValidationError(", ".join(errors))
         return attrs
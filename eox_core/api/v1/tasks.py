@@ -0,0 +1,159 @@
+"""
+Celery jobs of the API v1.
+"""
+from celery import Task
+from crum import get_current_request, set_current_request
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+from edx_django_utils.cache import RequestCache  # pylint: disable=import-error
+
+from eox_core.utils import cache
+
+# State reported while a job is running, with the counts of its items as meta.
+JOB_PROGRESS = "PROGRESS"
+
+# The responses of the rows are kept in the shared cache by blocks, out of the result backend.
+JOB_RESULTS_CACHE_KEY = "eox_core.bulk_job.{}.results.{}"
+
+
+class JobResultsExpired(Exception):
+    """
+    The responses of a finished job are no longer in the cache
+    """
+
+
+def store_job_results(job_id, block, responses):
+    """
+    Keep a block of the responses of a job in the cache
+    """
+    cache.set(
+        JOB_RESULTS_CACHE_KEY.format(job_id, block),
+        responses,
+        getattr(settings, "EOX_CORE_BULK_JOBS_RESULTS_TIMEOUT", 24 * 60 * 60),
+    )
+
+
+class JobResults(object):
+    """
+    Sequence of the responses of a finished job, reading from the cache only the blocks that are sliced.
+    """
+
+    def __init__(self, job_id, length, block_size):
+        self.job_id = job_id
+        self.length = length
+        self.block_size = block_size
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(self.length)
+        if start >= stop:
+            return []
+        blocks = range(start // self.block_size, (stop - 1) // self.block_size + 1)
+        keys = [JOB_RESULTS_CACHE_KEY.format(self.job_id, block) for block in blocks]
+        cached_blocks = cache.get_many(keys)
+        if len(cached_blocks) != len(keys):
+            raise JobResultsExpired()
+        responses = [response for key in keys for response in cached_blocks[key]]
+        offset = blocks[0] * self.block_size
+        return responses[start - offset:stop - offset]
+
+
+class EdxappBulkJob(Task):
+    """
+    Base of the jobs that process a list of API items in chunks, reporting their progress.
+    """
+    job_name = None
+    # Dotted path of the API view that processes the rows of the job
+    view_class = None
+
+    def run(self, rows, site_id=None, *args, **kwargs):  # pylint: disable=unused-argument, keyword-arg-before-vararg
+        """
+        This task receives the raw items submitted to the API and the id of the
+        site they were submitted to, and returns the counts of processed and failed
+        items. The responses of all of them, in the same order, are kept in the cache
+        for EOX_CORE_BULK_JOBS_RESULTS_TIMEOUT seconds, and read with JobResults.
+        """
+        chunk_size = getattr(settings, "EOX_CORE_BULK_JOBS_CHUNK_SIZE", 100)
+        progress = {
+            "total": len(rows),
+            "processed": 0,
+            "failed": 0,
+            "remaining": len(rows),
+        }
+        results = []
+        blocks = 0
+
+        # The validations and the site helpers of edxapp read the site from the current request.
+        previous_request = get_current_request()
+        set_current_request(self.get_job_request(site_id))
+        # The courses and site settings are resolved once per job, as they are for a request.
+        # A worker runs the jobs of every site, so nothing is kept from the previous one.
+        RequestCache.clear_all_namespaces()
+        try:
+            for start in range(0, len(rows), chunk_size):
+                for row_responses in self.process_rows(rows[start:start + chunk_size]):
+                    results += row_responses
+                    progress["processed"] += 1
+                    if any("error" in response for response in row_responses):
+                        progress["failed"] += 1
+                while len(results) >= chunk_size:
+                    store_job_results(self.request.id, blocks, results[:chunk_size])
+                    results = results[chunk_size:]
+                    blocks += 1
+                progress["remaining"] = progress["total"] - progress["processed"]
+                self.report_progress(progress)
+            if results:
+                store_job_results(self.request.id, blocks, results)
+        finally:
+            set_current_request(previous_request)
+            RequestCache.clear_all_namespaces()
+
+        return dict(progress, results_count=blocks * chunk_size + len(results), results_block_size=chunk_size)
+
+    @staticmethod
+    def get_job_request(site_id):
+        """
+        Build a request bound to the site the job was submitted to
+        """
+        request = HttpRequest()
+        request.site = None
+        if site_id:
+            request.site = apps.get_model("sites", "Site").objects.filter(id=site_id).first()
+        return request
+
+    def report_progress(self, progress):
+        """
+        Store the counts of the items as the meta of the running job
+        """
+        self.update_state(state=JOB_PROGRESS, meta=progress)
+
+    def process_rows(self, rows):
+        """
+        Process the rows with the process_job_rows of the view_class of the job, imported
+        when the job runs because the views import the jobs.
+
+        Returns: The list of responses of every row, in the same order
+        """
+        return import_string(self.view_class).process_job_rows(rows)
+
+
+class EdxappBulkEnrollments(EdxappBulkJob):
+    """
+    Creates a list of enrollments submitted to the enrollment jobs API.
+    """
+    job_name = "enrollment_job"
+    view_class = "eox_core.api.v1.views.EdxappEnrollment"
+
+
+class EdxappBulkPreEnrollments(EdxappBulkJob):
+    """
+    Creates a list of whitelistings (pre-enrollments) submitted to the pre-enrollment jobs API.
+    """
+    job_name = "pre_enrollment_job"
+    view_class = "eox_core.api.v1.views.EdxappPreEnrollment"
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 """ . """
+import json
+
 from django.contrib.auth.models import User
 from django.test import TestCase
 from mock import patch
+from rest_framework.exceptions import APIException, NotFound
 from rest_framework.test import APIClient
 
 
@@ -139,6 +142,99 @@ class TestEnrollmentsAPI(TestCase):
         self.assertIn('is_active', response.data[0])
         self.assertEqual(2, len(response.data))
 
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key')
+    @patch('eox_core.api.v1.serializers.check_edxapp_enrollment_is_valid', return_value=[])
+    @patch('eox_core.api.v1.serializers.check_edxapp_accounts_conflicts')
+    @patch('eox_core.api.v1.views.get_edxapp_user')
+    @patch('eox_core.api.v1.views.update_enrollment')
+    def test_api_put_checks_accounts_at_once(self, m_update_enrollment, _, m_conflicts, m_check_enrollment, *__):
+        """ Test that the accounts of a list of enrollments are checked with a single call """
+        m_update_enrollment.return_value = {
+            'mode': 'audit',
+            'user': 'test',
+            'course_id': 'course-v1:org+course+run',
+            'is_active': True,
+        }
+        m_conflicts.side_effect = lambda accounts: [['username'] for _ in accounts]
+        params = [{
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course_2+run',
+        }, {
+            'mode': 'audit',
+            'username': 'other',
+            'course_id': 'course-v1:org+course+run',
+        }]
+
+        response = self.client.put('/api/v1/enrollment/', data=params, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        m_conflicts.assert_called_once()
+        self.assertEqual(
+            sorted(m_conflicts.call_args[0][0]),
+            [('other', None), ('test', None)],
+        )
+        self.assertEqual(m_check_enrollment.call_count, 3)
+        for call in m_check_enrollment.call_args_list:
+            self.assertEqual(call[1]['account_conflicts'], ['username'])
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=lambda course_id: course_id)
+    @patch('eox_core.api.v1.serializers.check_edxapp_enrollment_is_valid', return_value=[])
+    @patch('eox_core.api.v1.views.create_enrollment')
+    @patch('eox_core.api.v1.views.create_enrollments')
+    @patch('eox_core.api.v1.views.get_edxapp_users')
+    def test_api_post_list_in_bulk(self, m_get_users, m_create_enrollments, m_create_enrollment, *_):
+        """ Test that a list of enrollments is created in bulk, keeping a result per item """
+        user = User(username='test')
+        m_get_users.return_value = [user, NotFound('No user found'), user, user]
+        m_create_enrollments.return_value = [
+            ({'user': 'test', 'mode': 'audit', 'course_id': 'course-v1:org+course+run', 'is_active': True}, None),
+            APIException('Enrollment failed'),
+        ]
+        m_create_enrollment.return_value = (
+            [{'user': 'test', 'mode': 'audit', 'course_id': 'course-v1:org+program_course+run', 'is_active': True}],
+            [None],
+        )
+        params = [{
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'mode': 'audit',
+            'username': 'missing',
+            'course_id': 'course-v1:org+course+run',
+        }, {
+            'mode': 'audit',
+            'username': 'test',
+            'bundle_id': 'program-uuid',
+        }, {
+            'mode': 'audit',
+            'username': 'test',
+            'course_id': 'course-v1:org+course_2+run',
+        }]
+
+        response = self.client.post('/api/v1/enrollment/', data=params, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        m_get_users.assert_called_once()
+        m_create_enrollments.assert_called_once()
+        self.assertEqual(
+            [item['course_id'] for item in m_create_enrollments.call_args[0][0]],
+            ['course-v1:org+course+run', 'course-v1:org+course_2+run'],
+        )
+        self.assertEqual(response.data[0]['course_id'], 'course-v1:org+course+run')
+        self.assertEqual(response.data[1]['error'], {'detail': 'No user found'})
+        self.assertEqual(response.data[2]['course_id'], 'course-v1:org+program_course+run')
+        self.assertEqual(response.data[3]['error'], {'detail': 'Enrollment failed'})
+
     @patch_permissions
     @patch('eox_core.api.v1.views.get_edxapp_user')
     @patch('eox_core.api.v1.views.delete_enrollment')
@@ -153,3 +249,77 @@ class TestEnrollmentsAPI(TestCase):
         m_get_user.assert_called_once_with(username='test')
         m_delete_enrollment.assert_called_once_with(course_id='course-v1:org+course+run', user=m_get_user.return_value)
         self.assertEqual(response.status_code, 204)
+
+
+class TestEnrollmentsStreamAPI(TestCase):
+    """ Tests for the streaming enrollments endpoint """
+
+    patch_permissions = patch('eox_core.api.v1.permissions.EoxCoreAPIPermission.has_permission', return_value=True)
+
+    def setUp(self):
+        """ setup """
+        super(TestEnrollmentsStreamAPI, self).setUp()
+        self.api_user = User(1, 'test@example.com', 'test')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.api_user)
+
+    def post_lines(self, rows):
+        """ Post the rows as newline-delimited JSON and return the parsed lines of the response """
+        body = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+        response = self.client.post('/api/v1/enrollment/stream/', data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return [json.loads(line) for line in content.splitlines()]
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=lambda course_id: course_id)
+    @patch('eox_core.api.v1.serializers.check_edxapp_enrollment_is_valid', return_value=[])
+    @patch('eox_core.api.v1.views.create_enrollments')
+    @patch('eox_core.api.v1.views.get_edxapp_users')
+    def test_stream_in_batches(self, m_get_users, m_create_enrollments, *_):
+        """ Test that the rows are processed in batches and every row gets a result line in order """
+        m_get_users.side_effect = lambda queries: [User(username='test') for _ in queries]
+        m_create_enrollments.side_effect = lambda enrollments: [
+            ({'user': 'test', 'mode': 'audit', 'course_id': item['course_id'], 'is_active': True}, None)
+            for item in enrollments
+        ]
+        rows = [
+            {'mode': 'audit', 'username': 'test', 'course_id': 'course-v1:org+course_{}+run'.format(number)}
+            for number in range(5)
+        ]
+
+        with self.settings(EOX_CORE_ENROLLMENT_STREAM_BATCH_SIZE=2):
+            lines = self.post_lines(rows)
+
+        self.assertEqual(m_create_enrollments.call_count, 3)
+        self.assertEqual([line['course_id'] for line in lines], [row['course_id'] for row in rows])
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=lambda course_id: course_id)
+    @patch('eox_core.api.v1.serializers.check_edxapp_enrollment_is_valid', return_value=[])
+    @patch('eox_core.api.v1.views.create_enrollments')
+    @patch('eox_core.api.v1.views.get_edxapp_users')
+    def test_stream_invalid_rows(self, m_get_users, m_create_enrollments, m_check_enrollment, _, m_validate_org, *__):
+        """ Test that invalid rows get an error line without stopping the rest, validating every row once """
+        m_get_users.side_effect = lambda queries: [User(username='test') for _ in queries]
+        m_create_enrollments.side_effect = lambda enrollments: [
+            ({'user': 'test', 'mode': 'audit', 'course_id': item['course_id'], 'is_active': True}, None)
+            for item in enrollments
+        ]
+        rows = [
+            'not json',
+            {'username': 'test', 'course_id': 'course-v1:org+course+run'},
+            {'mode': 'audit', 'username': 'test', 'course_id': 'course-v1:org+course+run'},
+        ]
+
+        lines = self.post_lines(rows)
+
+        self.assertEqual(len(lines), 3)
+        self.assertIn('error', lines[0])
+        self.assertIn('mode', lines[1]['error']['detail'])
+        self.assertEqual(lines[2]['course_id'], 'course-v1:org+course+run')
+        self.assertEqual(m_validate_org.call_count, 2)
+        self.assertEqual(m_check_enrollment.call_count, 1)
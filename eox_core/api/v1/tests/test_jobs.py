@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Test module for the bulk jobs of the API v1
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from mock import MagicMock, patch
+from rest_framework.test import APIClient
+
+from eox_core.api.v1.tasks import (
+    JOB_PROGRESS,
+    EdxappBulkEnrollments,
+    EdxappBulkPreEnrollments,
+    JobResults,
+    store_job_results,
+)
+
+
+class TestBulkJobsAPI(TestCase):
+    """ Tests for the endpoints of the bulk jobs """
+
+    patch_permissions = patch('eox_core.api.v1.permissions.EoxCoreAPIPermission.has_permission', return_value=True)
+
+    def setUp(self):
+        """ setup """
+        super(TestBulkJobsAPI, self).setUp()
+        self.api_user = User(1, 'test@example.com', 'test')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.api_user)
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.reverse', return_value='/api/v1/jobs/')
+    @patch.object(EdxappBulkEnrollments, 'apply_async')
+    def test_submit_enrollment_job(self, m_apply_async, *_):
+        """ Test that the job is scheduled with the submitted items and its id is returned """
+        rows = [
+            {'username': 'test', 'course_id': 'course-v1:org+course+run', 'mode': 'audit'},
+            {'username': 'other', 'course_id': 'course-v1:org+course+run', 'mode': 'audit'},
+        ]
+
+        response = self.client.post('/api/v1/enrollment/jobs/', data=rows, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['total'], 2)
+        self.assertTrue(response.data['job_id'].startswith('enrollment_job-'))
+        m_apply_async.assert_called_once_with(
+            kwargs={'rows': rows, 'site_id': None},
+            task_id=response.data['job_id'],
+        )
+
+    @patch_permissions
+    @patch.object(EdxappBulkPreEnrollments, 'apply_async')
+    def test_submit_validation(self, m_apply_async, *_):
+        """ Test that only lists of objects below the limit are accepted """
+        response = self.client.post('/api/v1/pre-enrollment/jobs/', data={'email': 'test@example.com'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        rows = [{'email': 'test@example.com', 'course_id': 'course-v1:org+course+run'}] * 3
+        with self.settings(EOX_CORE_BULK_JOBS_MAX_ITEMS=2):
+            response = self.client.post('/api/v1/pre-enrollment/jobs/', data=rows, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        m_apply_async.assert_not_called()
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_job_in_progress(self, m_async_result, *_):
+        """ Test that the counts of a running job are reported """
+        progress = {'total': 10, 'processed': 4, 'failed': 1, 'remaining': 6}
+        m_async_result.return_value = MagicMock(state=JOB_PROGRESS, info=progress)
+
+        response = self.client.get('/api/v1/jobs/enrollment_job-1234/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['state'], JOB_PROGRESS)
+        self.assertEqual(response.data['processed'], 4)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['remaining'], 6)
+        self.assertNotIn('results', response.data)
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_finished_job_results_are_paged(self, m_async_result, *_):
+        """ Test that the results of a finished job are returned by pages """
+        results = [{'username': 'user_{}'.format(number)} for number in range(5)]
+        store_job_results('pre_enrollment_job-1234', 0, results[:3])
+        store_job_results('pre_enrollment_job-1234', 1, results[3:])
+        m_async_result.return_value = MagicMock(
+            state='SUCCESS',
+            result={
+                'total': 5, 'processed': 5, 'failed': 0, 'remaining': 0,
+                'results_count': 5, 'results_block_size': 3,
+            },
+        )
+        m_async_result.return_value.successful.return_value = True
+
+        response = self.client.get('/api/v1/jobs/pre_enrollment_job-1234/', {'page': 2, 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['processed'], 5)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(response.data['results'], results[2:4])
+        self.assertIn('page=3', response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_expired_results(self, m_async_result, *_):
+        """ Test that the results no longer cached are not found """
+        m_async_result.return_value = MagicMock(
+            state='SUCCESS',
+            result={'total': 5, 'processed': 5, 'failed': 0, 'remaining': 0, 'results_count': 5, 'results_block_size': 3},
+        )
+        m_async_result.return_value.successful.return_value = True
+
+        response = self.client.get('/api/v1/jobs/pre_enrollment_job-expired/')
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_other_tasks_are_not_found(self, m_async_result, *_):
+        """ Test that only the bulk jobs can be read """
+        response = self.client.get('/api/v1/jobs/data_api-2020-01-01-00-00-00-123/')
+
+        self.assertEqual(response.status_code, 404)
+        m_async_result.assert_not_called()
+
+
+class EdxappBulkJobTest(TestCase):
+    """ Tests for the celery tasks of the bulk jobs """
+
+    @patch.object(EdxappBulkEnrollments, 'request', MagicMock(id='enrollment_job-1234'))
+    @patch.object(EdxappBulkEnrollments, 'report_progress')
+    @patch.object(EdxappBulkEnrollments, 'process_rows')
+    def test_rows_are_processed_in_chunks(self, m_process_rows, m_report_progress):
+        """ Test that the items are processed by chunks, counting the failed ones """
+        m_process_rows.side_effect = lambda rows: [
+            [{'error': {'detail': 'failed'}}] if row.get('fail') else [dict(row)] for row in rows
+        ]
+        rows = [{'username': 'user_{}'.format(number), 'fail': number == 1} for number in range(5)]
+        with self.settings(EOX_CORE_BULK_JOBS_CHUNK_SIZE=2):
+            result = EdxappBulkEnrollments().run(rows=rows)
+
+        self.assertEqual(m_process_rows.call_count, 3)
+        self.assertEqual(m_report_progress.call_count, 3)
+        self.assertEqual(result['processed'], 5)
+        self.assertEqual(result['failed'], 1)
+        self.assertEqual(result['remaining'], 0)
+        self.assertNotIn('results', result)
+        results = JobResults('enrollment_job-1234', result['results_count'], result['results_block_size'])
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[1], {'error': {'detail': 'failed'}})
+        # A slice across the blocks of the cache
+        self.assertEqual(results[1:4], [{'error': {'detail': 'failed'}}, rows[2], rows[3]])
+
+    @patch.object(EdxappBulkPreEnrollments, 'request', MagicMock(id='pre_enrollment_job-1234'))
+    @patch.object(EdxappBulkPreEnrollments, 'report_progress')
+    @patch('eox_core.api.v1.views.create_pre_enrollments')
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=lambda course_id: course_id)
+    def test_pre_enrollment_rows(self, _, __, m_create_pre_enrollments, ___):
+        """ Test that invalid pre-enrollments are reported without stopping the job """
+        m_create_pre_enrollments.side_effect = lambda pre_enrollments: [
+            (MagicMock(**item), True, []) for item in pre_enrollments
+        ]
+        rows = [
+            {'email': 'not an email', 'course_id': 'course-v1:org+course+run'},
+            {'email': 'test@example.com', 'course_id': 'course-v1:org+course+run'},
+        ]
+
+        result = EdxappBulkPreEnrollments().run(rows=rows)
+        results = JobResults('pre_enrollment_job-1234', result['results_count'], result['results_block_size'])
+
+        self.assertEqual(result['processed'], 2)
+        self.assertEqual(result['failed'], 1)
+        self.assertIn('email', results[0]['error']['detail'])
+        self.assertEqual(results[1]['email'], 'test@example.com')
+        self.assertEqual(results[1]['status'], 'created')
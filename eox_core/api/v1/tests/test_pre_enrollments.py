@@ -5,7 +5,7 @@ Test module for PreEnrollments under the open-release/hawthorn.beta1 tag
 """
 from django.contrib.auth.models import User
 from django.test import TestCase
-from mock import patch
+from mock import MagicMock, patch
 from rest_framework.test import APIClient
 
 
@@ -194,3 +194,33 @@ class PreEnrollmentsAPITest(TestCase):
             email='test@example.com',
             course_id='course-v1:org+course+run'
         )
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.validate_org')
+    @patch('eox_core.api.v1.serializers.get_valid_course_key', side_effect=lambda course_id: course_id)
+    @patch('eox_core.api.v1.views.create_pre_enrollments')
+    def test_api_post_list_in_bulk(self, m_create_pre_enrollments, *_):
+        """ Test that a list of pre-enrollments is created at once, reporting the status of every row """
+        m_create_pre_enrollments.return_value = [
+            (MagicMock(email='new@example.com', course_id='course-v1:org+course+run', auto_enroll=True), True, []),
+            (
+                MagicMock(email='old@example.com', course_id='course-v1:org+missing+run', auto_enroll=False),
+                False,
+                ['Course with course_id:course-v1:org+missing+run does not exist'],
+            ),
+        ]
+        rows = [
+            {'email': 'new@example.com', 'course_id': 'course-v1:org+course+run', 'auto_enroll': True},
+            {'email': 'invalid', 'course_id': 'course-v1:org+course+run'},
+            {'email': 'old@example.com', 'course_id': 'course-v1:org+missing+run', 'auto_enroll': False},
+        ]
+
+        response = self.client.post(self.url, data=rows, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        m_create_pre_enrollments.assert_called_once()
+        self.assertEqual(len(m_create_pre_enrollments.call_args[0][0]), 2)
+        self.assertEqual(response.data[0]['status'], 'created')
+        self.assertIn('email', response.data[1]['error']['detail'])
+        self.assertEqual(response.data[2]['status'], 'existing')
+        self.assertEqual(response.data[2]['warning'], ['Course with course_id:course-v1:org+missing+run does not exist'])
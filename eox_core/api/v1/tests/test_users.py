@@ -4,7 +4,7 @@ Test module for users viewset.
 from django.contrib.auth.models import User
 from django.test import TestCase
 from django.urls import reverse
-from mock import patch
+from mock import MagicMock, patch
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -75,3 +75,171 @@ class UsersUpdaterAPITest(TestCase):
         self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
         self.assertEqual(response.content, '{"detail":["You can\'t update users with roles like staff or superuser."]}'
                          .encode())
+
+
+class BulkUsersAPITest(TestCase):
+    """Test class for the bulk creation of users."""
+
+    patch_permissions = patch('eox_core.api.v1.permissions.EoxCoreAPIPermission.has_permission', return_value=True)
+
+    def setUp(self):
+        """Setup method for test class."""
+        self.user = User(username="test", email="test@example.com", password="testtest")
+        self.client = APIClient()
+        self.url = reverse("eox-api:eox-api:edxapp-user")
+        self.client.force_authenticate(user=self.user)
+        self.users_data = [
+            {
+                "email": "first@example.com",
+                "username": "first",
+                "password": "p4ssw0rd",
+                "fullname": "First User",
+            },
+            {
+                "email": "second@example.com",
+                "username": "second",
+                "password": "p4ssw0rd",
+                "fullname": "Second User",
+            },
+        ]
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.create_edxapp_users')
+    def test_bulk_create_success(self, create_edxapp_users, _):
+        """The created users are returned in the same order as requested."""
+        create_edxapp_users.return_value = [
+            (User(username="first", email="first@example.com"), []),
+            (User(username="second", email="second@example.com"), ["No comments_service_user was created"]),
+        ]
+
+        response = self.client.post(self.url, data=self.users_data, format="json")
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(create_edxapp_users.call_count, 1)
+        self.assertEqual(len(create_edxapp_users.call_args[0][0]), 2)
+        self.assertEqual([item["username"] for item in response.data], ["first", "second"])
+        self.assertEqual(response.data[1]["messages"], ["No comments_service_user was created"])
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.reverse', return_value='/api/v1/user/side-effects/')
+    @patch('eox_core.api.v1.views.transaction.on_commit', side_effect=lambda callback: callback())
+    @patch('eox_core.api.v1.views.EdxappUserSideEffects')
+    @patch('eox_core.api.v1.views.create_edxapp_users')
+    def test_bulk_create_with_deferred_side_effects(self, create_edxapp_users, side_effects_task, *_):
+        """The deferred steps of the created users keep their language preference."""
+        self.users_data[0]["language_preference"] = "es-419"
+        create_edxapp_users.return_value = [
+            (User(id=10, username="first", email="first@example.com"), []),
+            (None, ["Conflict"]),
+        ]
+
+        with self.settings(EOX_CORE_USER_CREATION_ASYNC=True):
+            self.client.post(self.url, data=self.users_data, format="json")
+
+        side_effects_task.return_value.apply_async.assert_called_once()
+        self.assertEqual(
+            side_effects_task.return_value.apply_async.call_args[1]["kwargs"],
+            {"users": [{"user_id": 10, "language_preference": "es-419"}]},
+        )
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.create_edxapp_users')
+    def test_bulk_create_with_errors(self, create_edxapp_users, _):
+        """The failed items carry the error and the response is accepted instead of ok."""
+        create_edxapp_users.return_value = [
+            (User(username="first", email="first@example.com"), []),
+            (None, ["Fatal: account collition with the provided: username"]),
+        ]
+
+        response = self.client.post(self.url, data=self.users_data, format="json")
+
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+        self.assertEqual(response.data[1], {
+            "username": "second",
+            "email": "second@example.com",
+            "error": {"detail": ["Fatal: account collition with the provided: username"]},
+        })
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.create_edxapp_users')
+    def test_bulk_create_too_many_users(self, create_edxapp_users, _):
+        """Lists larger than EOX_CORE_BULK_USERS_MAX_ITEMS are rejected."""
+        with self.settings(EOX_CORE_BULK_USERS_MAX_ITEMS=1):
+            response = self.client.post(self.url, data=self.users_data, format="json")
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        create_edxapp_users.assert_not_called()
+
+
+class DeferredSideEffectsAPITest(TestCase):
+    """Test class for the users created with deferred side effects."""
+
+    patch_permissions = patch('eox_core.api.v1.permissions.EoxCoreAPIPermission.has_permission', return_value=True)
+
+    def setUp(self):
+        """Setup method for test class."""
+        self.user = User(username="test", email="test@example.com", password="testtest")
+        self.client = APIClient()
+        self.url = reverse("eox-api:eox-api:edxapp-user")
+        self.client.force_authenticate(user=self.user)
+
+    @patch_permissions
+    @patch('eox_core.api.v1.serializers.check_edxapp_account_conflicts', return_value=[])
+    @patch('eox_core.api.v1.views.reverse', return_value='/api/v1/user/side-effects/')
+    @patch('eox_core.api.v1.views.transaction.on_commit', side_effect=lambda callback: callback())
+    @patch('eox_core.api.v1.views.EdxappUserSideEffects')
+    @patch('eox_core.api.v1.views.create_edxapp_user')
+    def test_create_with_deferred_side_effects(self, create_edxapp_user, side_effects_task, *_):
+        """The response carries the task that runs the deferred steps."""
+        created_user = User(id=10, username="first", email="first@example.com")
+        create_edxapp_user.return_value = (created_user, [])
+        user_data = {
+            "email": "first@example.com",
+            "username": "first",
+            "password": "p4ssw0rd",
+            "fullname": "First User",
+            "language_preference": "es-419",
+        }
+
+        with self.settings(EOX_CORE_USER_CREATION_ASYNC=True):
+            response = self.client.post(self.url, data=user_data, format="json")
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertTrue(create_edxapp_user.call_args[1]["defer_side_effects"])
+        task_id = response.data["side_effects_task"]["task_id"]
+        side_effects_task.return_value.apply_async.assert_called_once_with(
+            kwargs={"users": [{"user_id": 10, "language_preference": "es-419"}]},
+            task_id=task_id,
+        )
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_side_effects_status(self, m_async_result, *_):
+        """The callers of the user API read the state of the deferred steps."""
+        m_async_result.return_value = MagicMock(state="SUCCESS", result={"10": ["Could not set the language"]})
+        m_async_result.return_value.successful.return_value = True
+
+        response = self.client.get("/api/v1/user/side-effects/user_side_effects-1234/")
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(response.data["state"], "SUCCESS")
+        self.assertEqual(response.data["errors"], {"10": ["Could not set the language"]})
+        m_async_result.assert_called_once_with("user_side_effects-1234")
+
+    @patch_permissions
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_side_effects_status_of_other_tasks(self, m_async_result, *_):
+        """Only the tasks of the deferred steps can be read."""
+        response = self.client.get("/api/v1/user/side-effects/enrollment_job-1234/")
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+        m_async_result.assert_not_called()
+
+    @patch('eox_core.api.v1.views.AsyncResult')
+    def test_side_effects_status_permission(self, m_async_result):
+        """The state is read with the permission of the user API."""
+        with patch('eox_core.api.v1.permissions.EoxCoreAPIPermission.has_permission', return_value=False):
+            response = self.client.get("/api/v1/user/side-effects/user_side_effects-1234/")
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+        m_async_result.assert_not_called()
@@ -9,8 +9,17 @@ app_name = 'eox_core'  # pylint: disable=invalid-name
 
 urlpatterns = [  # pylint: disable=invalid-name
     url(r'^user/$', views.EdxappUser.as_view(), name='edxapp-user'),
+    url(
+        r'^user/side-effects/(?P<task_id>[\w-]+)/$',
+        views.EdxappUserSideEffectsStatus.as_view(),
+        name='edxapp-user-side-effects-status',
+    ),
     url(r'^enrollment/$', views.EdxappEnrollment.as_view(), name='edxapp-enrollment'),
+    url(r'^enrollment/stream/$', views.EdxappEnrollmentStream.as_view(), name='edxapp-enrollment-stream'),
+    url(r'^enrollment/jobs/$', views.EdxappEnrollmentJob.as_view(), name='edxapp-enrollment-job'),
     url(r'^pre-enrollment/$', views.EdxappPreEnrollment.as_view(), name='edxapp-pre-enrollment'),
+    url(r'^pre-enrollment/jobs/$', views.EdxappPreEnrollmentJob.as_view(), name='edxapp-pre-enrollment-job'),
+    url(r'^jobs/(?P<job_id>[\w-]+)/$', views.EdxappBulkJobStatus.as_view(), name='edxapp-bulk-job-status'),
     url(r'^userinfo/$', views.UserInfo.as_view(), name='edxapp-userinfo'),
 ]
 
@@ -4,20 +4,30 @@ API v1 views.
 
 from __future__ import absolute_import, unicode_literals
 
+import json
 import logging
+import uuid
 
+from celery.result import AsyncResult
+from crum import get_current_request, set_current_request
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.utils import six
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.exceptions import APIException, NotFound, ValidationError
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
+from eox_core.api.v1.paginators import BulkJobResultsPagination
 from eox_core.api.v1.permissions import EoxCoreAPIPermission
 from eox_core.api.v1.serializers import (
+    EdxappBulkUserQuerySerializer,
     EdxappCourseEnrollmentQuerySerializer,
     EdxappCourseEnrollmentSerializer,
     EdxappCoursePreEnrollmentSerializer,
@@ -26,15 +36,30 @@ from eox_core.api.v1.serializers import (
     EdxappUserSerializer,
     WrittableEdxappUserSerializer,
 )
+from eox_core.api.v1.tasks import (
+    JOB_PROGRESS,
+    EdxappBulkEnrollments,
+    EdxappBulkPreEnrollments,
+    JobResults,
+    JobResultsExpired,
+)
 from eox_core.edxapp_wrapper.bearer_authentication import BearerAuthentication
-from eox_core.edxapp_wrapper.enrollments import create_enrollment, delete_enrollment, get_enrollment, update_enrollment
+from eox_core.edxapp_wrapper.enrollments import (
+    create_enrollment,
+    create_enrollments,
+    delete_enrollment,
+    get_enrollment,
+    update_enrollment,
+)
 from eox_core.edxapp_wrapper.pre_enrollments import (
     create_pre_enrollment,
+    create_pre_enrollments,
     delete_pre_enrollment,
     get_pre_enrollment,
     update_pre_enrollment,
 )
-from eox_core.edxapp_wrapper.users import create_edxapp_user, get_edxapp_user
+from eox_core.edxapp_wrapper.users import create_edxapp_user, create_edxapp_users, get_edxapp_user, get_edxapp_users
+from eox_core.tasks import EdxappUserSideEffects
 
 LOG = logging.getLogger(__name__)
 
@@ -110,18 +135,100 @@ class EdxappUser(UserQueryMixin, APIView):
         """
         Creates the users on edxapp
         """
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+
         serializer = EdxappUserQuerySerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         data['site'] = get_current_site(request)
+        data['defer_side_effects'] = getattr(settings, 'EOX_CORE_USER_CREATION_ASYNC', False)
         user, msg = create_edxapp_user(**data)
 
         serialized_user = EdxappUserSerializer(user)
         response_data = serialized_user.data
         if msg:
             response_data["messages"] = msg
+        if user and data['defer_side_effects']:
+            response_data["side_effects_task"] = self.defer_side_effects(
+                request,
+                [(user, data.get('language_preference'))],
+            )
         return Response(response_data)
 
+    def bulk_create(self, request):
+        """
+        Creates a list of users on edxapp, answering with the result of every item in the same order
+        """
+        max_items = getattr(settings, 'EOX_CORE_BULK_USERS_MAX_ITEMS', 1000)
+        if len(request.data) > max_items:
+            raise ValidationError(detail='No more than {} users can be created per request'.format(max_items))
+
+        serializer = EdxappBulkUserQuerySerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        defer_side_effects = getattr(settings, 'EOX_CORE_USER_CREATION_ASYNC', False)
+        results = create_edxapp_users(
+            serializer.validated_data,
+            site=get_current_site(request),
+            defer_side_effects=defer_side_effects,
+        )
+        side_effects_task = None
+        if defer_side_effects:
+            created_users = [
+                (user, user_query.get('language_preference'))
+                for user_query, (user, _) in zip(serializer.validated_data, results)
+                if user is not None
+            ]
+            if created_users:
+                side_effects_task = self.defer_side_effects(request, created_users)
+
+        response_data = []
+        errors_in_bulk_response = False
+        for user_query, (user, msg) in zip(serializer.validated_data, results):
+            if user is None:
+                errors_in_bulk_response = True
+                response_data.append({
+                    'username': user_query['username'],
+                    'email': user_query['email'],
+                    'error': {'detail': msg},
+                })
+                continue
+            data = EdxappUserSerializer(user).data
+            if msg:
+                data["messages"] = msg
+            if side_effects_task:
+                data["side_effects_task"] = side_effects_task
+            response_data.append(data)
+
+        response_status = status.HTTP_200_OK
+        if errors_in_bulk_response:
+            response_status = status.HTTP_202_ACCEPTED
+        return Response(response_data, status=response_status)
+
+    @staticmethod
+    def defer_side_effects(request, users):
+        """
+        Schedules the deferred steps of the creation of `users`, a list of
+        (user, language_preference) pairs, for when the transaction commits,
+        returning the id and status url of the task.
+        """
+        task_id = "{}-{}".format(EdxappUserSideEffects.task_name, uuid.uuid4())
+        task_kwargs = {
+            "users": [
+                {"user_id": user.id, "language_preference": language_preference}
+                for user, language_preference in users
+            ],
+        }
+        transaction.on_commit(lambda: EdxappUserSideEffects().apply_async(kwargs=task_kwargs, task_id=task_id))
+
+        url_task_status = request.build_absolute_uri(
+            reverse("eox-core:eox-api:eox-api:edxapp-user-side-effects-status", kwargs={"task_id": task_id})
+        )
+        return {
+            "task_id": task_id,
+            "task_url": url_task_status,
+        }
+
     def get(self, request, *args, **kwargs):
         """
         Retrieve an user from edxapp
@@ -199,26 +306,57 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         user = get_edxapp_user(**user_query)
 
         enrollments, msgs = create_enrollment(user, **kwargs)
-        # This logic block is needed to convert a single bundle_id enrollment in a list
-        # of course_id enrollments which are appended to the response individually
-        if not isinstance(enrollments, list):
-            enrollments = [enrollments]
-            msgs = [msgs]
-        response_data = []
-        for enrollment, msg in zip(enrollments, msgs):
-            data = EdxappCourseEnrollmentSerializer(enrollment).data
-            if msg:
-                data["messages"] = msg
-            response_data.append(data)
-
-        return response_data
+        return EdxappEnrollment.serialize_enrollments(enrollments, msgs)
+
+    def bulk_enrollment_create(self, enrollment_queries):
+        """
+        Handle a list of creates at once. The users are fetched together and the course
+        enrollments are validated and written in bulk, while the bundle_id ones are
+        created one at the time.
+
+        Returns the result of every query: its response data or the APIException it raised.
+        """
+        users = get_edxapp_users([
+            self.get_user_query(None, query_params=enrollment_query) for enrollment_query in enrollment_queries
+        ])
+
+        results = [None] * len(enrollment_queries)
+        course_enrollments = []
+        course_indexes = []
+        for index, (enrollment_query, user) in enumerate(zip(enrollment_queries, users)):
+            if isinstance(user, APIException):
+                results[index] = user
+            elif enrollment_query.get('bundle_id'):
+                try:
+                    results[index] = EdxappEnrollment.serialize_enrollments(
+                        *create_enrollment(user, **enrollment_query)
+                    )
+                except APIException as error:
+                    results[index] = error
+            else:
+                course_enrollment = dict(enrollment_query)
+                course_enrollment['user'] = user
+                course_enrollments.append(course_enrollment)
+                course_indexes.append(index)
+
+        for index, result in zip(course_indexes, create_enrollments(course_enrollments)):
+            if isinstance(result, APIException):
+                results[index] = result
+            else:
+                results[index] = EdxappEnrollment.serialize_enrollments(*result)
+
+        return results
 
     def post(self, request, *args, **kwargs):
         """
         Handle creation of single or bulk enrollments
         """
         data = request.data
-        return EdxappEnrollment.prepare_multiresponse(data, self.single_enrollment_create)
+        return EdxappEnrollment.prepare_multiresponse(
+            data,
+            self.single_enrollment_create,
+            bulk_action_method=self.bulk_enrollment_create,
+        )
 
     def single_enrollment_update(self, *args, **kwargs):
         """
@@ -280,17 +418,36 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @staticmethod
-    def prepare_multiresponse(request_data, action_method):
+    def serialize_enrollments(enrollments, msgs):
+        """
+        Serialize the enrollments returned by the backend with their messages
+        """
+        # This logic block is needed to convert a single bundle_id enrollment in a list
+        # of course_id enrollments which are appended to the response individually
+        if not isinstance(enrollments, list):
+            enrollments = [enrollments]
+            msgs = [msgs]
+        response_data = []
+        for enrollment, msg in zip(enrollments, msgs):
+            data = EdxappCourseEnrollmentSerializer(enrollment).data
+            if msg:
+                data["messages"] = msg
+            response_data.append(data)
+
+        return response_data
+
+    @staticmethod
+    def prepare_multiresponse(request_data, action_method, bulk_action_method=None):
         """
         Prepare a multiple part response according to the request_data and the action_method provided
         Args:
             request_data: Data dictionary containing the query o queries to be processed
             action_method: Function to be applied to the queries (create, update)
+            bulk_action_method: Optional function to be applied to a list of queries at once,
+                returning the result or the APIException of every query
 
         Returns: List of responses
         """
-        multiple_responses = []
-        errors_in_bulk_response = False
         many = isinstance(request_data, list)
         serializer = EdxappCourseEnrollmentQuerySerializer(data=request_data, many=many)
         serializer.is_valid(raise_exception=True)
@@ -298,21 +455,11 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         if not isinstance(data, list):
             data = [data]
 
-        for enrollment_query in data:
-
-            try:
-                result = action_method(**enrollment_query)
-                # The result can be a list if the enrollment was in a bundle
-                if isinstance(result, list):
-                    multiple_responses += result
-                else:
-                    multiple_responses.append(result)
-            except APIException as error:
-                errors_in_bulk_response = True
-                enrollment_query["error"] = {
-                    "detail": error.detail,
-                }
-                multiple_responses.append(enrollment_query)
+        multiple_responses, errors_in_bulk_response = EdxappEnrollment.process_queries(
+            data,
+            action_method,
+            bulk_action_method if many else None,
+        )
 
         if many or 'bundle_id' in request_data:
             response = multiple_responses
@@ -324,6 +471,96 @@ class EdxappEnrollment(UserQueryMixin, APIView):
             response_status = status.HTTP_202_ACCEPTED
         return Response(response, status=response_status)
 
+    @staticmethod
+    def process_queries(enrollment_queries, action_method, bulk_action_method=None):
+        """
+        Apply the action_method, or the bulk_action_method if provided, to validated enrollment queries
+
+        Returns: List of responses and whether any of the queries failed
+        """
+        multiple_responses = []
+        errors_in_bulk_response = False
+        results = EdxappEnrollment.apply_action(enrollment_queries, action_method, bulk_action_method)
+        for enrollment_query, result in zip(enrollment_queries, results):
+            errors_in_bulk_response = errors_in_bulk_response or isinstance(result, APIException)
+            multiple_responses += EdxappEnrollment.get_result_responses(enrollment_query, result)
+
+        return multiple_responses, errors_in_bulk_response
+
+    @staticmethod
+    def apply_action(enrollment_queries, action_method, bulk_action_method=None):
+        """
+        Returns: The result of every query or the APIException it raised
+        """
+        if bulk_action_method:
+            return bulk_action_method(enrollment_queries)
+
+        results = []
+        for enrollment_query in enrollment_queries:
+            try:
+                results.append(action_method(**enrollment_query))
+            except APIException as error:
+                results.append(error)
+        return results
+
+    @staticmethod
+    def get_result_responses(enrollment_query, result):
+        """
+        Returns: List of responses for the result of a query
+        """
+        if isinstance(result, APIException):
+            enrollment_query["error"] = {
+                "detail": result.detail,
+            }
+            return [enrollment_query]
+        # The result can be a list if the enrollment was in a bundle
+        if isinstance(result, list):
+            return result
+        return [result]
+
+    @classmethod
+    def process_job_rows(cls, rows):
+        """
+        Create the enrollments of a chunk of a bulk job with the bulk engine of the enrollment API
+        """
+        view = cls()
+        view.site = get_current_request().site
+        return view.process_rows(rows, view.single_enrollment_create, view.bulk_enrollment_create)
+
+    def process_rows(self, rows, action_method, bulk_action_method=None):
+        """
+        Validate raw enrollment rows one by one and apply the action to the valid ones
+
+        Returns: The list of responses of every row, in the same order
+        """
+        responses = [None] * len(rows)
+        valid_indexes = []
+        for index, row in enumerate(rows):
+            if isinstance(row, APIException):
+                responses[index] = [{"error": {"detail": row.detail}}]
+            else:
+                valid_indexes.append(index)
+
+        # The accounts of the batch are checked at once and every row is validated a single time
+        serializer = EdxappCourseEnrollmentQuerySerializer(many=True)
+        serializer.load_account_conflicts([rows[index] for index in valid_indexes])
+        enrollment_queries = []
+        query_indexes = []
+        for index in valid_indexes:
+            try:
+                enrollment_queries.append(serializer.child.run_validation(rows[index]))
+            except ValidationError as error:
+                responses[index] = [dict(rows[index], error={"detail": error.detail})]
+            else:
+                query_indexes.append(index)
+
+        if enrollment_queries:
+            results = EdxappEnrollment.apply_action(enrollment_queries, action_method, bulk_action_method)
+            for index, enrollment_query, result in zip(query_indexes, enrollment_queries, results):
+                responses[index] = EdxappEnrollment.get_result_responses(enrollment_query, result)
+
+        return responses
+
     def handle_exception(self, exc):
         """
         Handle exception: log it
@@ -334,6 +571,82 @@ class EdxappEnrollment(UserQueryMixin, APIView):
         return super(EdxappEnrollment, self).handle_exception(exc)
 
 
+class EdxappEnrollmentStream(EdxappEnrollment):
+    """
+    Handles bulk enrollment requests sent as newline-delimited JSON, one enrollment per line.
+
+    The lines are processed in batches of EOX_CORE_ENROLLMENT_STREAM_BATCH_SIZE and the
+    result of every enrollment is streamed back as newline-delimited JSON.
+    """
+    http_method_names = ['post', 'put', 'options']
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle creation of a stream of enrollments
+        """
+        return self.stream_multiresponse(request, self.single_enrollment_create, self.bulk_enrollment_create)
+
+    def put(self, request, *args, **kwargs):
+        """
+        Update a stream of enrollments on edxapp
+        """
+        return self.stream_multiresponse(request, self.single_enrollment_update)
+
+    def stream_multiresponse(self, request, action_method, bulk_action_method=None):
+        """
+        Build the streaming response for the lines of the request body
+        """
+        return StreamingHttpResponse(
+            self.stream_results(request._request, action_method, bulk_action_method),  # pylint: disable=protected-access
+            content_type='application/x-ndjson',
+        )
+
+    def stream_results(self, http_request, action_method, bulk_action_method=None):
+        """
+        Read the request body line by line, yielding the results of every batch as soon as it is processed
+        """
+        batch_size = getattr(settings, 'EOX_CORE_ENROLLMENT_STREAM_BATCH_SIZE', 100)
+        batch = []
+        for line_number, line in enumerate(http_request, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line.decode('utf-8'))
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                row = ValidationError(detail='Line {} is not a JSON object'.format(line_number))
+            batch.append(row)
+
+            if len(batch) >= batch_size:
+                for item in self.process_batch(http_request, batch, action_method, bulk_action_method):
+                    yield item
+                batch = []
+
+        if batch:
+            for item in self.process_batch(http_request, batch, action_method, bulk_action_method):
+                yield item
+
+    def process_batch(self, http_request, rows, action_method, bulk_action_method=None):
+        """
+        Validate and process a batch of rows, returning a NDJSON line per response
+        """
+        # The streamed content is consumed after the middlewares finished with the
+        # request, so the current request used by the site helpers is set again.
+        previous_request = get_current_request()
+        set_current_request(http_request)
+        try:
+            responses = self.process_rows(rows, action_method, bulk_action_method)
+        finally:
+            set_current_request(previous_request)
+
+        return [
+            json.dumps(response, cls=JSONEncoder) + '\n'
+            for row_responses in responses for response in row_responses
+        ]
+
+
 class EdxappPreEnrollment(APIView):
     """
     Handles API requests to manage whitelistings (pre-enrollments)
@@ -346,6 +659,9 @@ class EdxappPreEnrollment(APIView):
         """
         Create whitelistings on edxapp
         """
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+
         serializer = EdxappCoursePreEnrollmentSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
@@ -420,6 +736,59 @@ class EdxappPreEnrollment(APIView):
         response = EdxappCoursePreEnrollmentSerializer(pre_enrollment).data
         return Response(response)
 
+    def bulk_create(self, request):
+        """
+        Create a list of whitelistings at once, answering with the result of every item in the same order
+        """
+        max_items = getattr(settings, 'EOX_CORE_BULK_PRE_ENROLLMENTS_MAX_ITEMS', 20000)
+        if len(request.data) > max_items:
+            raise ValidationError(detail='No more than {} pre-enrollments can be created per request'.format(max_items))
+        if not all(isinstance(row, dict) for row in request.data):
+            raise ValidationError(detail='A list of objects is expected')
+
+        responses = [response for row_responses in self.process_rows(request.data) for response in row_responses]
+        response_status = status.HTTP_200_OK
+        if any('error' in response for response in responses):
+            response_status = status.HTTP_202_ACCEPTED
+        return Response(responses, status=response_status)
+
+    @classmethod
+    def process_job_rows(cls, rows):
+        """
+        Create the pre-enrollments of a chunk of a bulk job
+        """
+        return cls.process_rows(rows)
+
+    @staticmethod
+    def process_rows(rows):
+        """
+        Validate raw pre-enrollment rows one by one and create the valid ones in bulk.
+        Every response has the status of the pre-enrollment: created or existing.
+
+        Returns: The list of responses of every row, in the same order
+        """
+        responses = [None] * len(rows)
+        valid_indexes = []
+        pre_enrollments = []
+        for index, row in enumerate(rows):
+            serializer = EdxappCoursePreEnrollmentSerializer(data=row)
+            if serializer.is_valid():
+                valid_indexes.append(index)
+                pre_enrollments.append(serializer.validated_data)
+            else:
+                responses[index] = [dict(row, error={"detail": serializer.errors})]
+
+        for index, result in zip(valid_indexes, create_pre_enrollments(pre_enrollments)):
+            if isinstance(result, APIException):
+                responses[index] = [dict(rows[index], error={"detail": result.detail})]
+                continue
+            pre_enrollment, created, warnings = result
+            data = EdxappCoursePreEnrollmentSerializer(pre_enrollment, context=warnings).data
+            data["status"] = "created" if created else "existing"
+            responses[index] = [data]
+
+        return responses
+
     def handle_exception(self, exc):
         """
         Handle exception: log it
@@ -443,6 +812,8 @@ class EdxappPreEnrollment(APIView):
         log_data.append('Request data:')
         if not data:
             log_data.append('Empty request')
+        elif isinstance(data, list):
+            log_data.append('List of {} items'.format(len(data)))
         else:
             for key, value in data.items():
                 log_data.append("{}: {}".format(key, value))
@@ -450,6 +821,139 @@ class EdxappPreEnrollment(APIView):
         LOG.error(' '.join(log_data))
 
 
+class EdxappBulkJob(APIView):
+    """
+    Base view to submit a list of items to be processed by a celery job.
+
+    The job is scheduled right away and its progress and results can be
+    followed with EdxappBulkJobStatus.
+    """
+    authentication_classes = (BearerAuthentication, SessionAuthentication)
+    permission_classes = (EoxCoreAPIPermission,)
+    renderer_classes = (JSONRenderer, BrowsableAPIRenderer)
+    job_class = None
+
+    def post(self, request, *args, **kwargs):
+        """
+        Schedule the job for the list of items, returning its id and status url
+        """
+        rows = request.data
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValidationError(detail='A list of objects is expected')
+        max_items = getattr(settings, 'EOX_CORE_BULK_JOBS_MAX_ITEMS', 10000)
+        if len(rows) > max_items:
+            raise ValidationError(detail='No more than {} items can be submitted per job'.format(max_items))
+
+        site = get_current_site(request)
+        job_id = "{}-{}".format(self.job_class.job_name, uuid.uuid4())
+        self.job_class().apply_async(
+            kwargs={
+                "rows": rows,
+                "site_id": getattr(site, 'id', None),
+            },
+            task_id=job_id,
+        )
+
+        url_job_status = request.build_absolute_uri(
+            reverse("eox-core:eox-api:eox-api:edxapp-bulk-job-status", kwargs={"job_id": job_id})
+        )
+        data_response = {
+            "job_id": job_id,
+            "job_url": url_job_status,
+            "total": len(rows),
+        }
+        return Response(data_response, status=status.HTTP_202_ACCEPTED)
+
+
+class EdxappEnrollmentJob(EdxappBulkJob):
+    """
+    Handles API requests to create a list of enrollments in a celery job
+    """
+    job_class = EdxappBulkEnrollments
+
+
+class EdxappPreEnrollmentJob(EdxappBulkJob):
+    """
+    Handles API requests to create a list of whitelistings (pre-enrollments) in a celery job
+    """
+    job_class = EdxappBulkPreEnrollments
+
+
+class EdxappBulkJobStatus(APIView):
+    """
+    Reports the progress of a bulk job and, once it finished, a page of its results
+    """
+    authentication_classes = (BearerAuthentication, SessionAuthentication)
+    permission_classes = (EoxCoreAPIPermission,)
+    renderer_classes = (JSONRenderer, BrowsableAPIRenderer)
+    job_classes = (EdxappBulkEnrollments, EdxappBulkPreEnrollments)
+
+    def get(self, request, job_id, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return the state of the job with its processed, failed and remaining items
+        """
+        job_names = tuple("{}-".format(job_class.job_name) for job_class in self.job_classes)
+        if not job_id.startswith(job_names):
+            raise NotFound(detail='Job {} not found'.format(job_id))
+
+        job = AsyncResult(job_id)
+        response = {
+            "job_id": job_id,
+            "state": job.state,
+            "total": None,
+            "processed": 0,
+            "failed": 0,
+            "remaining": None,
+        }
+        if job.state == JOB_PROGRESS and isinstance(job.info, dict):
+            response.update(job.info)
+        elif job.successful():
+            result = dict(job.result)
+            results = JobResults(job_id, result.pop("results_count"), result.pop("results_block_size"))
+            response.update(result)
+            paginator = BulkJobResultsPagination()
+            try:
+                response["results"] = paginator.paginate_queryset(results, request, view=self)
+            except JobResultsExpired:
+                raise NotFound(detail='The results of the job {} expired'.format(job_id))
+            response["count"] = paginator.page.paginator.count
+            response["next"] = paginator.get_next_link()
+            response["previous"] = paginator.get_previous_link()
+        elif job.failed():
+            response["error"] = {"detail": six.text_type(job.result)}
+
+        return Response(response)
+
+
+class EdxappUserSideEffectsStatus(APIView):
+    """
+    Reports the state of the deferred steps of the creation of users and, once
+    they finished, the errors of the users whose steps failed
+    """
+    authentication_classes = (BearerAuthentication, SessionAuthentication)
+    permission_classes = (EoxCoreAPIPermission,)
+    renderer_classes = (JSONRenderer, BrowsableAPIRenderer)
+
+    def get(self, request, task_id, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Return the state of the task of the deferred side effects
+        """
+        if not task_id.startswith("{}-".format(EdxappUserSideEffects.task_name)):
+            raise NotFound(detail='Task {} not found'.format(task_id))
+
+        task = AsyncResult(task_id)
+        response = {
+            "task_id": task_id,
+            "state": task.state,
+        }
+        if task.successful():
+            response["errors"] = task.result
+        elif task.failed():
+            response["error"] = {"detail": six.text_type(task.result)}
+
+        return Response(response)
+
+
 class UserInfo(APIView):
     """
     Auth-only view to check some basic info about the current user
@@ -29,6 +29,13 @@ class EoxCoreConfig(AppConfig):
         },
     }
 
+    def ready(self):
+        """
+        Resolve the edxapp backends once the django apps are loaded.
+        """
+        from eox_core.edxapp_wrapper.registry import load_backends
+        load_backends()
+
 
 class EoxCoreCMSConfig(EoxCoreConfig):
     """App configuration"""
@@ -7,20 +7,44 @@ Backend for the CourseKey validations that works under the open-release/hawthorn
 from __future__ import absolute_import, unicode_literals
 
 from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
-from openedx.core.djangoapps.site_configuration.helpers import get_all_orgs, get_current_site_orgs
+from openedx.core.djangoapps.site_configuration.helpers import get_current_site_orgs
+from openedx.core.djangoapps.site_configuration.models import SiteConfiguration
 from rest_framework.serializers import ValidationError
 
+from eox_core.edxapp_wrapper.coursekey import get_course_metadata_cache
+from eox_core.utils import cache
+
+try:
+    # For the versions that still have microsites.
+    from microsite_configuration import microsite
+except ImportError:
+    microsite = None  # pylint: disable=invalid-name
+
+FILTERED_ORGS_CACHE_KEY = 'eox_core.filtered_orgs'
+
 
 def get_valid_course_key(course_id):
     """
     Return the CourseKey if the course_id is valid
+
+    The key is parsed once per request or bulk job.
     """
+    request_cache = get_course_metadata_cache()
+    cache_key = 'course_key.{}'.format(course_id)
+    cached_response = request_cache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
     try:
-        return CourseKey.from_string(course_id)
+        course_key = CourseKey.from_string(course_id)
     except InvalidKeyError:
         raise ValidationError("Invalid course_id {}".format(course_id))
+    request_cache.set(cache_key, course_key)
+    return course_key
 
 
 def validate_org(course_id):
@@ -31,17 +55,78 @@ def validate_org(course_id):
     1 Orgs in the current site
     2 Orgs in other sites
     3 flag EOX_CORE_USER_ENABLE_MULTI_TENANCY
+
+    The decision is taken once per course and request or bulk job.
     """
 
     if not settings.EOX_CORE_USER_ENABLE_MULTI_TENANCY:
         return True
 
+    request_cache = get_course_metadata_cache()
+    cache_key = 'validate_org.{}'.format(course_id)
+    cached_response = request_cache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    is_valid = _validate_org(course_id)
+    request_cache.set(cache_key, is_valid)
+    return is_valid
+
+
+def _validate_org(course_id):
+    """
+    Validate the course organization, without the request cache
+    """
     course_key = get_valid_course_key(course_id)
     current_site_orgs = get_current_site_orgs() or []
 
     if not current_site_orgs:
-        if course_key.org in get_all_orgs():
+        if course_key.org in get_filtered_orgs():
             return False
         return True
     else:
         return course_key.org in current_site_orgs
+
+
+def get_filtered_orgs():
+    """
+    Return the set of orgs that some site filters in its course_org_filter.
+
+    The set is kept in the shared cache and built again when a SiteConfiguration
+    changes or after EOX_CORE_ORG_SITE_INDEX_CACHE_TIMEOUT seconds.
+    """
+    filtered_orgs = cache.get(FILTERED_ORGS_CACHE_KEY)
+    if filtered_orgs is None:
+        filtered_orgs = _build_filtered_orgs()
+        cache.set(
+            FILTERED_ORGS_CACHE_KEY,
+            filtered_orgs,
+            getattr(settings, 'EOX_CORE_ORG_SITE_INDEX_CACHE_TIMEOUT', 300),
+        )
+    return filtered_orgs
+
+
+def _build_filtered_orgs():
+    """
+    Walk the enabled site configurations once, collecting their orgs, plus the orgs of the microsites.
+    """
+    filtered_orgs = set()
+    for configuration in SiteConfiguration.objects.filter(enabled=True):
+        course_org_filter = configuration.get_value('course_org_filter', [])
+        if not isinstance(course_org_filter, list):
+            course_org_filter = [course_org_filter]
+        filtered_orgs.update(course_org_filter)
+
+    if microsite is not None:
+        filtered_orgs.update(microsite.get_all_orgs())
+
+    return frozenset(filtered_orgs)
+
+
+@receiver(post_save, sender=SiteConfiguration)
+@receiver(post_delete, sender=SiteConfiguration)
+def clear_filtered_orgs(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forget the filtered orgs when the course_org_filter of a site may have changed.
+    """
+    cache.delete(FILTERED_ORGS_CACHE_KEY)
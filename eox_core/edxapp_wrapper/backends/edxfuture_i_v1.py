@@ -8,32 +8,56 @@ from django.core.cache import cache
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
 from openedx.core.djangoapps.catalog.utils import create_catalog_api_client
 
+from eox_core.utils import get_cached_or_refresh, get_catalog_site, get_program_cache_key
 
-def get_program(program_uuid, ignore_cache=False):
+
+def get_program(program_uuid, ignore_cache=False, site=None):
     """
     Retrieves the details for the specified program.
 
+    The program is kept PROGRAMS_CACHE_TTL seconds in the cache and served stale
+    for EOX_CORE_PROGRAMS_CACHE_STALE_TTL more seconds while a single process
+    refreshes it, or while the catalog is not available. Failed lookups are cached
+    for EOX_CORE_PROGRAMS_NEGATIVE_CACHE_TTL seconds.
+
      Args:
          program_uuid (UUID): Program identifier
          ignore_cache (bool): Indicates if previously-cached data should be ignored.
+         site (Site): Site whose catalog is queried, the default one if not given or if the site has none.
 
      Returns:
          dict
     """
     program_uuid = str(program_uuid)
-    cache_key = 'programs.api.data.{uuid}'.format(uuid=program_uuid)
-
-    if not ignore_cache:
-        program = cache.get(cache_key)
+    # The sites without a catalog of their own share the programs of the default catalog.
+    site = get_catalog_site(site)
+    cache_key = get_program_cache_key(program_uuid, site)
+
+    return get_cached_or_refresh(
+        cache_key,
+        lambda: _get_catalog_api_client(site).programs(program_uuid).get(),
+        timeout=getattr(settings, 'PROGRAMS_CACHE_TTL', 60),
+        stale_timeout=getattr(settings, 'EOX_CORE_PROGRAMS_CACHE_STALE_TTL', 3600),
+        error_timeout=getattr(settings, 'EOX_CORE_PROGRAMS_NEGATIVE_CACHE_TTL', 10),
+        lock_timeout=getattr(settings, 'EOX_CORE_PROGRAMS_CACHE_LOCK_TIMEOUT', 30),
+        force=ignore_cache,
+        cache_backend=cache,
+    )
+
+
+def get_program_uuids(site=None):
+    """
+    Retrieves the uuids of the active and retired programs of the catalog of a site.
+    """
+    return _get_catalog_api_client(site).programs.get(exclude_utm=1, status=('active', 'retired'), uuids_only=1)
 
-        if program:
-            return program
 
+def _get_catalog_api_client(site=None):
+    """
+    Catalog API client authenticated as the catalog service user.
+    """
     catalog_integration = CatalogIntegration.current()
     user = catalog_integration.get_service_user()
-    api = create_catalog_api_client(user)
-
-    program = api.programs(program_uuid).get()
-    cache.set(cache_key, program, getattr(settings, 'PROGRAMS_CACHE_TTL', 60))
-
-    return program
+    if site is None:
+        return create_catalog_api_client(user)
+    return create_catalog_api_client(user, site=site)
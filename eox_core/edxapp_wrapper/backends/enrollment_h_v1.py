@@ -10,7 +10,11 @@ import datetime
 import logging
 
 from course_modes.models import CourseMode
+from crum import get_current_request
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import six
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
@@ -20,19 +24,18 @@ from rest_framework.exceptions import APIException, NotFound
 from student.models import CourseEnrollment
 
 from eox_core.edxapp_wrapper.backends.edxfuture_i_v1 import get_program
-from eox_core.edxapp_wrapper.coursekey import get_valid_course_key, validate_org
+from eox_core.edxapp_wrapper.coursekey import get_course_metadata_cache, get_valid_course_key, validate_org
 from eox_core.edxapp_wrapper.users import check_edxapp_account_conflicts
 
 try:
     # For Hawthorn and Ironwood versions.
     from enrollment import api
-    from enrollment.errors import CourseEnrollmentExistsError, CourseModeNotFoundError
+    from enrollment.errors import CourseEnrollmentExistsError
 except ImportError:
     # For Juniper versions.
     from openedx.core.djangoapps.enrollments import api  # pylint: disable=ungrouped-imports
     from openedx.core.djangoapps.enrollments.errors import (  # pylint: disable=ungrouped-imports
-        CourseEnrollmentExistsError,
-        CourseModeNotFoundError
+        CourseEnrollmentExistsError
     )
 
 
@@ -65,6 +68,40 @@ def create_enrollment(user, *args, **kwargs):
     raise APIException("You have to provide a course_id or bundle_id")
 
 
+def create_enrollments(enrollments):
+    """
+    Bulk version of create_enrollment for course enrollments.
+
+    Every item of `enrollments` is a dict with the `user` and the arguments of
+    create_enrollment. Each distinct course, mode and force combination is
+    validated once and the enrollments are written in transactions of
+    EOX_CORE_BULK_ENROLLMENTS_CHUNK_SIZE items, with a savepoint per item.
+
+    Returns a list with the (enrollment, errors) of every item, in the same
+    order, or the APIException that create_enrollment raised for it.
+    """
+    chunk_size = getattr(settings, 'EOX_CORE_BULK_ENROLLMENTS_CHUNK_SIZE', 100)
+    validations = {}
+    results = [None] * len(enrollments)
+
+    for start in range(0, len(enrollments), chunk_size):
+        with transaction.atomic():
+            for index in range(start, min(start + chunk_size, len(enrollments))):
+                kwargs = dict(enrollments[index])
+                user = kwargs.pop('user')
+                kwargs.pop('bundle_id', None)
+                course_id = kwargs.pop('course_id', None)
+                try:
+                    if not course_id:
+                        raise APIException("You have to provide a course_id or bundle_id")
+                    with transaction.atomic():
+                        results[index] = _enroll_on_course(user, course_id, validations=validations, **kwargs)
+                except APIException as error:
+                    results[index] = error
+
+    return results
+
+
 def update_enrollment(user, course_id, mode, *args, **kwargs):
     """
     Update enrollment of given user in the course provided.
@@ -197,14 +234,23 @@ def _enroll_on_course(user, course_id, *args, **kwargs):
     is_active = kwargs.get('is_active', True)
     force = kwargs.get('force', False)
     enrollment_attributes = kwargs.get('enrollment_attributes', None)
-
-    enrollment_valid_query = {
-        'course_id': course_id,
-        'force': force,
-        'mode': mode,
-        'username': username,
-    }
-    validation_errors = check_edxapp_enrollment_is_valid(**enrollment_valid_query)
+    # Validations already done for other enrollments of the same bulk operation
+    validations = kwargs.get('validations', {})
+
+    validation_key = (course_id, mode, force)
+    if validation_key in validations:
+        validation_errors = validations[validation_key]
+    else:
+        enrollment_valid_query = {
+            'course_id': course_id,
+            'force': force,
+            'mode': mode,
+            'username': username,
+            # The user was already fetched, so the account exists
+            'account_conflicts': ['username'],
+        }
+        validation_errors = check_edxapp_enrollment_is_valid(**enrollment_valid_query)
+        validations[validation_key] = validation_errors
     if validation_errors:
         return None, [", ".join(validation_errors)]
 
@@ -232,51 +278,76 @@ def _enroll_on_course(user, course_id, *args, **kwargs):
     return enrollment, errors
 
 
-def _enroll_on_program(user, program_uuid, *arg, **kwargs):
+def _enroll_on_program(user, program_uuid, *arg, **kwargs):  # pylint: disable=unused-argument
     """
     enroll user on each of the courses of a program
+
+    The overviews of all the course runs are loaded at once to choose the run of
+    every course, and the course enrollments are written together by create_enrollments.
     """
-    results = []
-    errors = []
     LOG.info('Enrolling on program: %s', program_uuid)
     try:
-        data = get_program(program_uuid)
+        data = get_program(program_uuid, site=getattr(get_current_request(), 'site', None))
     except Exception as err:  # pylint: disable=broad-except
         raise NotFound(repr(err))
     if not data['courses']:
         raise NotFound("No courses found for this program")
+    if not all(course['course_runs'] for course in data['courses']):
+        raise NotFound("No course runs available for this course")
+
+    course_overviews = _get_course_run_overviews(data['courses'])
+    course_ids = []
     for course in data['courses']:
-        if course['course_runs']:
-            course_run = _get_preferred_course_run(course)
-            LOG.info('Enrolling on course_run: %s', course_run['key'])
-            course_id = course_run['key']
-            try:
-                result, errors_list = _enroll_on_course(user, course_id, *arg, **kwargs)
-            except APIException as error:
-                result = {
-                    'username': user.username,
-                    'mode': None,
-                    'course_id': course_id,
-                }
-                errors_list = [error.detail]
-
-            results.append(result)
-            errors.append(errors_list)
+        course_run = _get_preferred_course_run(course, course_overviews)
+        LOG.info('Enrolling on course_run: %s', course_run['key'])
+        course_ids.append(course_run['key'])
+
+    course_enrollments = [dict(kwargs, user=user, course_id=course_id) for course_id in course_ids]
+    results = []
+    errors = []
+    for course_id, result in zip(course_ids, create_enrollments(course_enrollments)):
+        if isinstance(result, APIException):
+            results.append({
+                'username': user.username,
+                'mode': None,
+                'course_id': course_id,
+            })
+            errors.append([result.detail])
         else:
-            raise NotFound("No course runs available for this course")
+            results.append(result[0])
+            errors.append(result[1])
     return results, errors
 
 
-def _get_preferred_course_run(course):
+def _get_course_run_overviews(courses):
+    """
+    Returns the CourseOverview of every run of the courses, by course run key, with a single query
+    """
+    course_run_keys = [
+        CourseKey.from_string(run['key']) for course in courses for run in course['course_runs']
+    ]
+    course_overviews = {
+        six.text_type(course_overview.id): course_overview
+        for course_overview in CourseOverview.objects.filter(id__in=course_run_keys)
+    }
+    # Overviews that were not generated yet are created from the modulestore, as get_from_id does.
+    for course_run_key in course_run_keys:
+        if six.text_type(course_run_key) not in course_overviews:
+            course_overviews[six.text_type(course_run_key)] = CourseOverview.get_from_id(course_run_key)
+    return course_overviews
+
+
+def _get_preferred_course_run(course, course_overviews=None):
     """
     Returns the course run more likely to be the intended one
     """
+    if course_overviews is None:
+        course_overviews = _get_course_run_overviews([course])
     sorted_course_runs = sorted(course['course_runs'], key=lambda run: run['start'])
 
     for run in sorted_course_runs:
         default_enrollment_start_date = datetime.datetime(1900, 1, 1, tzinfo=utc)
-        course_run_key = CourseKey.from_string(run['key'])
-        course_overview = CourseOverview.get_from_id(course_run_key)
+        course_overview = course_overviews[six.text_type(CourseKey.from_string(run['key']))]
         enrollment_end = course_overview.enrollment_end or datetime.datetime.max.replace(tzinfo=utc)
         enrollment_start = course_overview.enrollment_start or default_enrollment_start_date
         run['is_enrollment_open'] = enrollment_start <= datetime.datetime.now(utc) < enrollment_end
@@ -306,7 +377,10 @@ def check_edxapp_enrollment_is_valid(*args, **kwargs):
         return ['You have to provide a course_id or bundle_id']
     if not email and not username:
         return ['Email or username needed']
-    if not check_edxapp_account_conflicts(email=email, username=username):
+    account_conflicts = kwargs.get("account_conflicts")
+    if account_conflicts is None:
+        account_conflicts = check_edxapp_account_conflicts(email=email, username=username)
+    if not account_conflicts:
         return ['User not found']
     if mode not in CourseMode.ALL_MODES:
         return ['Invalid mode given:' + mode]
@@ -314,15 +388,37 @@ def check_edxapp_enrollment_is_valid(*args, **kwargs):
         if not validate_org(course_id):
             errors.append('Enrollment not allowed for given org')
     if course_id and not force:
-        try:
-            api.validate_course_mode(course_id, mode, is_active=is_active)
-        except CourseModeNotFoundError:
-            errors.append('Mode not found')
-        except CourseNotFoundError:
+        # Same check as api.validate_course_mode, loading the modes of each course once per request.
+        include_expired = not is_active if is_active is not None else False
+        course_modes = _get_course_modes(course_id, include_expired)
+        if course_modes is None:
             errors.append('Course not found')
+        elif mode not in course_modes:
+            errors.append('Mode not found')
     return errors
 
 
+def _get_course_modes(course_id, include_expired=False):
+    """
+    Return the slugs of the modes available in a course, or None if the course does not exist.
+
+    The modes are kept in the course metadata cache of the request.
+    """
+    request_cache = get_course_metadata_cache()
+    cache_key = 'course_modes.{}.{}'.format(course_id, include_expired)
+    cached_response = request_cache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    try:
+        course_enrollment_info = api._data_api().get_course_enrollment_info(course_id, include_expired=include_expired)
+        course_modes = [course_mode['slug'] for course_mode in course_enrollment_info['course_modes']]
+    except CourseNotFoundError:
+        course_modes = None
+    request_cache.set(cache_key, course_modes)
+    return course_modes
+
+
 def _create_or_update_enrollment(username, course_id, mode, is_active, try_update):
     """
     non-forced create or update enrollment internal function
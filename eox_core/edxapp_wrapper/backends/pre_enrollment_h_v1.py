@@ -7,16 +7,22 @@ Backend for the pre-enrollment (white listings) functionality that works under t
 from __future__ import absolute_import, unicode_literals
 
 import logging
+from collections import OrderedDict
 
-from django.db import IntegrityError
-from rest_framework.exceptions import NotFound
+import django
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from rest_framework.exceptions import APIException, NotFound
 from student.models import CourseEnrollmentAllowed
 
-from eox_core.edxapp_wrapper.coursekey import get_valid_course_key
-from eox_core.edxapp_wrapper.courseware import get_courseware_courses
+from eox_core.edxapp_wrapper.coursekey import get_course_metadata_cache, get_valid_course_key
 
 LOG = logging.getLogger(__name__)
 
+# ignore_conflicts is only available since Django 2.2, before it the existing rows are just looked up first.
+BULK_CREATE_OPTIONS = {'ignore_conflicts': True} if django.VERSION >= (2, 2) else {}
+
 
 def create_pre_enrollment(*args, **kwargs):
     """
@@ -39,17 +45,134 @@ def create_pre_enrollment(*args, **kwargs):
     try:
         course_key = get_valid_course_key(course_id)
         pre_enrollment = CourseEnrollmentAllowed.objects.create(course_id=course_key, **kwargs)
-        # Check if the course exists otherwise add a warning
-        course = get_courseware_courses().get_course(course_key)
-        LOG.info('Creating regular pre-enrollment for email: %s course_id: %s auto_enroll: %s', email, course.id, auto_enroll)
     except IntegrityError:
         pre_enrollment = None
         raise NotFound('Pre-enrollment already exists for email: {} course_id: {}'.format(email, course_id))
-    except ValueError:
+    # Check if the course exists otherwise add a warning
+    if _course_exists(course_key):
+        LOG.info('Creating regular pre-enrollment for email: %s course_id: %s auto_enroll: %s', email, course_key, auto_enroll)
+    else:
         warnings = ['Course with course_id:{} does not exist'.format(course_id)]
     return pre_enrollment, warnings
 
 
+def create_pre_enrollments(pre_enrollments):
+    """
+    Bulk version of create_pre_enrollment.
+
+    Every item of `pre_enrollments` is a dict with the email, course_id and
+    auto_enroll of a pre-enrollment. The existence of every distinct course is
+    checked once, the pre-enrollments that already exist are looked up by course
+    and the new ones are written with bulk_create, in batches of
+    EOX_CORE_BULK_PRE_ENROLLMENTS_CHUNK_SIZE.
+
+    Returns a list with the (pre_enrollment, created, warnings) of every item, in
+    the same order, or the APIException raised for it.
+    """
+    chunk_size = getattr(settings, 'EOX_CORE_BULK_PRE_ENROLLMENTS_CHUNK_SIZE', 1000)
+    results = [None] * len(pre_enrollments)
+
+    indexes_by_course = OrderedDict()
+    for index, item in enumerate(pre_enrollments):
+        try:
+            course_key = get_valid_course_key(item['course_id'])
+        except APIException as error:
+            results[index] = error
+            continue
+        indexes_by_course.setdefault(course_key, []).append(index)
+
+    for course_key, indexes in indexes_by_course.items():
+        warnings = _get_course_warnings(course_key)
+
+        # The emails are compared without case, like the collation of the table does under MySQL.
+        emails = list(OrderedDict.fromkeys(pre_enrollments[index]['email'] for index in indexes))
+        course_pre_enrollments = {}
+        for start in range(0, len(emails), chunk_size):
+            for pre_enrollment in CourseEnrollmentAllowed.objects.filter(
+                    course_id=course_key,
+                    email__in=emails[start:start + chunk_size],
+            ):
+                course_pre_enrollments[pre_enrollment.email.lower()] = pre_enrollment
+
+        new_pre_enrollments = OrderedDict()
+        for index in indexes:
+            email = pre_enrollments[index]['email']
+            if email.lower() in new_pre_enrollments:
+                new_pre_enrollments[email.lower()][1].append(index)
+            elif email.lower() in course_pre_enrollments:
+                results[index] = (course_pre_enrollments[email.lower()], False, warnings)
+            else:
+                pre_enrollment = CourseEnrollmentAllowed(
+                    course_id=course_key,
+                    email=email,
+                    auto_enroll=pre_enrollments[index].get('auto_enroll', False),
+                )
+                new_pre_enrollments[email.lower()] = (pre_enrollment, [index])
+
+        _create_pre_enrollments(list(new_pre_enrollments.values()), results, warnings, chunk_size)
+        LOG.info('Creating %s regular pre-enrollments for course_id: %s', len(new_pre_enrollments), course_key)
+
+    return results
+
+
+def _create_pre_enrollments(new_pre_enrollments, results, warnings, chunk_size):
+    """
+    Write the (pre_enrollment, indexes) of new_pre_enrollments with bulk_create, setting the results of their indexes.
+
+    Before Django 2.2 the rows written meanwhile by another request make bulk_create fail,
+    then every pre-enrollment is written with get_or_create instead.
+    """
+    try:
+        with transaction.atomic():
+            CourseEnrollmentAllowed.objects.bulk_create(
+                [pre_enrollment for pre_enrollment, _ in new_pre_enrollments],
+                batch_size=chunk_size,
+                **BULK_CREATE_OPTIONS
+            )
+        created_pre_enrollments = [(pre_enrollment, True) for pre_enrollment, _ in new_pre_enrollments]
+    except IntegrityError:
+        if BULK_CREATE_OPTIONS:
+            raise
+        LOG.info('Some pre-enrollments were created meanwhile, creating them one by one')
+        created_pre_enrollments = [
+            CourseEnrollmentAllowed.objects.get_or_create(
+                course_id=pre_enrollment.course_id,
+                email=pre_enrollment.email,
+                defaults={'auto_enroll': pre_enrollment.auto_enroll},
+            )
+            for pre_enrollment, _ in new_pre_enrollments
+        ]
+
+    for (pre_enrollment, created), (_, indexes) in zip(created_pre_enrollments, new_pre_enrollments):
+        # The repeated items of the same email find it already created.
+        for position, index in enumerate(indexes):
+            results[index] = (pre_enrollment, created and not position, warnings)
+
+
+def _get_course_warnings(course_key):
+    """
+    Warnings of the pre-enrollments of a course: whether the course does not exist.
+    """
+    if not _course_exists(course_key):
+        return ['Course with course_id:{} does not exist'.format(course_key)]
+    return []
+
+
+def _course_exists(course_key):
+    """
+    Whether the course has a CourseOverview, checked once per request without loading it from the modulestore.
+    """
+    request_cache = get_course_metadata_cache()
+    cache_key = 'course_exists.{}'.format(course_key)
+    cached_response = request_cache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    course_exists = CourseOverview.objects.filter(id=course_key).exists()
+    request_cache.set(cache_key, course_exists)
+    return course_exists
+
+
 def update_pre_enrollment(*args, **kwargs):
     """
     Update pre-enrollment of given user in the course provided.
@@ -47,6 +47,13 @@ def check_edxapp_account_conflicts(email, username):
     return check_account_exists(email=email, username=username)
 
 
+def check_edxapp_accounts_conflicts(accounts):
+    """
+    Checks the conflicts of a list of (username, email) pairs, in the same order.
+    """
+    return [check_edxapp_account_conflicts(email=email, username=username) for username, email in accounts]
+
+
 def create_edxapp_user(*args, **kwargs):
     """
     Creates a user on the open edx django site using calls to
@@ -65,36 +72,100 @@ def create_edxapp_user(*args, **kwargs):
     }
     user = create_edxapp_user(**data)
 
+    With defer_side_effects=True the comments service user and the language
+    preference are not set up, so they can be run later by
+    run_edxapp_user_side_effects.
     """
-    errors = []
-
     email = kwargs.pop("email")
     username = kwargs.pop("username")
     conflicts = check_edxapp_account_conflicts(email=email, username=username)
     if conflicts:
         return None, ["Fatal: account collition with the provided: {}".format(", ".join(conflicts))]
 
+    # Go ahead and create the new user
+    with transaction.atomic():
+        user = _create_account(username, email, kwargs.pop("password"), kwargs.pop("fullname"))
+
+    errors = _finish_edxapp_user_creation(user, **kwargs)
+
+    return user, errors
+
+
+def create_edxapp_users(users, site=None, defer_side_effects=False):
+    """
+    Creates many users on the open edx django site.
+
+    The accounts are created in transactions of EOX_CORE_BULK_USERS_CHUNK_SIZE
+    users. Each item of `users` takes the same arguments as create_edxapp_user.
+
+    Returns a list with the (user, errors) of every item, in the same order.
+    The user is None when the account could not be created.
+    """
+    chunk_size = getattr(settings, 'EOX_CORE_BULK_USERS_CHUNK_SIZE', 100)
+    results = [None] * len(users)
+
+    for start in range(0, len(users), chunk_size):
+        created = []
+        with transaction.atomic():
+            for index in range(start, min(start + chunk_size, len(users))):
+                data = dict(users[index])
+                username = data.pop("username")
+                email = data.pop("email")
+                conflicts = check_edxapp_account_conflicts(email=email, username=username)
+                if conflicts:
+                    results[index] = (None, [
+                        "Fatal: account collition with the provided: {}".format(", ".join(conflicts))
+                    ])
+                    continue
+                try:
+                    # A savepoint per account, so one invalid account does not discard the rest of the chunk.
+                    with transaction.atomic():
+                        user = _create_account(username, email, data.pop("password"), data.pop("fullname"))
+                except Exception as error:  # pylint: disable=broad-except
+                    LOG.warning("Could not create the account %s: %s", username, error)
+                    results[index] = (None, ["Fatal: the account could not be created: {}".format(error)])
+                    continue
+                data.setdefault("site", site)
+                data.setdefault("defer_side_effects", defer_side_effects)
+                created.append((index, user, data))
+
+        for index, user, data in created:
+            results[index] = (user, _finish_edxapp_user_creation(user, **data))
+
+    return results
+
+
+def _create_account(username, email, password, fullname):
+    """
+    Creates the user, profile and registration of a new account.
+    """
     data = {
         'username': username,
         'email': email,
-        'password': kwargs.pop("password"),
-        'name': kwargs.pop("fullname"),
+        'password': password,
+        'name': fullname,
     }
-    # Go ahead and create the new user
-    with transaction.atomic():
-        # In theory is possible to extend the registration form with a custom app
-        # An example form app for this can be found at http://github.com/open-craft/custom-form-app
-        # form = get_registration_extension_form(data=params)
-        # if not form:
-        form = AccountCreationForm(
-            data=data,
-            tos_required=False,
-            # TODO: we need to support the extra profile fields as defined in the django.settings
-            # extra_fields=extra_fields,
-            # extended_profile_fields=extended_profile_fields,
-            # enforce_password_policy=enforce_password_policy,
-        )
-        (user, profile, registration) = do_create_account(form)  # pylint: disable=unused-variable
+    # In theory is possible to extend the registration form with a custom app
+    # An example form app for this can be found at http://github.com/open-craft/custom-form-app
+    # form = get_registration_extension_form(data=params)
+    # if not form:
+    form = AccountCreationForm(
+        data=data,
+        tos_required=False,
+        # TODO: we need to support the extra profile fields as defined in the django.settings
+        # extra_fields=extra_fields,
+        # extended_profile_fields=extended_profile_fields,
+        # enforce_password_policy=enforce_password_policy,
+    )
+    (user, profile, registration) = do_create_account(form)  # pylint: disable=unused-variable
+    return user
+
+
+def _finish_edxapp_user_creation(user, **kwargs):
+    """
+    Runs the steps that follow the creation of the account and returns their errors.
+    """
+    errors = []
 
     site = kwargs.pop("site", False)
     if site:
@@ -102,30 +173,43 @@ def create_edxapp_user(*args, **kwargs):
     else:
         errors.append("The user was not assigned to any site")
 
+    # TODO: link account with third party auth
+
+    if kwargs.pop("activate_user", False):
+        user.is_active = True
+        user.save()
+
+    if not kwargs.pop("defer_side_effects", False):
+        errors.extend(run_edxapp_user_side_effects(user, kwargs.pop("language_preference", None)))
+
+    # TODO: run conditional email sequence
+
+    return errors
+
+
+def run_edxapp_user_side_effects(user, language_preference=None):
+    """
+    Creates the comments service user and sets the language preference of a new account.
+
+    Both steps can be repeated safely. Returns the list of errors.
+    """
+    errors = []
+
     try:
         create_comments_service_user(user)
     except Exception:  # pylint: disable=broad-except
         errors.append("No comments_service_user was created")
 
-    # TODO: link account with third party auth
-
-    lang_pref = kwargs.pop("language_preference", False)
-    if lang_pref:
+    if language_preference:
         try:
-            preferences_api.set_user_preference(user, LANGUAGE_KEY, lang_pref)
+            preferences_api.set_user_preference(user, LANGUAGE_KEY, language_preference)
         except Exception:  # pylint: disable=broad-except
             errors.append("Could not set lang preference '{} for user '{}'".format(
-                lang_pref,
+                language_preference,
                 user.username,
             ))
 
-    if kwargs.pop("activate_user", False):
-        user.is_active = True
-        user.save()
-
-    # TODO: run conditional email sequence
-
-    return user, errors
+    return errors
 
 
 def get_edxapp_user(**kwargs):
@@ -167,6 +251,22 @@ def get_edxapp_user(**kwargs):
     return user
 
 
+def get_edxapp_users(queries):
+    """
+    Bulk version of get_edxapp_user. Every query takes the same arguments as get_edxapp_user.
+
+    Returns a list with the user of every query, in the same order, or the
+    NotFound error that get_edxapp_user raised for it.
+    """
+    results = []
+    for query in queries:
+        try:
+            results.append(get_edxapp_user(**query))
+        except NotFound as error:
+            results.append(error)
+    return results
+
+
 def get_course_team_user(*args, **kwargs):
     """
     Get _course_team_user function.
@@ -205,7 +305,7 @@ class FetchUserSiteSources(object):
     @staticmethod
     def fetch_from_user_signup_source(user, domain):
         """ Read the signup source. """
-        return len(UserSignupSource.objects.filter(user=user, site=domain)) > 0
+        return UserSignupSource.objects.filter(user=user, site=domain).exists()
 
     @staticmethod
     def fetch_from_unfiltered_table(user, site):
@@ -14,6 +14,13 @@ def get_edxapp_user(**kwargs):
     return object
 
 
+def get_edxapp_users(queries):
+    """
+    Return a fake user for every query
+    """
+    return [object for _ in queries]
+
+
 def create_edxapp_user(*args, **kwargs):
     """
     Return a fake user and a list of errors
@@ -21,6 +28,20 @@ def create_edxapp_user(*args, **kwargs):
     return object, []
 
 
+def create_edxapp_users(users, site=None, defer_side_effects=False):
+    """
+    Return a fake user and a list of errors for every item
+    """
+    return [(object, []) for _ in users]
+
+
+def run_edxapp_user_side_effects(user, language_preference=None):
+    """
+    Return an empty list of errors
+    """
+    return []
+
+
 def get_user_read_only_serializer():
     """
     Return a fake user read only serializer
@@ -47,6 +68,13 @@ def check_edxapp_account_conflicts(email, username):
     return check_account_exists(email=email, username=username)
 
 
+def check_edxapp_accounts_conflicts(accounts):
+    """
+    Checks the conflicts of a list of (username, email) pairs for tests
+    """
+    return [check_edxapp_account_conflicts(email=email, username=username) for username, email in accounts]
+
+
 def get_course_enrollment():
     """
     Get Test CourseEnrollment model.
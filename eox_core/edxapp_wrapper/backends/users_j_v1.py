@@ -7,13 +7,19 @@ from __future__ import absolute_import, unicode_literals
 
 import logging
 
+from crum import get_current_request
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from edx_django_utils.cache import RequestCache  # pylint: disable=import-error
 from openedx.core.djangoapps.lang_pref import LANGUAGE_KEY  # pylint: disable=import-error
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers  # pylint: disable=import-error
 from openedx.core.djangoapps.user_api.accounts import USERNAME_MAX_LENGTH  # pylint: disable=import-error,unused-import
 from openedx.core.djangoapps.user_api.accounts.serializers import UserReadOnlySerializer  # pylint: disable=import-error
+from openedx.core.djangoapps.user_api.models import UserRetirementStatus  # pylint: disable=import-error
 from openedx.core.djangoapps.user_api.preferences import api as preferences_api  # pylint: disable=import-error
 from openedx.core.djangoapps.user_authn.views.registration_form import (  # pylint: disable=import-error
     AccountCreationForm,
@@ -26,16 +32,23 @@ from student.models import (  # pylint: disable=import-error
     UserProfile,
     UserSignupSource,
     create_comments_service_user,
-    email_exists_or_retired,
-    username_exists_or_retired,
+    get_all_retired_emails_by_email,
+    get_all_retired_usernames_by_username,
 )
 
+from eox_core.utils import LocalLRUCache, cache, fasthash
+
 from student.helpers import do_create_account  # pylint: disable=import-error; pylint: disable=import-error
 from student.models import CourseEnrollment  # pylint: disable=import-error; pylint: disable=import-error
 
 LOG = logging.getLogger(__name__)
 User = get_user_model()  # pylint: disable=invalid-name
 
+# Retired hashes of the usernames and emails recently checked. Computing them costs one hash per salt.
+RETIRED_HASHES = LocalLRUCache(maxsize=4096)
+
+SITE_MEMBERSHIP_CACHE_KEY = "eox_core.site_membership.{}.{}"
+
 
 def get_user_read_only_serializer():
     """
@@ -48,17 +61,68 @@ def check_edxapp_account_conflicts(email, username):
     """
     Exposed function to check conflicts
     """
-    conflicts = []
+    return check_edxapp_accounts_conflicts([(username, email)])[0]
+
+
+def check_edxapp_accounts_conflicts(accounts):
+    """
+    Checks the conflicts of many accounts at once.
+
+    Takes a list of (username, email) pairs and returns the list of conflicts of
+    every pair, in the same order. A username or email conflicts when it belongs
+    to an existing or retired account. The check runs three queries whatever
+    the number of accounts.
+    """
+    usernames = {username for username, _ in accounts if username}
+    emails = {email for _, email in accounts if email}
+
+    taken_usernames = set()
+    if usernames:
+        retired_usernames = _get_retired_hashes(usernames, get_all_retired_usernames_by_username)
+        lookup = list(usernames) + list(retired_usernames)
+        for username in User.objects.filter(username__in=lookup).values_list('username', flat=True):
+            taken_usernames.add(retired_usernames.get(username, username).lower())
+        taken_usernames.update(
+            username.lower() for username in UserRetirementStatus.objects.filter(
+                original_username__in=list(usernames),
+            ).values_list('original_username', flat=True)
+        )
 
-    if username and username_exists_or_retired(username):
-        conflicts.append("username")
+    taken_emails = set()
+    if emails:
+        retired_emails = _get_retired_hashes(emails, get_all_retired_emails_by_email)
+        lookup = list(emails) + list(retired_emails)
+        for email in User.objects.filter(email__in=lookup).values_list('email', flat=True):
+            taken_emails.add(retired_emails.get(email, email).lower())
 
-    if email and email_exists_or_retired(email):
-        conflicts.append("email")
+    conflicts = []
+    for username, email in accounts:
+        account_conflicts = []
+        if username and username.lower() in taken_usernames:
+            account_conflicts.append("username")
+        if email and email.lower() in taken_emails:
+            account_conflicts.append("email")
+        conflicts.append(account_conflicts)
 
     return conflicts
 
 
+def _get_retired_hashes(values, get_all_retired):
+    """
+    Returns a dict from every retired hash of `values` to the value it was computed from.
+    """
+    retired = {}
+    for value in values:
+        key = (get_all_retired.__name__, value)
+        hashes = RETIRED_HASHES.get(key)
+        if hashes is None:
+            hashes = tuple(get_all_retired(value))
+            RETIRED_HASHES.set(key, hashes)
+        for retired_hash in hashes:
+            retired[retired_hash] = value
+    return retired
+
+
 def create_edxapp_user(*args, **kwargs):
     """
     Creates a user on the open edx django site using calls to
@@ -77,36 +141,128 @@ def create_edxapp_user(*args, **kwargs):
     }
     user = create_edxapp_user(**data)
 
+    With defer_side_effects=True the comments service user and the language
+    preference are not set up, so they can be run later by
+    run_edxapp_user_side_effects.
     """
-    errors = []
-
     email = kwargs.pop("email")
     username = kwargs.pop("username")
     conflicts = check_edxapp_account_conflicts(email=email, username=username)
     if conflicts:
         return None, ["Fatal: account collition with the provided: {}".format(", ".join(conflicts))]
 
+    # Go ahead and create the new user
+    with transaction.atomic():
+        user = _create_account(username, email, kwargs.pop("password"), kwargs.pop("fullname"))
+
+    errors = _finish_edxapp_user_creation(user, **kwargs)
+
+    return user, errors
+
+
+def create_edxapp_users(users, site=None, defer_side_effects=False):
+    """
+    Creates many users on the open edx django site.
+
+    The conflicts of the whole list are checked at once and the accounts are
+    created in transactions of EOX_CORE_BULK_USERS_CHUNK_SIZE users. Each item of
+    `users` takes the same arguments as create_edxapp_user.
+
+    Returns a list with the (user, errors) of every item, in the same order.
+    The user is None when the account could not be created.
+    """
+    chunk_size = getattr(settings, 'EOX_CORE_BULK_USERS_CHUNK_SIZE', 100)
+    conflicts = _get_bulk_account_conflicts(users)
+    results = [None] * len(users)
+
+    for start in range(0, len(users), chunk_size):
+        created = []
+        with transaction.atomic():
+            for index in range(start, min(start + chunk_size, len(users))):
+                data = dict(users[index])
+                if conflicts[index]:
+                    results[index] = (None, [
+                        "Fatal: account collition with the provided: {}".format(", ".join(conflicts[index]))
+                    ])
+                    continue
+                try:
+                    # A savepoint per account, so one invalid account does not discard the rest of the chunk.
+                    with transaction.atomic():
+                        user = _create_account(
+                            data.pop("username"),
+                            data.pop("email"),
+                            data.pop("password"),
+                            data.pop("fullname"),
+                        )
+                except Exception as error:  # pylint: disable=broad-except
+                    LOG.warning("Could not create the account %s: %s", users[index].get("username"), error)
+                    results[index] = (None, ["Fatal: the account could not be created: {}".format(error)])
+                    continue
+                data.setdefault("site", site)
+                data.setdefault("defer_side_effects", defer_side_effects)
+                created.append((index, user, data))
+
+        for index, user, data in created:
+            results[index] = (user, _finish_edxapp_user_creation(user, **data))
+
+    return results
+
+
+def _get_bulk_account_conflicts(users):
+    """
+    Return the list of conflicting fields of every item of `users`.
+
+    Repeated usernames or emails inside `users` are conflicts of the items after the first one.
+    """
+    accounts = [(user.get("username"), user.get("email")) for user in users]
+    conflicts = check_edxapp_accounts_conflicts(accounts)
+
+    seen_usernames = set()
+    seen_emails = set()
+    for (username, email), account_conflicts in zip(accounts, conflicts):
+        if username:
+            if username.lower() in seen_usernames and "username" not in account_conflicts:
+                account_conflicts.append("username")
+            seen_usernames.add(username.lower())
+        if email:
+            if email.lower() in seen_emails and "email" not in account_conflicts:
+                account_conflicts.append("email")
+            seen_emails.add(email.lower())
+
+    return conflicts
+
+
+def _create_account(username, email, password, fullname):
+    """
+    Creates the user, profile and registration of a new account.
+    """
     data = {
         'username': username,
         'email': email,
-        'password': kwargs.pop("password"),
-        'name': kwargs.pop("fullname"),
+        'password': password,
+        'name': fullname,
     }
-    # Go ahead and create the new user
-    with transaction.atomic():
-        # In theory is possible to extend the registration form with a custom app
-        # An example form app for this can be found at http://github.com/open-craft/custom-form-app
-        # form = get_registration_extension_form(data=params)
-        # if not form:
-        form = AccountCreationForm(
-            data=data,
-            tos_required=False,
-            # TODO: we need to support the extra profile fields as defined in the django.settings
-            # extra_fields=extra_fields,
-            # extended_profile_fields=extended_profile_fields,
-            # enforce_password_policy=enforce_password_policy,
-        )
-        (user, profile, registration) = do_create_account(form)  # pylint: disable=unused-variable
+    # In theory is possible to extend the registration form with a custom app
+    # An example form app for this can be found at http://github.com/open-craft/custom-form-app
+    # form = get_registration_extension_form(data=params)
+    # if not form:
+    form = AccountCreationForm(
+        data=data,
+        tos_required=False,
+        # TODO: we need to support the extra profile fields as defined in the django.settings
+        # extra_fields=extra_fields,
+        # extended_profile_fields=extended_profile_fields,
+        # enforce_password_policy=enforce_password_policy,
+    )
+    (user, profile, registration) = do_create_account(form)  # pylint: disable=unused-variable
+    return user
+
+
+def _finish_edxapp_user_creation(user, **kwargs):
+    """
+    Runs the steps that follow the creation of the account and returns their errors.
+    """
+    errors = []
 
     site = kwargs.pop("site", False)
     if site:
@@ -114,30 +270,43 @@ def create_edxapp_user(*args, **kwargs):
     else:
         errors.append("The user was not assigned to any site")
 
+    # TODO: link account with third party auth
+
+    if kwargs.pop("activate_user", False):
+        user.is_active = True
+        user.save()
+
+    if not kwargs.pop("defer_side_effects", False):
+        errors.extend(run_edxapp_user_side_effects(user, kwargs.pop("language_preference", None)))
+
+    # TODO: run conditional email sequence
+
+    return errors
+
+
+def run_edxapp_user_side_effects(user, language_preference=None):
+    """
+    Creates the comments service user and sets the language preference of a new account.
+
+    Both steps can be repeated safely. Returns the list of errors.
+    """
+    errors = []
+
     try:
         create_comments_service_user(user)
     except Exception:  # pylint: disable=broad-except
         errors.append("No comments_service_user was created")
 
-    # TODO: link account with third party auth
-
-    lang_pref = kwargs.pop("language_preference", False)
-    if lang_pref:
+    if language_preference:
         try:
-            preferences_api.set_user_preference(user, LANGUAGE_KEY, lang_pref)
+            preferences_api.set_user_preference(user, LANGUAGE_KEY, language_preference)
         except Exception:  # pylint: disable=broad-except
             errors.append("Could not set lang preference '{} for user '{}'".format(
-                lang_pref,
+                language_preference,
                 user.username,
             ))
 
-    if kwargs.pop("activate_user", False):
-        user.is_active = True
-        user.save()
-
-    # TODO: run conditional email sequence
-
-    return user, errors
+    return errors
 
 
 def get_edxapp_user(**kwargs):
@@ -169,16 +338,133 @@ def get_edxapp_user(**kwargs):
 
     try:
         user = User.objects.get(**params)
-        for source_method in FetchUserSiteSources.get_enabled_source_methods():
-            if source_method(user, domain):
-                break
-        else:
+        if not user_belongs_to_site(user, domain):
             raise User.DoesNotExist
     except User.DoesNotExist:
         raise NotFound('No user found by {query} on site {site}.'.format(query=str(params), site=domain))
     return user
 
 
+def get_edxapp_users(queries):
+    """
+    Bulk version of get_edxapp_user. Every query takes the same arguments as get_edxapp_user.
+
+    The users of all the queries are fetched with one query and their site
+    membership is checked with another one per site.
+
+    Returns a list with the user of every query, in the same order, or the
+    NotFound error that get_edxapp_user would raise for it.
+    """
+    usernames = {query['username'] for query in queries if query.get('username')}
+    emails = {query['email'] for query in queries if query.get('email')}
+    users = []
+    if usernames or emails:
+        users = list(User.objects.filter(Q(username__in=list(usernames)) | Q(email__in=list(emails))))
+    users_by_username = {user.username.lower(): user for user in users}
+    users_by_email = {user.email.lower(): user for user in users}
+
+    matches = []
+    users_by_domain = {}
+    for query in queries:
+        params = {key: query.get(key) for key in ['username', 'email'] if key in query}
+        try:
+            domain = query.get('site').domain
+        except AttributeError:
+            domain = None
+
+        candidates = []
+        if 'username' in params:
+            candidates.append(users_by_username.get((params['username'] or '').lower()))
+        if 'email' in params:
+            candidates.append(users_by_email.get((params['email'] or '').lower()))
+        user = candidates[0] if candidates and all(candidate is candidates[0] for candidate in candidates) else None
+
+        matches.append((params, domain, user))
+        if user is not None:
+            users_by_domain.setdefault(domain, {})[user.id] = user
+
+    sources = FetchUserSiteSources.get_enabled_sources()
+    members_by_domain = {}
+    for domain, domain_users in users_by_domain.items():
+        if 'fetch_from_unfiltered_table' in sources:
+            members_by_domain[domain] = set(domain_users)
+        else:
+            members_by_domain[domain] = FetchUserSiteSources.members_of_site(
+                list(domain_users.values()),
+                domain,
+                sources,
+            )
+
+    results = []
+    for params, domain, user in matches:
+        if user is None or user.id not in members_by_domain[domain]:
+            results.append(NotFound('No user found by {query} on site {site}.'.format(query=str(params), site=domain)))
+        else:
+            results.append(user)
+    return results
+
+
+def user_belongs_to_site(user, domain):
+    """
+    Checks if `user` belongs to the site `domain` according to the enabled FetchUserSiteSources.
+
+    The result is kept for the rest of the request and, for
+    EOX_CORE_SITE_MEMBERSHIP_CACHE_TIMEOUT seconds, in the shared cache. It is
+    invalidated when a signup source or created_on_site attribute of the user is saved.
+    """
+    sources = FetchUserSiteSources.get_enabled_sources()
+    if 'fetch_from_unfiltered_table' in sources:
+        return True
+
+    key = _get_site_membership_cache_key(user.id, domain)
+    request_cache = RequestCache(__name__)
+    cached_response = request_cache.get_cached_response(key)
+    if cached_response.is_found and cached_response.value[0] == sources:
+        return cached_response.value[1]
+
+    membership = cache.get(key)
+    if membership is None or membership[0] != sources:
+        membership = (sources, FetchUserSiteSources.belongs_to_site(user, domain, sources))
+        cache.set(key, membership, getattr(settings, 'EOX_CORE_SITE_MEMBERSHIP_CACHE_TIMEOUT', 60))
+    request_cache.set(key, membership)
+    return membership[1]
+
+
+def _get_site_membership_cache_key(user_id, domain):
+    """
+    Key of the site membership of a user in the shared and the request caches.
+    """
+    return SITE_MEMBERSHIP_CACHE_KEY.format(user_id, fasthash(domain or ''))
+
+
+def _clear_site_membership(user_id, domain):
+    """
+    Forgets the cached site membership of a user.
+    """
+    key = _get_site_membership_cache_key(user_id, domain)
+    cache.delete(key)
+    RequestCache(__name__).delete(key)
+
+
+@receiver(post_save, sender=UserSignupSource)
+@receiver(post_delete, sender=UserSignupSource)
+def clear_site_membership_by_signup_source(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the site membership when a signup source changes.
+    """
+    _clear_site_membership(instance.user_id, instance.site)
+
+
+@receiver(post_save, sender=UserAttribute)
+@receiver(post_delete, sender=UserAttribute)
+def clear_site_membership_by_attribute(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the site membership when a created_on_site attribute changes.
+    """
+    if instance.name == 'created_on_site':
+        _clear_site_membership(instance.user_id, instance.value)
+
+
 def get_course_team_user(*args, **kwargs):
     """
     Get _course_team_user function.
@@ -199,13 +485,79 @@ class FetchUserSiteSources(object):
     """
 
     @classmethod
-    def get_enabled_source_methods(cls):
-        """ Brings the array of methods to check if an user belongs to a site. """
-        sources = configuration_helpers.get_value(
+    def get_enabled_sources(cls):
+        """ Brings the names of the enabled methods, read once per request and site. """
+        site = getattr(get_current_request(), 'site', None)
+        key = 'enabled_sources.{}'.format(getattr(site, 'id', None))
+        request_cache = RequestCache(__name__)
+        cached_response = request_cache.get_cached_response(key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        sources = tuple(configuration_helpers.get_value(
             'EOX_CORE_USER_ORIGIN_SITE_SOURCES',
             getattr(settings, 'EOX_CORE_USER_ORIGIN_SITE_SOURCES')
-        )
-        return [getattr(cls, source) for source in sources]
+        ))
+        request_cache.set(key, sources)
+        return sources
+
+    @classmethod
+    def get_enabled_source_methods(cls):
+        """ Brings the array of methods to check if an user belongs to a site. """
+        return [getattr(cls, source) for source in cls.get_enabled_sources()]
+
+    @classmethod
+    def belongs_to_site(cls, user, domain, sources):
+        """
+        Runs the `sources` that have a subquery as a single EXISTS query.
+        The sources without one are called one by one.
+        """
+        annotations = {}
+        for source in sources:
+            get_subquery = getattr(cls, '{}_subquery'.format(source), None)
+            if get_subquery is None:
+                if getattr(cls, source)(user, domain):
+                    return True
+                continue
+            subquery = get_subquery(domain)
+            if subquery is not None:
+                annotations[source] = Exists(subquery)
+
+        if not annotations:
+            return False
+
+        condition = Q()
+        for source in annotations:
+            condition |= Q(**{source: True})
+        return User.objects.filter(pk=user.pk).annotate(**annotations).filter(condition).exists()
+
+    @classmethod
+    def members_of_site(cls, users, domain, sources):
+        """
+        Bulk version of belongs_to_site. Returns the ids of the `users` that belong to the site.
+        """
+        members = set()
+        annotations = {}
+        for source in sources:
+            get_subquery = getattr(cls, '{}_subquery'.format(source), None)
+            if get_subquery is None:
+                source_method = getattr(cls, source)
+                members.update(user.id for user in users if user.id not in members and source_method(user, domain))
+                continue
+            subquery = get_subquery(domain)
+            if subquery is not None:
+                annotations[source] = Exists(subquery)
+
+        if annotations:
+            condition = Q()
+            for source in annotations:
+                condition |= Q(**{source: True})
+            members.update(
+                User.objects.filter(
+                    pk__in=[user.id for user in users if user.id not in members],
+                ).annotate(**annotations).filter(condition).values_list('pk', flat=True)
+            )
+        return members
 
     @staticmethod
     def fetch_from_created_on_site_prop(user, domain):
@@ -214,10 +566,22 @@ class FetchUserSiteSources(object):
             return False
         return UserAttribute.get_user_attribute(user, 'created_on_site') == domain
 
+    @staticmethod
+    def fetch_from_created_on_site_prop_subquery(domain):
+        """ Users with the created_on_site attribute of the domain. """
+        if not domain:
+            return None
+        return UserAttribute.objects.filter(user=OuterRef('pk'), name='created_on_site', value=domain)
+
     @staticmethod
     def fetch_from_user_signup_source(user, domain):
         """ Read the signup source. """
-        return len(UserSignupSource.objects.filter(user=user, site=domain)) > 0
+        return UserSignupSource.objects.filter(user=user, site=domain).exists()
+
+    @staticmethod
+    def fetch_from_user_signup_source_subquery(domain):
+        """ Users with a signup source of the domain. """
+        return UserSignupSource.objects.filter(user=OuterRef('pk'), site=domain)
 
     @staticmethod
     def fetch_from_unfiltered_table(user, site):
@@ -2,15 +2,12 @@
 Certificates definitions.
 """
 
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_generated_certificate():
     """ Gets GeneratedCertificate model. """
 
-    backend_function = settings.EOX_CORE_CERTIFICATES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_CERTIFICATES_BACKEND')
 
     return backend.get_generated_certificate()
@@ -4,18 +4,33 @@
 CourseKey public function definitions
 """
 
-from importlib import import_module
+from edx_django_utils.cache import RequestCache  # pylint: disable=import-error
 
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
+
+# Namespace of the request cache with the metadata of the courses used by the current request or bulk job.
+COURSE_METADATA_CACHE_NAMESPACE = 'eox_core.course_metadata'
+
+
+def get_course_metadata_cache():
+    """
+    Return the request cache where the course keys, org validations and course modes are kept
+    """
+    return RequestCache(COURSE_METADATA_CACHE_NAMESPACE)
+
+
+def clear_course_metadata_cache():
+    """
+    Forget the course metadata cached by the current request or bulk job
+    """
+    get_course_metadata_cache().clear()
 
 
 def get_valid_course_key(course_id):
     """
     Return a valid CourseKey for the given course_id
     """
-
-    backend_function = settings.EOX_CORE_COURSEKEY_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_COURSEKEY_BACKEND')
 
     return backend.get_valid_course_key(course_id)
 
@@ -24,8 +39,6 @@ def validate_org(course_id):
     """
     Return a valid CourseKey for the given course_id
     """
-
-    backend_function = settings.EOX_CORE_COURSEKEY_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_COURSEKEY_BACKEND')
 
     return backend.validate_org(course_id)
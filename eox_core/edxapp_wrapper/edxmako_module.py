@@ -1,13 +1,10 @@
 """ Edxmako backend abstraction. """
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def render_to_response(*args, **kwargs):
     """ Return render to response. """
 
-    backend_function = settings.EDXMAKO_MODULE
-    backend = import_module(backend_function)
+    backend = get_backend('EDXMAKO_MODULE')
 
     return backend.render_to_response(*args, **kwargs)
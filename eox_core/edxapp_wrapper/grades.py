@@ -2,15 +2,12 @@
 Grades definitions.
 """
 
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_course_grade_factory():
     """ Gets the CourseGradeFactory object. """
 
-    backend_function = settings.EOX_CORE_GRADES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_GRADES_BACKEND')
 
     return backend.get_course_grade_factory()
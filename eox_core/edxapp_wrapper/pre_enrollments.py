@@ -4,9 +4,7 @@
 Pre-enrollment public function definitions
 """
 
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def create_pre_enrollment(*args, **kwargs):
@@ -14,19 +12,27 @@ def create_pre_enrollment(*args, **kwargs):
     Create a pre-enrollment for an existing or future user
     """
 
-    backend_function = settings.EOX_CORE_PRE_ENROLLMENT_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_PRE_ENROLLMENT_BACKEND')
 
     return backend.create_pre_enrollment(*args, **kwargs)
 
 
+def create_pre_enrollments(pre_enrollments):
+    """
+    Create a list of pre-enrollments at once
+    """
+
+    backend = get_backend('EOX_CORE_PRE_ENROLLMENT_BACKEND')
+
+    return backend.create_pre_enrollments(pre_enrollments)
+
+
 def update_pre_enrollment(*args, **kwargs):
     """
     Update a pre-enrollment for an existing or future user
     """
 
-    backend_function = settings.EOX_CORE_PRE_ENROLLMENT_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_PRE_ENROLLMENT_BACKEND')
 
     return backend.update_pre_enrollment(*args, **kwargs)
 
@@ -36,8 +42,7 @@ def delete_pre_enrollment(*args, **kwargs):
     Delete a pre-enrollment for an existing or future user
     """
 
-    backend_function = settings.EOX_CORE_PRE_ENROLLMENT_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_PRE_ENROLLMENT_BACKEND')
 
     return backend.delete_pre_enrollment(*args, **kwargs)
 
@@ -47,7 +52,6 @@ def get_pre_enrollment(*args, **kwargs):
     Get a pre-enrollment for an existing or future user
     """
 
-    backend_function = settings.EOX_CORE_PRE_ENROLLMENT_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_PRE_ENROLLMENT_BACKEND')
 
     return backend.get_pre_enrollment(*args, **kwargs)
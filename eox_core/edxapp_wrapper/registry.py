@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Registry of the resolved edxapp backends.
+
+Every public function of the edxapp_wrapper modules dispatches to the backend
+module named in a django setting. Resolving that module with import_module on
+each call adds up on the hot paths (the enrollment flow calls validate_org and
+get_valid_course_key several times per request), so the modules are resolved
+once, kept here and dropped again when the setting changes.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import logging
+from importlib import import_module
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+LOG = logging.getLogger(__name__)
+
+# Settings holding the dotted path of a backend module used by the wrappers.
+BACKEND_SETTINGS = (
+    'EOX_CORE_USERS_BACKEND',
+    'EOX_CORE_ENROLLMENT_BACKEND',
+    'EOX_CORE_PRE_ENROLLMENT_BACKEND',
+    'EOX_CORE_CERTIFICATES_BACKEND',
+    'EOX_CORE_CONFIGURATION_HELPER_BACKEND',
+    'EOX_CORE_COURSEWARE_BACKEND',
+    'EOX_CORE_GRADES_BACKEND',
+    'EOX_CORE_STORAGES_BACKEND',
+    'EOX_CORE_COURSES_BACKEND',
+    'EOX_CORE_COURSEKEY_BACKEND',
+    'EOX_CORE_BEARER_AUTHENTICATION',
+    'EDXMAKO_MODULE',
+)
+
+_BACKENDS = {}
+
+
+def get_backend(setting_name):
+    """
+    Return the backend module configured in the `setting_name` setting.
+
+    The module is imported the first time it is requested and served from
+    the registry afterwards.
+    """
+    try:
+        return _BACKENDS[setting_name]
+    except KeyError:
+        pass
+
+    backend = import_module(getattr(settings, setting_name))
+    _BACKENDS[setting_name] = backend
+    return backend
+
+
+def load_backends():
+    """
+    Resolve all the known backends. Called once the app registry is ready.
+
+    A backend that can not be imported at this point is skipped and will be
+    resolved lazily on its first use, the same way it was before.
+    """
+    for setting_name in BACKEND_SETTINGS:
+        if not getattr(settings, setting_name, None):
+            continue
+        try:
+            get_backend(setting_name)
+        except Exception:  # pylint: disable=broad-except
+            LOG.debug('Backend for %s could not be preloaded, it will be loaded on first use.', setting_name)
+
+
+def clear_backends(setting_name=None):
+    """
+    Forget the resolved backend for `setting_name`, or all of them if no setting is given.
+    """
+    if setting_name is None:
+        _BACKENDS.clear()
+    else:
+        _BACKENDS.pop(setting_name, None)
+
+
+@receiver(setting_changed)
+def reset_backend(sender, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the resolved backend when its setting is changed, e.g. by override_settings.
+    """
+    if setting in _BACKENDS:
+        clear_backends(setting)
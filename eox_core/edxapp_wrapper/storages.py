@@ -3,17 +3,14 @@
 """
 Storages public function definitions
 """
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_edxapp_production_staticfiles_storage():  # pylint: disable=invalid-name
     """
     Return the edx-platform production staticfiles storage
     """
-    backend_function = settings.EOX_CORE_STORAGES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_STORAGES_BACKEND')
 
     return backend.get_edxapp_production_staticfiles_storage()
 
@@ -22,7 +19,6 @@ def get_edxapp_development_staticfiles_storage():  # pylint: disable=invalid-nam
     """
     Return the edx-platform production staticfiles storage
     """
-    backend_function = settings.EOX_CORE_STORAGES_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_STORAGES_BACKEND')
 
     return backend.get_edxapp_development_staticfiles_storage()
@@ -10,6 +10,7 @@ from django.conf import settings
 from django.test import TestCase
 
 from ..coursekey import get_valid_course_key, validate_org
+from ..registry import clear_backends
 
 
 class CourseKeyTest(TestCase):
@@ -18,16 +19,18 @@ class CourseKeyTest(TestCase):
     def setUp(self):
         """ setup """
         super(CourseKeyTest, self).setUp()
+        clear_backends()
+        self.addCleanup(clear_backends)
         self.m_course_id = "course-v1:org+course+run"
 
-    @mock.patch('eox_core.edxapp_wrapper.coursekey.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_import_the_backend(self, m_import):
         """ Test we import the correct backend defined in the settings """
 
         validate_org(self.m_course_id)
         m_import.assert_called_with(settings.EOX_CORE_COURSEKEY_BACKEND)
 
-    @mock.patch('eox_core.edxapp_wrapper.coursekey.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_call_the_backend(self, m_import):
         """ Test we use the imported backend """
         m_coursekey_backend = mock.MagicMock()
@@ -38,3 +41,14 @@ class CourseKeyTest(TestCase):
 
         get_valid_course_key(self.m_course_id)
         m_coursekey_backend.get_valid_course_key.assert_called_with(self.m_course_id)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_wrapper_is_not_cached(self, m_import):
+        """ Test the wrapper only dispatches, the backend caches what it needs """
+        m_coursekey_backend = mock.MagicMock()
+        m_import.return_value = m_coursekey_backend
+
+        validate_org(self.m_course_id)
+        validate_org(self.m_course_id)
+
+        self.assertEqual(m_coursekey_backend.validate_org.call_count, 2)
@@ -9,7 +9,14 @@ import mock
 from django.conf import settings
 from django.test import TestCase
 
-from ..pre_enrollments import create_pre_enrollment, delete_pre_enrollment, get_pre_enrollment, update_pre_enrollment
+from ..pre_enrollments import (
+    create_pre_enrollment,
+    create_pre_enrollments,
+    delete_pre_enrollment,
+    get_pre_enrollment,
+    update_pre_enrollment,
+)
+from ..registry import clear_backends
 
 
 class PreEnrollmentTest(TestCase):
@@ -18,20 +25,22 @@ class PreEnrollmentTest(TestCase):
     def setUp(self):
         """ setup """
         super(PreEnrollmentTest, self).setUp()
+        clear_backends()
+        self.addCleanup(clear_backends)
         self.m_params = {
             'email': 'test@example.com',
             'course_id': 'course-v1:org+course+run',
             'auto_enroll': True,
         }
 
-    @mock.patch('eox_core.edxapp_wrapper.pre_enrollments.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_import_the_backend(self, m_import):
         """ Test we import the correct backend defined in the settings """
 
         create_pre_enrollment()
         m_import.assert_called_with(settings.EOX_CORE_PRE_ENROLLMENT_BACKEND)
 
-    @mock.patch('eox_core.edxapp_wrapper.pre_enrollments.import_module')
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_call_the_backend(self, m_import):
         """ Test we use the imported backend """
         m_pre_enrollment_backend = mock.MagicMock()
@@ -40,6 +49,9 @@ class PreEnrollmentTest(TestCase):
         create_pre_enrollment(self.m_params)
         m_pre_enrollment_backend.create_pre_enrollment.assert_called_with(self.m_params)
 
+        create_pre_enrollments([self.m_params])
+        m_pre_enrollment_backend.create_pre_enrollments.assert_called_with([self.m_params])
+
         update_pre_enrollment(self.m_params)
         m_pre_enrollment_backend.update_pre_enrollment.assert_called_with(self.m_params)
 
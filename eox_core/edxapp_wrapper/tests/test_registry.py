@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test module for the registry of resolved edxapp backends
+"""
+from __future__ import absolute_import, unicode_literals
+
+import mock
+from django.test import TestCase, override_settings
+
+from ..registry import clear_backends, get_backend, load_backends
+
+
+class BackendRegistryTest(TestCase):
+    """ Tests the backends are resolved once and invalidated on setting changes """
+
+    def setUp(self):
+        """ setup """
+        super(BackendRegistryTest, self).setUp()
+        clear_backends()
+        self.addCleanup(clear_backends)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_backend_is_imported_once(self, m_import):
+        """ Test consecutive calls reuse the resolved backend """
+        first = get_backend('EOX_CORE_COURSEKEY_BACKEND')
+        second = get_backend('EOX_CORE_COURSEKEY_BACKEND')
+
+        m_import.assert_called_once()
+        self.assertIs(first, second)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_setting_change_invalidates_backend(self, m_import):
+        """ Test the backend is resolved again when its setting changes """
+        get_backend('EOX_CORE_COURSEKEY_BACKEND')
+
+        with override_settings(EOX_CORE_COURSEKEY_BACKEND='some.other.backend'):
+            get_backend('EOX_CORE_COURSEKEY_BACKEND')
+            m_import.assert_called_with('some.other.backend')
+
+        self.assertEqual(m_import.call_count, 2)
+
+    @mock.patch('eox_core.edxapp_wrapper.registry.import_module')
+    def test_load_backends_ignores_import_errors(self, m_import):
+        """ Test a backend that can not be preloaded is left for lazy loading """
+        m_import.side_effect = ImportError
+
+        load_backends()
+
+        m_import.side_effect = None
+        get_backend('EOX_CORE_USERS_BACKEND')
+        m_import.assert_called_with('eox_core.edxapp_wrapper.backends.users_h_v1_test')
@@ -4,34 +4,53 @@
 Users public function definitions
 """
 
-from importlib import import_module
-
-from django.conf import settings
+from eox_core.edxapp_wrapper.registry import get_backend
 
 
 def get_edxapp_user(*args, **kwargs):
     """ Creates the edxapp user """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_edxapp_user(*args, **kwargs)
 
 
+def get_edxapp_users(*args, **kwargs):
+    """ Gets many edxapp users at once """
+
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
+
+    return backend.get_edxapp_users(*args, **kwargs)
+
+
 def create_edxapp_user(*args, **kwargs):
     """ Creates the edxapp user """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.create_edxapp_user(*args, **kwargs)
 
 
+def create_edxapp_users(*args, **kwargs):
+    """ Creates many edxapp users """
+
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
+
+    return backend.create_edxapp_users(*args, **kwargs)
+
+
+def run_edxapp_user_side_effects(*args, **kwargs):
+    """ Runs the steps after the creation of a user that can be deferred """
+
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
+
+    return backend.run_edxapp_user_side_effects(*args, **kwargs)
+
+
 def get_user_read_only_serializer(*args, **kwargs):
     """ Gets the Open edX model UserProfile """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_user_read_only_serializer(*args, **kwargs)
 
@@ -39,17 +58,23 @@ def get_user_read_only_serializer(*args, **kwargs):
 def check_edxapp_account_conflicts(*args, **kwargs):
     """ Checks the db for accounts with the same email or password """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.check_edxapp_account_conflicts(*args, **kwargs)
 
 
+def check_edxapp_accounts_conflicts(*args, **kwargs):
+    """ Checks the db for accounts with the same email or password for a list of accounts """
+
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
+
+    return backend.check_edxapp_accounts_conflicts(*args, **kwargs)
+
+
 def get_course_enrollment():
     """ Gets the CourseEnrollment model """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_course_enrollment()
 
@@ -57,8 +82,7 @@ def get_course_enrollment():
 def get_course_team_user(*args, **kwargs):
     """ Gets the course_team_user function """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_course_team_user(*args, **kwargs)
 
@@ -66,8 +90,7 @@ def get_course_team_user(*args, **kwargs):
 def get_user_signup_source():
     """ Gets the UserSignupSource model """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_user_signup_source()
 
@@ -75,14 +98,12 @@ def get_user_signup_source():
 def get_user_profile():
     """ Gets the UserProfile model """
 
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
 
     return backend.get_user_profile()
 
 
 def get_username_max_length():
     """ Gets max length allowed for the username"""
-    backend_function = settings.EOX_CORE_USERS_BACKEND
-    backend = import_module(backend_function)
+    backend = get_backend('EOX_CORE_USERS_BACKEND')
     return backend.USERNAME_MAX_LENGTH
@@ -0,0 +1,23 @@
+"""
+Management command to delete the data API reports older than their retention.
+"""
+from __future__ import absolute_import, unicode_literals
+
+from django.core.management.base import BaseCommand
+
+from eox_core.api.data.v1.reports import delete_expired_reports
+
+
+class Command(BaseCommand):
+    """
+    Deletes the report files of the data API older than DATA_API_REPORTS_RETENTION_DAYS,
+    and the parts left by the reports that failed. Meant to be run periodically.
+
+    Usage:
+        ./manage.py lms delete_expired_data_api_reports
+    """
+    help = 'Delete the data API report files older than DATA_API_REPORTS_RETENTION_DAYS.'
+
+    def handle(self, *args, **options):
+        deleted = delete_expired_reports()
+        self.stdout.write('Deleted {} expired reports.'.format(len(deleted)))
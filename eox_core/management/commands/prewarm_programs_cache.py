@@ -0,0 +1,52 @@
+"""
+Management command to load the programs of the catalog of a site into the cache.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import logging
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+
+from eox_core.edxapp_wrapper.backends.edxfuture_i_v1 import get_program, get_program_uuids
+
+LOG = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Fetches every program of the catalog and stores it in the program cache used by
+    the bundle enrollments, so they do not wait for the catalog.
+
+    Usage:
+        ./manage.py lms prewarm_programs_cache --site-domain courses.example.com
+    """
+    help = 'Load the programs of the catalog of a site into the cache used by the bundle enrollments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site-domain',
+            dest='site_domain',
+            help='Domain of the site whose catalog is read. The default catalog is used if not given.',
+        )
+
+    def handle(self, *args, **options):
+        site = None
+        if options['site_domain']:
+            try:
+                site = Site.objects.get(domain=options['site_domain'])
+            except Site.DoesNotExist:
+                raise CommandError('Site {} not found'.format(options['site_domain']))
+
+        program_uuids = get_program_uuids(site=site)
+        failed = []
+        for program_uuid in program_uuids:
+            try:
+                get_program(program_uuid, ignore_cache=True, site=site)
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception('Could not cache the program %s', program_uuid)
+                failed.append(program_uuid)
+
+        self.stdout.write('Cached {} of {} programs.'.format(len(program_uuids) - len(failed), len(program_uuids)))
+        if failed:
+            raise CommandError('Could not cache the programs {}'.format(', '.join(str(uuid) for uuid in failed)))
@@ -8,24 +8,159 @@ A microsite enables the following features:
 """
 import logging
 import re
+import threading
+import time
 
 import six
 from django.conf import settings
 from django.contrib.auth import REDIRECT_FIELD_NAME
 from django.contrib.auth.views import redirect_to_login
-from django.db.models.signals import post_save
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.http import Http404, HttpResponseRedirect
 from django.utils.deprecation import MiddlewareMixin
 
 from eox_core.edxapp_wrapper.configuration_helpers import get_configuration_helper
 from eox_core.models import Redirection
-from eox_core.utils import cache, fasthash
+from eox_core.utils import LocalLRUCache, cache, fasthash
 
 configuration_helper = get_configuration_helper()  # pylint: disable=invalid-name
 
 LOG = logging.getLogger(__name__)
 
+# Named groups can be repeated among the redirect rules, so they are turned into plain groups
+# when the rules are merged. Backreferences, conditionals and inline flags can not be merged.
+NAMED_GROUP_RE = re.compile(r'\(\?P<\w+>')
+UNMERGEABLE_RE = re.compile(r'\(\?P=|\\[1-9]|\(\?\(|\(\?[aiLmsux]+\)')
+
+# In-process tier in front of the shared cache used by RedirectionsMiddleware. The entries
+# are tagged with the generation of the redirections stored in the shared cache, which
+# every worker checks at most once per EOX_CORE_REDIRECTIONS_GENERATION_CHECK_INTERVAL.
+REDIRECTIONS_GENERATION_CACHE_KEY = "redirect_cache.generation"
+LOCAL_REDIRECTIONS = LocalLRUCache(
+    maxsize=getattr(settings, 'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE', 1024),
+    timeout=getattr(settings, 'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT', 60),
+)
+_REDIRECTIONS_GENERATION = {'value': None, 'checked_at': 0}
+
+COMPILED_REDIRECTS = LocalLRUCache(maxsize=getattr(settings, 'EOX_CORE_COMPILED_REDIRECTS_CACHE_SIZE', 512))
+
+
+class CustomPathRedirectTable(object):
+    """
+    Compiled form of an EDNX_CUSTOM_PATH_REDIRECTS setting.
+
+    All the rules are merged into a single alternation, so finding the redirect
+    for a path is one regex match regardless of the number of rules. Each rule is
+    wrapped in its own group and the alternatives are tried in the configured
+    order, so the first matching rule wins, the same as checking them one by one.
+    """
+
+    def __init__(self, redirects):
+        self.rules = []
+        self.patterns = []
+        self.combined = None
+        self.rule_by_group = {}
+
+        for regex, values in six.iteritems(redirects):
+            if isinstance(values, dict):
+                key = next(iter(values))
+            else:
+                key = values
+
+            try:
+                pattern = regex.format(
+                    COURSE_ID_PATTERN=settings.COURSE_ID_PATTERN,
+                    USERNAME_PATTERN=settings.USERNAME_PATTERN,
+                )
+                compiled = re.compile(pattern)
+            except (re.error, IndexError, KeyError, ValueError) as error:
+                LOG.error("Invalid EDNX_CUSTOM_PATH_REDIRECTS rule %s: %s", regex, error)
+                continue
+
+            self.rules.append((key, values))
+            self.patterns.append((pattern, compiled))
+
+        self.combined = self._combine()
+
+    def _combine(self):
+        """
+        Merge all the patterns in one regex. Returns None when that is not possible,
+        in which case the patterns are matched one after the other.
+        """
+        alternatives = []
+        group_index = 1
+        for rule_index, (pattern, compiled) in enumerate(self.patterns):
+            if UNMERGEABLE_RE.search(pattern):
+                return None
+            alternatives.append('({})'.format(NAMED_GROUP_RE.sub('(', pattern)))
+            self.rule_by_group[group_index] = rule_index
+            group_index += compiled.groups + 1
+
+        if not alternatives:
+            return None
+
+        try:
+            return re.compile('|'.join(alternatives))
+        except (re.error, AssertionError, OverflowError):
+            return None
+
+    def match(self, path):
+        """
+        Return the (key, values) of the first rule matching `path`, or None.
+        """
+        if self.combined is not None:
+            path_match = self.combined.match(path)
+            if not path_match:
+                return None
+            return self.rules[self.rule_by_group[path_match.lastindex]]
+
+        for rule, (_, compiled) in zip(self.rules, self.patterns):
+            if compiled.match(path):
+                return rule
+        return None
+
+
+def build_mktg_redirects_index(redirects):
+    """
+    Return a dictionary mapping the normalized path of each MKTG_REDIRECTS key to its target.
+
+    Keys are normalized the same way the middleware always did: the html extension is
+    stripped off and a leading slash is added. Empty targets are left out and, if two
+    keys end up in the same path, the first one is kept.
+    """
+    index = {}
+    for key, value in six.iteritems(redirects):
+        if not value:
+            continue
+        # Strip off html extension to have backwards
+        # compatibility to keys defined with template style.
+        path = '/{}'.format(key.replace('.html', ''))
+        index.setdefault(path, value)
+    return index
+
+
+def get_compiled_redirects(setting_name, site_key, redirects, builder):
+    """
+    Return `builder(redirects)`, building it only once per site configuration.
+
+    The compiled value is stored by site along with the configuration it was built
+    from. The configuration object is usually the same between requests, so checking
+    that it did not change is an identity check; otherwise the configurations are
+    compared and the value is built again only if they differ.
+    """
+    cache_key = (setting_name, site_key)
+    entry = COMPILED_REDIRECTS.get(cache_key)
+    if entry is not None:
+        source, compiled = entry
+        if source is redirects or source == redirects:
+            return compiled
+
+    compiled = builder(redirects)
+    COMPILED_REDIRECTS.set(cache_key, (redirects, compiled))
+    return compiled
+
 
 class PathRedirectionMiddleware(MiddlewareMixin):
     """
@@ -64,31 +199,28 @@ class PathRedirectionMiddleware(MiddlewareMixin):
 
         path = request.path_info
 
-        for regex, values in six.iteritems(redirects):
-
-            if isinstance(values, dict):
-                key = next(iter(values))
-            else:
-                key = values
+        table = get_compiled_redirects(
+            "EDNX_CUSTOM_PATH_REDIRECTS",
+            request.META.get('HTTP_HOST', ""),
+            redirects,
+            CustomPathRedirectTable,
+        )
+        route = table.match(path)
+        if route is None:
+            return None
 
-            regex_path_match = re.compile(regex.format(
-                COURSE_ID_PATTERN=settings.COURSE_ID_PATTERN,
-                USERNAME_PATTERN=settings.USERNAME_PATTERN,
-            ))
-
-            if regex_path_match.match(path):
-                try:
-                    action = getattr(self, key)
-                    return action(request=request, key=key, values=values, path=path)
-                except Http404:  # we expect 404 to be raised
-                    raise
-                except Exception as error:  # pylint: disable=broad-except
-                    LOG.error("The PathRedirectionMiddleware generated an error at: %s%s",
-                              request.get_host(),
-                              request.get_full_path())
-                    LOG.error(error)
-                    return None
-        return None
+        key, values = route
+        try:
+            action = getattr(self, key)
+            return action(request=request, key=key, values=values, path=path)
+        except Http404:  # we expect 404 to be raised
+            raise
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.error("The PathRedirectionMiddleware generated an error at: %s%s",
+                      request.get_host(),
+                      request.get_full_path())
+            LOG.error(error)
+            return None
 
     def process_mktg_redirect(self, request):
         """
@@ -98,28 +230,26 @@ class PathRedirectionMiddleware(MiddlewareMixin):
         redirects = configuration_helper.get_value("MKTG_REDIRECTS", {})
         path = request.path_info
 
-        for key, value in six.iteritems(redirects):
-
-            # Strip off html extension to have backwards
-            # compatibility to keys defined with template style.
-            key = key.replace('.html', '')
-            key = '/{}'.format(key)
-
-            # Just continue if the path does not match or the redirect value is empty
-            # TODO: validate that the key corresponds to a Marketing path
-            if path != key or not value:
-                continue
+        index = get_compiled_redirects(
+            "MKTG_REDIRECTS",
+            request.META.get('HTTP_HOST', ""),
+            redirects,
+            build_mktg_redirects_index,
+        )
+        # TODO: validate that the key corresponds to a Marketing path
+        value = index.get(path)
+        if not value:
+            return None
 
-            try:
-                values = {key: value}
-                return self.redirect_always(key=key, values=values)
-            except Exception as error:  # pylint: disable=broad-except
-                LOG.error("The PathRedirectionMiddleware generated an error at: %s%s",
-                          request.get_host(),
-                          request.get_full_path())
-                LOG.error(error)
-                return None
-        return None
+        try:
+            values = {path: value}
+            return self.redirect_always(key=path, values=values)
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.error("The PathRedirectionMiddleware generated an error at: %s%s",
+                      request.get_host(),
+                      request.get_full_path())
+            LOG.error(error)
+            return None
 
     def login_required(self, request, path, **kwargs):  # pylint: disable=unused-argument
         """
@@ -175,6 +305,115 @@ class PathRedirectionMiddleware(MiddlewareMixin):
         return None
 
 
+def get_redirections_generation():
+    """
+    Return the generation of the redirections stored in the shared cache.
+
+    The value is read from the shared cache at most once per check interval, so
+    most requests do not leave the worker to find out whether the redirections changed.
+    """
+    now = time.time()
+    interval = getattr(settings, 'EOX_CORE_REDIRECTIONS_GENERATION_CHECK_INTERVAL', 5)
+    if now - _REDIRECTIONS_GENERATION['checked_at'] < interval:
+        return _REDIRECTIONS_GENERATION['value']
+
+    generation = cache.get(REDIRECTIONS_GENERATION_CACHE_KEY)  # pylint: disable=maybe-no-member
+    if generation is None:
+        # A new starting value, so an evicted generation is never mistaken for a previous one
+        cache.add(REDIRECTIONS_GENERATION_CACHE_KEY, int(now * 1000), None)  # pylint: disable=maybe-no-member
+        generation = cache.get(REDIRECTIONS_GENERATION_CACHE_KEY)  # pylint: disable=maybe-no-member
+
+    _REDIRECTIONS_GENERATION['value'] = generation
+    _REDIRECTIONS_GENERATION['checked_at'] = now
+    return generation
+
+
+def bump_redirections_generation():
+    """
+    Invalidate the in-process redirections of every worker.
+    """
+    try:
+        cache.incr(REDIRECTIONS_GENERATION_CACHE_KEY)  # pylint: disable=maybe-no-member
+    except ValueError:
+        cache.set(  # pylint: disable=maybe-no-member
+            REDIRECTIONS_GENERATION_CACHE_KEY, int(time.time() * 1000), None
+        )
+    LOCAL_REDIRECTIONS.clear()
+    _REDIRECTIONS_GENERATION['checked_at'] = 0
+
+
+class PreloadedRedirections(object):
+    """
+    All the Redirection rows of the db kept in memory, keyed by lowercase domain.
+
+    The rows are loaded in one query the first time they are needed. When the
+    generation of the redirections changes, the map is reloaded by a background
+    thread while the current one keeps serving the requests.
+    """
+
+    def __init__(self):
+        self.redirections = None
+        self.generation = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self, domain, generation):
+        """
+        Return the Redirection of the domain or '##none' if there is not one.
+        """
+        if self.redirections is None:
+            self.load(generation)
+        elif self.generation != generation:
+            self.refresh_in_background(generation)
+        return self.redirections.get(domain.lower(), '##none')
+
+    def load(self, generation):
+        """
+        Replace the map with the current rows of the redirections table.
+        """
+        redirections = {}
+        for redirection in Redirection.objects.order_by('id'):  # pylint: disable=no-member
+            redirections.setdefault(redirection.domain.lower(), redirection)
+        self.redirections = redirections
+        self.generation = generation
+
+    def refresh_in_background(self, generation):
+        """
+        Start reloading the map in a new thread, unless a reload is already running.
+        """
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        thread = threading.Thread(target=self._refresh, args=(generation,))
+        thread.daemon = True
+        thread.start()
+
+    def _refresh(self, generation):
+        """
+        Reload the map, releasing the db connection opened by this thread.
+        """
+        try:
+            self.load(generation)
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception("The redirections could not be reloaded")
+        finally:
+            self._refreshing = False
+            connection.close()
+
+    def clear(self):
+        """
+        Forget the loaded rows, they will be loaded again on the next lookup.
+        """
+        self.redirections = None
+        self.generation = None
+        self._refreshing = False
+
+
+PRELOADED_REDIRECTIONS = PreloadedRedirections()
+
+
 class RedirectionsMiddleware(MiddlewareMixin):
     """
     Middleware for Redirecting microsites to other domains or to error pages
@@ -191,18 +430,7 @@ class RedirectionsMiddleware(MiddlewareMixin):
         domain = request.META.get('HTTP_HOST', "")
 
         # First handle the event where a domain has a redirect target
-        cache_key = "redirect_cache." + fasthash(domain)
-        target = cache.get(cache_key)  # pylint: disable=maybe-no-member
-
-        if not target:
-            try:
-                target = Redirection.objects.get(domain__iexact=domain)  # pylint: disable=no-member
-            except Redirection.DoesNotExist:  # pylint: disable=no-member
-                target = '##none'
-
-            cache.set(  # pylint: disable=maybe-no-member
-                cache_key, target, 5 * 60
-            )
+        target = self.get_redirection_target(domain)
 
         if target != '##none':
             # If we are already at the target, just return
@@ -221,11 +449,47 @@ class RedirectionsMiddleware(MiddlewareMixin):
             )
         return None
 
+    @staticmethod
+    def get_redirection_target(domain):
+        """
+        Return the Redirection of the domain or '##none' if there is not one.
+
+        Lookups are served from the in-process cache while the generation of the
+        redirections does not change, then from the shared cache and finally from the db.
+        With EOX_CORE_REDIRECTIONS_PRELOAD all the rows are kept in memory instead.
+        """
+        generation = get_redirections_generation()
+        if getattr(settings, 'EOX_CORE_REDIRECTIONS_PRELOAD', False):
+            return PRELOADED_REDIRECTIONS.get(domain, generation)
+
+        local_entry = LOCAL_REDIRECTIONS.get(domain)
+        if local_entry is not None and local_entry[0] == generation:
+            return local_entry[1]
+
+        cache_key = "redirect_cache." + fasthash(domain)
+        target = cache.get(cache_key)  # pylint: disable=maybe-no-member
+
+        if not target:
+            try:
+                target = Redirection.objects.get(domain__iexact=domain)  # pylint: disable=no-member
+            except Redirection.DoesNotExist:  # pylint: disable=no-member
+                target = '##none'
+
+            cache.set(  # pylint: disable=maybe-no-member
+                cache_key, target, 5 * 60
+            )
+
+        LOCAL_REDIRECTIONS.set(domain, (generation, target))
+        return target
+
     @staticmethod
     @receiver(post_save, sender=Redirection)
+    @receiver(post_delete, sender=Redirection)
     def clear_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
         """
-        Clear the cached template when the model is saved
+        Clear the cached template when the model is saved or deleted
         """
         cache_key = "redirect_cache." + fasthash(instance.domain)
         cache.delete(cache_key)  # pylint: disable=maybe-no-member
+        # Other workers must not reload the redirections before the change is committed
+        transaction.on_commit(bump_redirections_generation)
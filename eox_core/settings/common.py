@@ -32,6 +32,18 @@ def plugin_settings(settings):
     settings.EOX_CORE_LOAD_PERMISSIONS = True
     settings.DATA_API_DEF_PAGE_SIZE = 1000
     settings.DATA_API_MAX_PAGE_SIZE = 5000
+    # Rows read from the database at once by the export action of the data API
+    settings.DATA_API_EXPORT_CHUNK_SIZE = 2000
+    # Read the data API lists and exports with values() projections of the serializers instead of model instances
+    settings.DATA_API_VALUES_PROJECTION = True
+    # Enrollments of a course read by each of the parallel tasks of a grades report
+    settings.DATA_API_GRADES_REPORT_CHUNK_SIZE = 500
+    # Storage class of the data API report files. Required by the grades reports, it must be a private storage
+    settings.DATA_API_REPORTS_STORAGE = None
+    # Directory of the data API report files in their storage
+    settings.DATA_API_REPORTS_DIR = 'eox_core/data_api_reports'
+    # Days the data API report files are kept before delete_expired_data_api_reports removes them
+    settings.DATA_API_REPORTS_RETENTION_DAYS = 7
     settings.EDXMAKO_MODULE = "eox_core.edxapp_wrapper.backends.edxmako_module"
     settings.EOX_CORE_COURSES_BACKEND = "eox_core.edxapp_wrapper.backends.courses_h_v1"
     settings.EOX_CORE_COURSEKEY_BACKEND = "eox_core.edxapp_wrapper.backends.coursekey_h_v1"
@@ -43,6 +55,45 @@ def plugin_settings(settings):
     settings.EOX_CORE_ENABLE_UPDATE_USERS = True
     settings.EOX_CORE_USER_UPDATE_SAFE_FIELDS = ["is_active", "password", "fullname"]
     settings.EOX_CORE_BEARER_AUTHENTICATION = 'eox_core.edxapp_wrapper.backends.bearer_authentication_j_v1'
+    # Number of compiled EDNX_CUSTOM_PATH_REDIRECTS tables and MKTG_REDIRECTS indexes kept in memory by each worker
+    settings.EOX_CORE_COMPILED_REDIRECTS_CACHE_SIZE = 512
+    # In-process cache of the RedirectionsMiddleware lookups, in front of the shared cache
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE = 1024
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT = 60
+    settings.EOX_CORE_REDIRECTIONS_GENERATION_CHECK_INTERVAL = 5
+    # Load the whole redirections table in memory in every worker instead of looking up each domain
+    settings.EOX_CORE_REDIRECTIONS_PRELOAD = False
+    # Digest used for cache keys (blake2b, md5 or md4 to keep the keys of previous versions)
+    settings.EOX_CORE_FASTHASH_ALGORITHM = 'blake2b'
+    settings.EOX_CORE_FASTHASH_TIMING = False
+    # Bulk user creation: largest list accepted by the API and accounts created per transaction
+    settings.EOX_CORE_BULK_USERS_MAX_ITEMS = 1000
+    settings.EOX_CORE_BULK_USERS_CHUNK_SIZE = 100
+    # Run the comments service user and language preference of new users in a celery task
+    settings.EOX_CORE_USER_CREATION_ASYNC = False
+    # Seconds the site membership of a user is kept in the shared cache
+    settings.EOX_CORE_SITE_MEMBERSHIP_CACHE_TIMEOUT = 60
+    # Seconds the set of orgs filtered by the sites, used by validate_org, is kept in the shared cache
+    settings.EOX_CORE_ORG_SITE_INDEX_CACHE_TIMEOUT = 300
+    # Program cache of the bundle enrollments: seconds a program is served stale after PROGRAMS_CACHE_TTL,
+    # seconds a failed lookup is cached and seconds a refresh holds its lock
+    settings.EOX_CORE_PROGRAMS_CACHE_STALE_TTL = 3600
+    settings.EOX_CORE_PROGRAMS_NEGATIVE_CACHE_TTL = 10
+    settings.EOX_CORE_PROGRAMS_CACHE_LOCK_TIMEOUT = 30
+    # Enrollments written per transaction by the bulk enrollment API
+    settings.EOX_CORE_BULK_ENROLLMENTS_CHUNK_SIZE = 100
+    # Lines of the streaming enrollment API processed at once
+    settings.EOX_CORE_ENROLLMENT_STREAM_BATCH_SIZE = 100
+    # Bulk jobs: largest list accepted, items processed per chunk and page size of their results
+    settings.EOX_CORE_BULK_JOBS_MAX_ITEMS = 10000
+    settings.EOX_CORE_BULK_JOBS_CHUNK_SIZE = 100
+    settings.EOX_CORE_BULK_JOBS_PAGE_SIZE = 100
+    settings.EOX_CORE_BULK_JOBS_MAX_PAGE_SIZE = 1000
+    # Seconds the responses of the items of a finished bulk job are kept in the shared cache
+    settings.EOX_CORE_BULK_JOBS_RESULTS_TIMEOUT = 24 * 60 * 60
+    # Bulk pre-enrollments: largest list accepted by the API and rows written per bulk_create batch
+    settings.EOX_CORE_BULK_PRE_ENROLLMENTS_MAX_ITEMS = 20000
+    settings.EOX_CORE_BULK_PRE_ENROLLMENTS_CHUNK_SIZE = 1000
 
     if settings.EOX_CORE_USER_ENABLE_MULTI_TENANCY:
         settings.EOX_CORE_USER_ORIGIN_SITE_SOURCES = [
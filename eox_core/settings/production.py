@@ -71,6 +71,30 @@ def plugin_settings(settings):  # pylint: disable=function-redefined
         'DATA_API_MAX_PAGE_SIZE',
         settings.DATA_API_MAX_PAGE_SIZE
     )
+    settings.DATA_API_EXPORT_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_EXPORT_CHUNK_SIZE',
+        settings.DATA_API_EXPORT_CHUNK_SIZE
+    )
+    settings.DATA_API_VALUES_PROJECTION = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_VALUES_PROJECTION',
+        settings.DATA_API_VALUES_PROJECTION
+    )
+    settings.DATA_API_GRADES_REPORT_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_GRADES_REPORT_CHUNK_SIZE',
+        settings.DATA_API_GRADES_REPORT_CHUNK_SIZE
+    )
+    settings.DATA_API_REPORTS_STORAGE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_REPORTS_STORAGE',
+        settings.DATA_API_REPORTS_STORAGE
+    )
+    settings.DATA_API_REPORTS_DIR = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_REPORTS_DIR',
+        settings.DATA_API_REPORTS_DIR
+    )
+    settings.DATA_API_REPORTS_RETENTION_DAYS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'DATA_API_REPORTS_RETENTION_DAYS',
+        settings.DATA_API_REPORTS_RETENTION_DAYS
+    )
     settings.EDXMAKO_MODULE = getattr(settings, 'ENV_TOKENS', {}).get(
         'EDXMAKO_MODULE',
         settings.EDXMAKO_MODULE
@@ -118,6 +142,103 @@ def plugin_settings(settings):  # pylint: disable=function-redefined
                 'eox_core.middleware.RedirectionsMiddleware'
             ]
 
+    settings.EOX_CORE_COMPILED_REDIRECTS_CACHE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_COMPILED_REDIRECTS_CACHE_SIZE',
+        settings.EOX_CORE_COMPILED_REDIRECTS_CACHE_SIZE
+    )
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE',
+        settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_SIZE
+    )
+    settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT',
+        settings.EOX_CORE_REDIRECTIONS_LOCAL_CACHE_TIMEOUT
+    )
+    settings.EOX_CORE_REDIRECTIONS_GENERATION_CHECK_INTERVAL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_REDIRECTIONS_GENERATION_CHECK_INTERVAL',
+        settings.EOX_CORE_REDIRECTIONS_GENERATION_CHECK_INTERVAL
+    )
+    settings.EOX_CORE_REDIRECTIONS_PRELOAD = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_REDIRECTIONS_PRELOAD',
+        settings.EOX_CORE_REDIRECTIONS_PRELOAD
+    )
+    settings.EOX_CORE_FASTHASH_ALGORITHM = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_FASTHASH_ALGORITHM',
+        settings.EOX_CORE_FASTHASH_ALGORITHM
+    )
+    settings.EOX_CORE_FASTHASH_TIMING = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_FASTHASH_TIMING',
+        settings.EOX_CORE_FASTHASH_TIMING
+    )
+    settings.EOX_CORE_BULK_USERS_MAX_ITEMS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_USERS_MAX_ITEMS',
+        settings.EOX_CORE_BULK_USERS_MAX_ITEMS
+    )
+    settings.EOX_CORE_BULK_USERS_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_USERS_CHUNK_SIZE',
+        settings.EOX_CORE_BULK_USERS_CHUNK_SIZE
+    )
+    settings.EOX_CORE_USER_CREATION_ASYNC = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_USER_CREATION_ASYNC',
+        settings.EOX_CORE_USER_CREATION_ASYNC
+    )
+    settings.EOX_CORE_SITE_MEMBERSHIP_CACHE_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_SITE_MEMBERSHIP_CACHE_TIMEOUT',
+        settings.EOX_CORE_SITE_MEMBERSHIP_CACHE_TIMEOUT
+    )
+    settings.EOX_CORE_BULK_ENROLLMENTS_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_ENROLLMENTS_CHUNK_SIZE',
+        settings.EOX_CORE_BULK_ENROLLMENTS_CHUNK_SIZE
+    )
+    settings.EOX_CORE_ENROLLMENT_STREAM_BATCH_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_ENROLLMENT_STREAM_BATCH_SIZE',
+        settings.EOX_CORE_ENROLLMENT_STREAM_BATCH_SIZE
+    )
+    settings.EOX_CORE_BULK_JOBS_MAX_ITEMS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_JOBS_MAX_ITEMS',
+        settings.EOX_CORE_BULK_JOBS_MAX_ITEMS
+    )
+    settings.EOX_CORE_BULK_JOBS_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_JOBS_CHUNK_SIZE',
+        settings.EOX_CORE_BULK_JOBS_CHUNK_SIZE
+    )
+    settings.EOX_CORE_BULK_JOBS_PAGE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_JOBS_PAGE_SIZE',
+        settings.EOX_CORE_BULK_JOBS_PAGE_SIZE
+    )
+    settings.EOX_CORE_BULK_JOBS_MAX_PAGE_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_JOBS_MAX_PAGE_SIZE',
+        settings.EOX_CORE_BULK_JOBS_MAX_PAGE_SIZE
+    )
+    settings.EOX_CORE_BULK_JOBS_RESULTS_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_JOBS_RESULTS_TIMEOUT',
+        settings.EOX_CORE_BULK_JOBS_RESULTS_TIMEOUT
+    )
+    settings.EOX_CORE_ORG_SITE_INDEX_CACHE_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_ORG_SITE_INDEX_CACHE_TIMEOUT',
+        settings.EOX_CORE_ORG_SITE_INDEX_CACHE_TIMEOUT
+    )
+    settings.EOX_CORE_PROGRAMS_CACHE_STALE_TTL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_PROGRAMS_CACHE_STALE_TTL',
+        settings.EOX_CORE_PROGRAMS_CACHE_STALE_TTL
+    )
+    settings.EOX_CORE_PROGRAMS_NEGATIVE_CACHE_TTL = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_PROGRAMS_NEGATIVE_CACHE_TTL',
+        settings.EOX_CORE_PROGRAMS_NEGATIVE_CACHE_TTL
+    )
+    settings.EOX_CORE_PROGRAMS_CACHE_LOCK_TIMEOUT = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_PROGRAMS_CACHE_LOCK_TIMEOUT',
+        settings.EOX_CORE_PROGRAMS_CACHE_LOCK_TIMEOUT
+    )
+    settings.EOX_CORE_BULK_PRE_ENROLLMENTS_MAX_ITEMS = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_PRE_ENROLLMENTS_MAX_ITEMS',
+        settings.EOX_CORE_BULK_PRE_ENROLLMENTS_MAX_ITEMS
+    )
+    settings.EOX_CORE_BULK_PRE_ENROLLMENTS_CHUNK_SIZE = getattr(settings, 'ENV_TOKENS', {}).get(
+        'EOX_CORE_BULK_PRE_ENROLLMENTS_CHUNK_SIZE',
+        settings.EOX_CORE_BULK_PRE_ENROLLMENTS_CHUNK_SIZE
+    )
+
     # Sentry Integration
     sentry_integration_dsn = getattr(settings, 'ENV_TOKENS', {}).get(
         'EOX_CORE_SENTRY_INTEGRATION_DSN',
@@ -0,0 +1,53 @@
+"""
+Celery tasks of eox-core.
+"""
+import logging
+
+from celery import Task
+from celery.exceptions import MaxRetriesExceededError
+from django.contrib.auth import get_user_model
+
+from eox_core.edxapp_wrapper.users import run_edxapp_user_side_effects
+
+LOG = logging.getLogger(__name__)
+
+
+class EdxappUserSideEffects(Task):
+    """
+    Runs the steps of the creation of edxapp users that were deferred by the API.
+    """
+    task_name = "user_side_effects"
+    max_retries = 5
+    default_retry_delay = 30
+
+    def run(self, users, *args, **kwargs):  # pylint: disable=unused-argument
+        """
+        Receives a list of dicts with the user_id and the language_preference of
+        new users. The users whose steps failed are retried, as every step can be
+        repeated safely.
+
+        Returns the errors of the users that still failed after the last retry.
+        """
+        user_model = get_user_model()
+        existing_users = user_model.objects.in_bulk([item["user_id"] for item in users])
+
+        pending = []
+        errors = {}
+        for item in users:
+            user = existing_users.get(item["user_id"])
+            if user is None:
+                # The account may not be committed yet.
+                user_errors = ["User {} not found".format(item["user_id"])]
+            else:
+                user_errors = run_edxapp_user_side_effects(user, item.get("language_preference"))
+            if user_errors:
+                pending.append(item)
+                errors[item["user_id"]] = user_errors
+
+        if pending:
+            try:
+                raise self.retry(kwargs={"users": pending})
+            except MaxRetriesExceededError:
+                LOG.error("The side effects of the creation of %s users failed: %s", len(pending), errors)
+
+        return errors
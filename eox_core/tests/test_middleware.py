@@ -2,13 +2,25 @@
 """
 Test module for the custom Middlewares
 """
+from collections import OrderedDict
+
 import mock
 from django.contrib.auth.models import AnonymousUser
 from django.http import Http404
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 
-from eox_core.middleware import PathRedirectionMiddleware, RedirectionsMiddleware
+from eox_core.middleware import (
+    COMPILED_REDIRECTS,
+    PRELOADED_REDIRECTIONS,
+    CustomPathRedirectTable,
+    PathRedirectionMiddleware,
+    RedirectionsMiddleware,
+    build_mktg_redirects_index,
+    bump_redirections_generation,
+    get_compiled_redirects,
+)
 from eox_core.models import Redirection
+from eox_core.utils import cache, fasthash
 
 
 class PathRedirectionMiddlewareTest(TestCase):
@@ -125,6 +137,108 @@ class PathRedirectionMiddlewareTest(TestCase):
         self.assertIn(target_url, result.url)
 
 
+class CustomPathRedirectTableTest(TestCase):
+    """
+    Testing the compiled table of EDNX_CUSTOM_PATH_REDIRECTS rules.
+    """
+    def setUp(self):
+        """ setup """
+        COMPILED_REDIRECTS.clear()
+        self.addCleanup(COMPILED_REDIRECTS.clear)
+
+    def test_first_matching_rule_wins(self):
+        """
+        Test the rules are merged keeping the priority of the configured order.
+        """
+        redirects = OrderedDict([
+            ('^/courses/{COURSE_ID_PATTERN}/about', 'not_found'),
+            ('^/courses/{COURSE_ID_PATTERN}', {'redirect_always': '/elsewhere'}),
+            ('^/u/{USERNAME_PATTERN}', 'login_required'),
+        ])
+        table = CustomPathRedirectTable(redirects)
+
+        self.assertIsNotNone(table.combined)
+        self.assertEqual(table.match('/courses/course-v1:org+course+run/about'), ('not_found', 'not_found'))
+        self.assertEqual(
+            table.match('/courses/course-v1:org+course+run/info'),
+            ('redirect_always', {'redirect_always': '/elsewhere'}),
+        )
+        self.assertEqual(table.match('/u/someone'), ('login_required', 'login_required'))
+        self.assertIsNone(table.match('/dashboard'))
+
+    def test_unmergeable_rules_are_matched_one_by_one(self):
+        """
+        Test rules with backreferences are still matched in order.
+        """
+        redirects = OrderedDict([
+            (r'^/(?P<part>\w+)/(?P=part)$', 'not_found'),
+            ('^/custom/path/', 'login_required'),
+        ])
+        table = CustomPathRedirectTable(redirects)
+
+        self.assertIsNone(table.combined)
+        self.assertEqual(table.match('/same/same'), ('not_found', 'not_found'))
+        self.assertEqual(table.match('/custom/path/'), ('login_required', 'login_required'))
+        self.assertIsNone(table.match('/same/other'))
+
+    def test_invalid_rules_are_skipped(self):
+        """
+        Test an invalid rule does not break the rest of the table.
+        """
+        table = CustomPathRedirectTable(OrderedDict([
+            ('^/broken/(', 'not_found'),
+            ('^/custom/path/', 'login_required'),
+        ]))
+
+        self.assertEqual(table.match('/custom/path/'), ('login_required', 'login_required'))
+
+    def test_table_is_built_once_per_configuration(self):
+        """
+        Test the table is reused while the site configuration does not change.
+        """
+        builder = mock.Mock()
+        redirects = {'^/custom/path/': 'not_found'}
+
+        get_compiled_redirects('EDNX_CUSTOM_PATH_REDIRECTS', 'site.example.com', redirects, builder)
+        get_compiled_redirects('EDNX_CUSTOM_PATH_REDIRECTS', 'site.example.com', redirects, builder)
+        get_compiled_redirects('EDNX_CUSTOM_PATH_REDIRECTS', 'site.example.com', dict(redirects), builder)
+        builder.assert_called_once_with(redirects)
+
+        get_compiled_redirects('EDNX_CUSTOM_PATH_REDIRECTS', 'site.example.com', {'^/other/': 'not_found'}, builder)
+        get_compiled_redirects('EDNX_CUSTOM_PATH_REDIRECTS', 'other.example.com', redirects, builder)
+        self.assertEqual(builder.call_count, 3)
+
+
+class MktgRedirectsIndexTest(TestCase):
+    """
+    Testing the index of MKTG_REDIRECTS paths.
+    """
+
+    def test_keys_are_normalized(self):
+        """
+        Test the keys are indexed by the path they are compared with.
+        """
+        index = build_mktg_redirects_index({
+            'tos.html': '/terms',
+            'about': '/about-us',
+            'honor.html': '',
+        })
+
+        self.assertEqual(index, {'/tos': '/terms', '/about': '/about-us'})
+
+    def test_first_non_empty_key_wins(self):
+        """
+        Test the first non empty target is used when two keys share a path.
+        """
+        index = build_mktg_redirects_index(OrderedDict([
+            ('tos', ''),
+            ('tos.html', '/terms'),
+            ('tos.html.html', '/other-terms'),
+        ]))
+
+        self.assertEqual(index, {'/tos': '/terms'})
+
+
 class RedirectionMiddlewareTest(TestCase):
     """
     Testing the middleware RedirectionsMiddleware.
@@ -133,6 +247,10 @@ class RedirectionMiddlewareTest(TestCase):
         """ setup """
         self.request_factory = RequestFactory()
         self.middleware_instance = RedirectionsMiddleware()
+        cache.clear()
+        bump_redirections_generation()
+        PRELOADED_REDIRECTIONS.clear()
+        self.addCleanup(PRELOADED_REDIRECTIONS.clear)
 
     def test_disabled_feature(self):
         """
@@ -165,3 +283,94 @@ class RedirectionMiddlewareTest(TestCase):
         result = self.middleware_instance.process_request(request)
 
         self.assertIsNotNone(result)
+
+    @mock.patch('eox_core.middleware.cache')
+    @mock.patch('eox_core.models.Redirection.objects.get')
+    def test_local_cache_avoids_shared_cache(self, redirection_get_mock, cache_mock):
+        """
+        Test repeated requests for a domain are served by the in-process cache.
+        """
+        request = self.request_factory.get('/', HTTP_HOST='www.example.com')
+        redirection_get_mock.side_effect = Redirection.DoesNotExist  # pylint: disable=no-member
+        cache_mock.get.return_value = None
+
+        self.middleware_instance.process_request(request)
+        shared_cache_calls = cache_mock.get.call_count
+        self.middleware_instance.process_request(request)
+        self.middleware_instance.process_request(request)
+
+        redirection_get_mock.assert_called_once()
+        self.assertEqual(cache_mock.get.call_count, shared_cache_calls)
+
+    @mock.patch('eox_core.models.Redirection.objects.get')
+    def test_generation_bump_invalidates_local_cache(self, redirection_get_mock):
+        """
+        Test a change on the redirections reaches the in-process cache.
+        """
+        request = self.request_factory.get('/', HTTP_HOST='www.example.com')
+        redirection_get_mock.side_effect = Redirection.DoesNotExist  # pylint: disable=no-member
+        self.assertIsNone(self.middleware_instance.process_request(request))
+
+        # A different worker saves a redirection
+        cache.delete('redirect_cache.' + fasthash('www.example.com'))
+        cache.incr('redirect_cache.generation')
+        with mock.patch('eox_core.middleware.time.time', return_value=10 ** 10):
+            redirection_get_mock.side_effect = None
+            redirection_get_mock.return_value = Redirection(
+                domain='www.example.com', target='example.com', scheme='https', status=301
+            )
+            result = self.middleware_instance.process_request(request)
+
+        self.assertEqual(result.url, 'https://example.com/')
+        self.assertEqual(redirection_get_mock.call_count, 2)
+
+    @override_settings(EOX_CORE_REDIRECTIONS_PRELOAD=True)
+    def test_preloaded_redirections(self):
+        """
+        Test all the redirections are loaded at once and matched ignoring the case.
+        """
+        Redirection.objects.create(domain='www.example.com', target='example.com', scheme='https', status=301)
+        Redirection.objects.create(domain='old.example.com', target='new.example.com', scheme='http', status=302)
+
+        with self.assertNumQueries(1):
+            first = self.middleware_instance.process_request(
+                self.request_factory.get('/about', HTTP_HOST='WWW.example.com')
+            )
+            second = self.middleware_instance.process_request(
+                self.request_factory.get('/', HTTP_HOST='old.example.com')
+            )
+            none = self.middleware_instance.process_request(
+                self.request_factory.get('/', HTTP_HOST='other.example.com')
+            )
+
+        self.assertEqual(first.url, 'https://example.com/about')
+        self.assertEqual(second.status_code, 302)
+        self.assertIsNone(none)
+
+    @mock.patch('eox_core.middleware.threading.Thread')
+    def test_preloaded_redirections_refresh_in_background(self, thread_mock):
+        """
+        Test a new generation reloads the map in the background, serving the current one meanwhile.
+        """
+        Redirection.objects.create(domain='www.example.com', target='example.com', scheme='https', status=301)
+        PRELOADED_REDIRECTIONS.get('www.example.com', 1)
+        Redirection.objects.all().delete()
+
+        target = PRELOADED_REDIRECTIONS.get('www.example.com', 2)
+        PRELOADED_REDIRECTIONS.get('www.example.com', 2)
+
+        self.assertEqual(target.target, 'example.com')
+        thread_mock.assert_called_once_with(target=PRELOADED_REDIRECTIONS._refresh, args=(2,))  # pylint: disable=protected-access
+        thread_mock.return_value.start.assert_called_once()
+
+    @mock.patch('eox_core.middleware.transaction.on_commit')
+    def test_delete_bumps_generation(self, on_commit_mock):
+        """
+        Test deleting a redirection invalidates the cached redirections once committed.
+        """
+        redirection = Redirection.objects.create(domain='www.example.com', target='example.com')
+        on_commit_mock.reset_mock()
+
+        redirection.delete()
+
+        on_commit_mock.assert_called_once_with(bump_redirections_generation)
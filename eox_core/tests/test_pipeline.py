@@ -5,6 +5,7 @@ Tests for the pipeline module used in third party auth.
 from django.test import TestCase
 from mock import MagicMock, PropertyMock, patch
 
+from eox_core.edxapp_wrapper.registry import clear_backends
 from eox_core.pipeline import ensure_user_has_profile
 
 
@@ -15,8 +16,10 @@ class EnsureUserProfileTest(TestCase):
     def setUp(self):
         self.backend_mock = MagicMock()
         self.user_mock = MagicMock()
+        clear_backends()
+        self.addCleanup(clear_backends)
 
-    @patch('eox_core.edxapp_wrapper.users.import_module')
+    @patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_user_with_profile_works(self, import_mock):
         """
         A user that already has a profile will do nothing
@@ -27,7 +30,7 @@ class EnsureUserProfileTest(TestCase):
         ensure_user_has_profile(self.backend_mock, {}, user=self.user_mock)
         backend().get_user_profile().assert_not_called()
 
-    @patch('eox_core.edxapp_wrapper.users.import_module')
+    @patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_user_without_profile_works(self, import_mock):
         """
         A user that has no profile will create one
@@ -0,0 +1,46 @@
+"""
+Test module for the celery tasks of eox-core
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from mock import patch
+
+from eox_core.tasks import EdxappUserSideEffects
+
+
+class EdxappUserSideEffectsTest(TestCase):
+    """
+    Test the deferred steps of the creation of users
+    """
+
+    def setUp(self):
+        """ setup """
+        self.user = User.objects.create(username="test", email="test@example.com")
+        self.task = EdxappUserSideEffects()
+
+    @patch('eox_core.tasks.run_edxapp_user_side_effects', return_value=[])
+    def test_side_effects_are_run(self, side_effects_mock):
+        """
+        The steps are run for every user and no errors are returned.
+        """
+        result = self.task.run(users=[{"user_id": self.user.id, "language_preference": "es-419"}])
+
+        self.assertEqual(result, {})
+        side_effects_mock.assert_called_once_with(self.user, "es-419")
+
+    @patch.object(EdxappUserSideEffects, 'retry')
+    @patch('eox_core.tasks.run_edxapp_user_side_effects')
+    def test_failed_users_are_retried(self, side_effects_mock, retry_mock):
+        """
+        Only the users whose steps failed are retried.
+        """
+        other_user = User.objects.create(username="other", email="other@example.com")
+        side_effects_mock.side_effect = lambda user, language_preference: (
+            ["No comments_service_user was created"] if user == other_user else []
+        )
+        retry_mock.side_effect = RuntimeError("retry")
+
+        with self.assertRaises(RuntimeError):
+            self.task.run(users=[{"user_id": self.user.id}, {"user_id": other_user.id}])
+
+        retry_mock.assert_called_once_with(kwargs={"users": [{"user_id": other_user.id}]})
@@ -2,9 +2,22 @@
 """
 Test module for Utils
 """
-from django.test import TestCase
+import hashlib
 
-from eox_core.utils import fasthash
+import mock
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+
+from eox_core import utils
+from eox_core.utils import (
+    CachedFetchError,
+    LocalLRUCache,
+    fasthash,
+    get_cached_or_refresh,
+    get_fasthash_function,
+    get_fasthash_stats,
+    get_program_cache_key,
+)
 
 
 class UtilsTest(TestCase):
@@ -12,9 +25,210 @@ class UtilsTest(TestCase):
     Test the functions included on utils module
     """
 
+    def setUp(self):
+        """ setup """
+        utils._FASTHASH_FUNCTIONS.clear()  # pylint: disable=protected-access
+        utils._FASTHASH_CONFIG.clear()  # pylint: disable=protected-access
+        self.addCleanup(utils._FASTHASH_FUNCTIONS.clear)  # pylint: disable=protected-access
+        self.addCleanup(utils._FASTHASH_CONFIG.clear)  # pylint: disable=protected-access
+
     def test_fasthash_call(self):
         """
         Answers the question: Can we apply the fasthash method?
         """
         test_str = "test_str"
         fasthash(test_str)
+
+    def test_fasthash_is_a_128_bit_digest(self):
+        """
+        The default algorithm keeps the length of the previous keys.
+        """
+        digest = fasthash("test_str")
+
+        self.assertEqual(len(digest), 32)
+        self.assertEqual(digest, fasthash("test_str"))
+        self.assertNotEqual(digest, fasthash("other_str"))
+
+    @override_settings(EOX_CORE_FASTHASH_ALGORITHM='md5')
+    def test_fasthash_algorithm_setting(self):
+        """
+        The algorithm can be chosen with a setting.
+        """
+        self.assertEqual(fasthash("test_str"), hashlib.md5(b"test_str").hexdigest())
+
+    @mock.patch('eox_core.utils.hashlib.new')
+    def test_unavailable_algorithm_falls_back(self, hashlib_new_mock):
+        """
+        The md4 compatibility mode does not break when md4 is not available.
+        """
+        hashlib_new_mock.side_effect = ValueError('unsupported hash type md4')
+
+        hash_function = get_fasthash_function('md4')
+
+        self.assertIn(hash_function, (utils.FASTHASH_ALGORITHMS['blake2b'], utils.FASTHASH_ALGORITHMS['md5']))
+
+    @override_settings(EOX_CORE_FASTHASH_TIMING=True)
+    @mock.patch.dict('eox_core.utils.FASTHASH_STATS', {'calls': 0, 'seconds': 0.0})
+    def test_fasthash_timing(self):
+        """
+        The time spent hashing is reported when the timing is enabled.
+        """
+        fasthash("test_str")
+        fasthash("other_str")
+
+        stats = get_fasthash_stats()
+        self.assertEqual(stats['calls'], 2)
+        self.assertGreaterEqual(stats['seconds'], 0)
+
+
+class LocalLRUCacheTest(TestCase):
+    """
+    Test the in-process LRU cache
+    """
+
+    def test_least_recently_used_is_evicted(self):
+        """
+        The entry that was not used for the longest time is discarded first.
+        """
+        local_cache = LocalLRUCache(maxsize=2)
+        local_cache.set('a', 1)
+        local_cache.set('b', 2)
+        local_cache.get('a')
+        local_cache.set('c', 3)
+
+        self.assertEqual(local_cache.get('a'), 1)
+        self.assertIsNone(local_cache.get('b'))
+        self.assertEqual(local_cache.get('c'), 3)
+
+    @mock.patch('eox_core.utils.time.time')
+    def test_entries_expire(self, time_mock):
+        """
+        Entries are not returned after their timeout.
+        """
+        time_mock.return_value = 100
+        local_cache = LocalLRUCache(timeout=10)
+        local_cache.set('a', 1)
+
+        time_mock.return_value = 105
+        self.assertEqual(local_cache.get('a'), 1)
+        time_mock.return_value = 111
+        self.assertIsNone(local_cache.get('a'))
+
+
+@mock.patch('eox_core.utils.time.sleep')
+@mock.patch('eox_core.utils.time.time')
+class GetCachedOrRefreshTest(TestCase):
+    """
+    Test the stale-while-revalidate cache helper
+    """
+
+    def setUp(self):
+        """ setup """
+        self.cache = LocMemCache('eox-core-test', {})
+        self.cache.clear()
+        self.fetch = mock.Mock(return_value='value')
+
+    def get(self, **kwargs):
+        """ Call the helper with the test cache """
+        options = {'timeout': 10, 'stale_timeout': 100, 'error_timeout': 5}
+        options.update(kwargs)
+        return get_cached_or_refresh('key', self.fetch, cache_backend=self.cache, **options)
+
+    def test_fresh_value_is_cached(self, time_mock, _):
+        """
+        The value is fetched once while it is fresh.
+        """
+        time_mock.return_value = 100
+
+        self.assertEqual(self.get(), 'value')
+        self.assertEqual(self.get(), 'value')
+        self.fetch.assert_called_once_with()
+
+    def test_stale_value_is_refreshed_by_one_caller(self, time_mock, _):
+        """
+        A stale value is served while another caller holds the refresh lock.
+        """
+        time_mock.return_value = 100
+        self.get()
+        time_mock.return_value = 120
+        self.fetch.return_value = 'new value'
+
+        self.cache.add('key.lock', True)
+        self.assertEqual(self.get(), 'value')
+        self.cache.delete('key.lock')
+        self.assertEqual(self.get(), 'new value')
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_stale_value_is_served_when_the_refresh_fails(self, time_mock, _):
+        """
+        The stale value is kept when the source is not available.
+        """
+        time_mock.return_value = 100
+        self.get()
+        time_mock.return_value = 120
+        self.fetch.side_effect = ValueError('catalog down')
+
+        self.assertEqual(self.get(), 'value')
+        self.assertIsNone(self.cache.get('key.lock'))
+
+    def test_errors_are_cached(self, time_mock, _):
+        """
+        A failed fetch is not repeated during the error timeout.
+        """
+        time_mock.return_value = 100
+        self.fetch.side_effect = ValueError('not found')
+
+        with self.assertRaises(ValueError):
+            self.get()
+        with self.assertRaises(CachedFetchError):
+            self.get()
+        self.fetch.assert_called_once_with()
+
+    def test_missing_value_waits_for_the_lock_holder(self, time_mock, sleep_mock):
+        """
+        Callers without the lock wait for the value stored by the one that has it.
+        """
+        time_mock.return_value = 100
+        self.cache.add('key.lock', True)
+        sleep_mock.side_effect = lambda seconds: self.cache.set('key', {'value': 'other', 'fresh_until': 110})
+
+        self.assertEqual(self.get(), 'other')
+        self.fetch.assert_not_called()
+
+
+class ProgramCacheKeyTest(TestCase):
+    """
+    Test the cache keys of the programs of the bundle enrollments
+    """
+
+    @staticmethod
+    def get_site(domain, catalog_url=None):
+        """ Site whose configuration may have a catalog """
+        site = mock.MagicMock(domain=domain)
+        site.configuration.get_value.side_effect = lambda name, default=None: catalog_url
+        return site
+
+    def test_site_with_catalog(self):
+        """ Test that the programs of the catalog of a site are cached for that site """
+        site = self.get_site('courses.example.com', 'https://catalog.example.com/api/v1/')
+
+        self.assertEqual(get_program_cache_key('uuid', site), 'eox_core.programs.api.data.courses.example.com.uuid')
+
+    def test_prewarm_and_enrollment_keys(self):
+        """
+        Test that the prewarm_programs_cache --site-domain and the enrollments of a request on that
+        site resolve the same key, also when the site reads the default catalog.
+        """
+        for catalog_url in ('https://catalog.example.com/api/v1/', None):
+            prewarm_site = self.get_site('courses.example.com', catalog_url)
+            request = mock.MagicMock(site=self.get_site('courses.example.com', catalog_url))
+
+            self.assertEqual(
+                get_program_cache_key('uuid', prewarm_site),
+                get_program_cache_key('uuid', getattr(request, 'site', None)),
+            )
+
+    def test_default_catalog(self):
+        """ Test that the sites without a catalog share the programs of the default catalog """
+        self.assertEqual(get_program_cache_key('uuid'), 'eox_core.programs.api.data.default.uuid')
+        self.assertEqual(get_program_cache_key('uuid', self.get_site('other.example.com')), get_program_cache_key('uuid'))
@@ -6,6 +6,7 @@ from django.test import TestCase
 from mock import Mock, patch
 
 from eox_core.edxapp_wrapper import configuration_helpers
+from eox_core.edxapp_wrapper.registry import clear_backends
 
 
 class ConfigurationHelpersTest(TestCase):
@@ -13,7 +14,12 @@ class ConfigurationHelpersTest(TestCase):
     Making sure that the configuration_helpers backend works
     """
 
-    @patch('eox_core.edxapp_wrapper.configuration_helpers.import_module')
+    def setUp(self):
+        """ setup """
+        clear_backends()
+        self.addCleanup(clear_backends)
+
+    @patch('eox_core.edxapp_wrapper.registry.import_module')
     def test_imported_module_is_used(self, import_mock):
         """
         Testing the backend is imported and used
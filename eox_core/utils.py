@@ -3,19 +3,291 @@
 Util function definitions.
 """
 import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from timeit import default_timer
 
+from django.conf import settings
 from django.core import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 try:
     cache = cache.caches['general']  # pylint: disable=invalid-name
 except Exception:  # pylint: disable=broad-except
     cache = cache.cache  # pylint: disable=invalid-name
 
+LOG = logging.getLogger(__name__)
 
-def fasthash(string):
+# Accumulated cost of fasthash, only measured when EOX_CORE_FASTHASH_TIMING is enabled.
+FASTHASH_STATS = {'calls': 0, 'seconds': 0.0}
+
+
+def _md4_hexdigest(data):
     """
-    Hashes `string` into a string representation of a 128-bit digest.
+    128-bit md4 digest. Kept to generate the same keys as previous versions.
     """
     md4 = hashlib.new("md4")
-    md4.update(string.encode('utf-8'))
+    md4.update(data)
     return md4.hexdigest()
+
+
+def _md5_hexdigest(data):
+    """
+    128-bit md5 digest.
+    """
+    return hashlib.md5(data).hexdigest()
+
+
+def _blake2b_hexdigest(data):
+    """
+    128-bit blake2b digest.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()  # pylint: disable=no-member
+
+
+FASTHASH_ALGORITHMS = {
+    'md4': _md4_hexdigest,
+    'md5': _md5_hexdigest,
+    'blake2b': _blake2b_hexdigest,
+}
+
+_FASTHASH_FUNCTIONS = {}
+# Algorithm and timing flag read from the settings, resolved on the first fasthash call.
+_FASTHASH_CONFIG = {}
+
+
+def get_fasthash_function(algorithm):
+    """
+    Return the hexdigest function for `algorithm`.
+
+    Algorithms that are not available on this python or OpenSSL build are
+    replaced by the fastest available one, blake2b or md5.
+    """
+    try:
+        return _FASTHASH_FUNCTIONS[algorithm]
+    except KeyError:
+        pass
+
+    fallback = 'blake2b' if hasattr(hashlib, 'blake2b') else 'md5'
+    hash_function = FASTHASH_ALGORITHMS.get(algorithm)
+    try:
+        hash_function(b'')
+    except (TypeError, ValueError, AttributeError):
+        LOG.warning("The fasthash algorithm %s is not available, using %s instead.", algorithm, fallback)
+        hash_function = FASTHASH_ALGORITHMS[fallback]
+
+    _FASTHASH_FUNCTIONS[algorithm] = hash_function
+    return hash_function
+
+
+def fasthash(string):
+    """
+    Hashes `string` into a string representation of a 128-bit digest.
+
+    The digest is computed with the EOX_CORE_FASTHASH_ALGORITHM algorithm, blake2b
+    by default. Use md4 to keep the keys generated by previous versions.
+    """
+    config = _FASTHASH_CONFIG.get('config')
+    if config is None:
+        # Published with a single assignment, so concurrent calls never see it half filled
+        config = {
+            'function': get_fasthash_function(getattr(settings, 'EOX_CORE_FASTHASH_ALGORITHM', 'blake2b')),
+            'timing': getattr(settings, 'EOX_CORE_FASTHASH_TIMING', False),
+        }
+        _FASTHASH_CONFIG['config'] = config
+
+    hash_function = config['function']
+    data = string.encode('utf-8')
+
+    if not config['timing']:
+        return hash_function(data)
+
+    start = default_timer()
+    digest = hash_function(data)
+    FASTHASH_STATS['seconds'] += default_timer() - start
+    FASTHASH_STATS['calls'] += 1
+    return digest
+
+
+@receiver(setting_changed)
+def reset_fasthash_config(sender, setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Read the fasthash settings again when they change, e.g. by override_settings.
+    """
+    if setting in ('EOX_CORE_FASTHASH_ALGORITHM', 'EOX_CORE_FASTHASH_TIMING'):
+        _FASTHASH_CONFIG.clear()
+
+
+def get_fasthash_stats():
+    """
+    Return the number of timed fasthash calls, the time spent on them and the average per call.
+    """
+    calls = FASTHASH_STATS['calls']
+    seconds = FASTHASH_STATS['seconds']
+    return {
+        'calls': calls,
+        'seconds': seconds,
+        'seconds_per_call': seconds / calls if calls else 0.0,
+    }
+
+
+class LocalLRUCache(object):
+    """
+    Small thread safe in-process cache that keeps up to `maxsize` entries,
+    discarding the least recently used one when it is full.
+
+    Entries expire after `timeout` seconds, unless it is None.
+    """
+
+    def __init__(self, maxsize=128, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored for `key`, or `default` if it is not cached or expired.
+        """
+        with self._lock:
+            try:
+                expires_at, value = self._data.pop(key)
+            except KeyError:
+                return default
+            if expires_at is not None and expires_at <= time.time():
+                return default
+            self._data[key] = (expires_at, value)
+            return value
+
+    def set(self, key, value, timeout=None):
+        """
+        Store `value` for `key`, evicting the least recently used entry if needed.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        expires_at = time.time() + timeout if timeout is not None else None
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires_at, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove `key` if it is cached.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all the entries.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CachedFetchError(Exception):
+    """
+    Error of a previous fetch, kept in the cache by get_cached_or_refresh.
+    """
+
+
+def get_cached_or_refresh(key, fetch, timeout, stale_timeout=0, error_timeout=0, lock_timeout=30, lock_wait=5,
+                          force=False, cache_backend=None):
+    """
+    Return the value cached at `key`, calling `fetch` to get it again when it is older than `timeout` seconds.
+
+    - Stale values are served for up to `stale_timeout` more seconds while a single
+      caller, holding a lock in the cache, refreshes them. If the refresh fails, the
+      stale value is returned.
+    - When nothing is cached, the callers that do not get the lock wait up to
+      `lock_wait` seconds for the value stored by the one that has it.
+    - The errors raised by `fetch` with nothing cached are kept for `error_timeout`
+      seconds, raising CachedFetchError meanwhile.
+    """
+    cache_backend = cache_backend or cache
+    lock_key = '{}.lock'.format(key)
+    entry = None if force else cache_backend.get(key)
+
+    if entry is not None:
+        if entry['fresh_until'] > time.time() or not cache_backend.add(lock_key, True, lock_timeout):
+            return _get_cached_entry_value(entry)
+        try:
+            return _fetch_and_cache(key, fetch, timeout, stale_timeout, cache_backend)
+        except Exception:  # pylint: disable=broad-except
+            LOG.warning("Could not refresh the cached value of %s, serving the stale one.", key, exc_info=True)
+            return _get_cached_entry_value(entry)
+        finally:
+            cache_backend.delete(lock_key)
+
+    has_lock = cache_backend.add(lock_key, True, lock_timeout)
+    if not has_lock and not force:
+        deadline = time.time() + lock_wait
+        while time.time() < deadline:
+            time.sleep(0.05)
+            entry = cache_backend.get(key)
+            if entry is not None:
+                return _get_cached_entry_value(entry)
+
+    try:
+        return _fetch_and_cache(key, fetch, timeout, stale_timeout, cache_backend)
+    except Exception as error:
+        if error_timeout:
+            cache_backend.set(key, {
+                'error': repr(error),
+                'fresh_until': time.time() + error_timeout,
+            }, error_timeout)
+        raise
+    finally:
+        if has_lock:
+            cache_backend.delete(lock_key)
+
+
+def _fetch_and_cache(key, fetch, timeout, stale_timeout, cache_backend):
+    """
+    Call `fetch` and keep its value fresh for `timeout` seconds and stale for `stale_timeout` more.
+    """
+    value = fetch()
+    cache_backend.set(key, {
+        'value': value,
+        'fresh_until': time.time() + timeout,
+    }, timeout + stale_timeout)
+    return value
+
+
+def _get_cached_entry_value(entry):
+    """
+    Return the value of a cache entry, raising the error it keeps instead if any.
+    """
+    if 'error' in entry:
+        raise CachedFetchError(entry['error'])
+    return entry['value']
+
+
+def get_catalog_site(site=None):
+    """
+    Return the site if it configures a catalog of its own, or None when its programs come from the default catalog.
+    """
+    configuration = getattr(site, 'configuration', None)
+    if configuration is None or not configuration.get_value('COURSE_CATALOG_API_URL'):
+        return None
+    return site
+
+
+def get_program_cache_key(program_uuid, site=None):
+    """
+    Cache key of a program, by the catalog it is read from.
+    """
+    catalog_site = get_catalog_site(site)
+    return 'eox_core.programs.api.data.{site}.{uuid}'.format(
+        site=catalog_site.domain if catalog_site is not None else 'default',
+        uuid=program_uuid,
+    )